@@ -4,6 +4,8 @@ This package provides a command-line interface for simulating rotary phone diali
 including contact management, call history tracking, and statistics.
 """
 
+import os
+
 __version__ = "0.2.0"
 __author__ = "Rotary Phone Team"
 __license__ = "MIT"
@@ -13,3 +15,7 @@ __all__ = [
     "__license__",
 ]
 
+# RP_PROFILE=cpu|mem profiles the whole process (see rotary_phone.profiling)
+if os.environ.get("RP_PROFILE"):
+    from rotary_phone.profiling import install_from_env
+    install_from_env()
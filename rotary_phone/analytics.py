@@ -0,0 +1,212 @@
+"""Vectorized NumPy implementations of the statistics functions.
+
+History is loaded once into arrays (int32 number IDs and int64 epoch
+microsecond timestamps) and the statistics are computed with np.unique,
+np.bincount and datetime64 flooring instead of per-row Python loops. The
+arrays are cached until the stored history changes, so the several stats
+computed by one command share a single load.
+
+NumPy is optional; is_available() reports whether this backend can be used.
+Results match the pure-Python functions in rotary_phone.stats exactly,
+including tie ordering.
+"""
+
+import warnings
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+_MICROS_PER_HOUR = 3600 * 1000000
+_MICROS_PER_DAY = 24 * _MICROS_PER_HOUR
+
+_cache: Optional[Tuple[Any, Dict[str, Any]]] = None
+
+
+def is_available() -> bool:
+    """Check whether NumPy is installed.
+
+    Returns:
+        True if the NumPy backend can be used.
+    """
+    return np is not None
+
+
+def _parse_timestamps(timestamps: List[str]) -> 'np.ndarray':
+    """Parse ISO timestamps into int64 epoch microseconds (NaT for invalid)."""
+    try:
+        with warnings.catch_warnings():
+            # Timezone offsets only warn; treat them as unparseable here
+            warnings.simplefilter('error')
+            return np.array(timestamps, dtype='datetime64[us]').astype(np.int64)
+    except (ValueError, TypeError, DeprecationWarning, UserWarning):
+        pass
+
+    # Slow path for formats NumPy rejects, matching datetime.fromisoformat
+    nat = np.datetime64('NaT').astype(np.int64)
+    values = np.empty(len(timestamps), dtype=np.int64)
+    for i, timestamp in enumerate(timestamps):
+        try:
+            dt = datetime.fromisoformat(timestamp).replace(tzinfo=None)
+            values[i] = np.datetime64(dt, 'us').astype(np.int64)
+        except (ValueError, TypeError):
+            values[i] = nat
+    return values
+
+
+def history_to_arrays(history: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Convert history entries to analysis arrays.
+
+    Args:
+        history: List of history entries.
+
+    Returns:
+        Dictionary with:
+        - numbers: array of unique numbers, ordered by first occurrence
+        - number_ids: int32 index into numbers for each entry
+        - counts: int64 calls per unique number
+        - timestamps: int64 epoch microseconds per entry
+        - valid: boolean mask of entries with a parseable timestamp
+    """
+    # Intern numbers in first-occurrence order, like Counter insertion order
+    index: Dict[str, int] = {}
+    number_ids = np.fromiter(
+        (index.setdefault(entry['number'], len(index)) for entry in history),
+        dtype=np.int32, count=len(history),
+    )
+
+    timestamps = _parse_timestamps([entry.get('timestamp', '') for entry in history])
+    nat = np.datetime64('NaT').astype(np.int64)
+    return {
+        'numbers': np.array(list(index)),
+        'number_ids': number_ids,
+        'counts': np.bincount(number_ids, minlength=len(index)).astype(np.int64),
+        'timestamps': timestamps,
+        'valid': timestamps != nat,
+    }
+
+
+def load_history_arrays() -> Optional[Dict[str, Any]]:
+    """Load the stored history as arrays, reusing them until it changes.
+
+    Returns:
+        Arrays as returned by history_to_arrays(), or None if history is empty.
+    """
+    global _cache
+    from rotary_phone.history import flush_history, load_history
+    from rotary_phone.storage import get_backend
+
+    flush_history()
+    signature = get_backend().signature('history')
+    if _cache is not None and _cache[0] == signature:
+        return _cache[1]
+
+    history = load_history()
+    arrays = history_to_arrays(history) if history else None
+    _cache = (signature, arrays)
+    return arrays
+
+
+def _ranked(arrays: Dict[str, Any]) -> 'np.ndarray':
+    """Indices of unique numbers by descending count, ties by first occurrence."""
+    # IDs already follow first occurrence, so a stable sort keeps tie order
+    return np.argsort(-arrays['counts'], kind='stable')
+
+
+def get_dial_stats(contacts_count: int) -> Dict[str, Any]:
+    """Vectorized equivalent of stats.get_dial_stats.
+
+    Args:
+        contacts_count: Number of saved contacts.
+
+    Returns:
+        Same dictionary as stats.get_dial_stats().
+    """
+    arrays = load_history_arrays()
+    if arrays is None:
+        return {
+            'total_calls': 0,
+            'unique_numbers': 0,
+            'most_dialed': None,
+            'most_dialed_count': 0,
+            'total_contacts': contacts_count,
+        }
+    counts = arrays['counts']
+    # argmax returns the first maximum, i.e. the earliest-seen number
+    top = int(np.argmax(counts))
+    return {
+        'total_calls': int(len(arrays['number_ids'])),
+        'unique_numbers': int(len(counts)),
+        'total_contacts': contacts_count,
+        'most_dialed': str(arrays['numbers'][top]),
+        'most_dialed_count': int(counts[top]),
+    }
+
+
+def get_top_dialed(limit: int = 5) -> List[tuple]:
+    """Vectorized equivalent of stats.get_top_dialed.
+
+    Args:
+        limit: Maximum number of results to return.
+
+    Returns:
+        List of (number, count) tuples sorted by frequency (descending).
+    """
+    arrays = load_history_arrays()
+    if arrays is None:
+        return []
+    top = _ranked(arrays)[:max(limit, 0)]
+    return [(str(arrays['numbers'][i]), int(arrays['counts'][i])) for i in top]
+
+
+def get_average_calls_per_day() -> Optional[float]:
+    """Vectorized equivalent of stats.get_average_calls_per_day.
+
+    Returns:
+        Average calls per day, or None if some timestamp is invalid (the
+        pure-Python implementation decides how to handle that).
+    """
+    arrays = load_history_arrays()
+    if arrays is None:
+        return 0.0
+    total = len(arrays['timestamps'])
+    if total < 2:
+        return float(total)
+    if not arrays['valid'].all():
+        return None
+    timestamps = arrays['timestamps']
+    days = int((timestamps.max() - timestamps.min()) // _MICROS_PER_DAY) + 1
+    return total / days if days > 0 else float(total)
+
+
+def get_calls_by_day() -> Dict[str, int]:
+    """Vectorized equivalent of stats.get_calls_by_day.
+
+    Returns:
+        Dictionary mapping date strings (YYYY-MM-DD) to call counts.
+    """
+    arrays = load_history_arrays()
+    if arrays is None:
+        return {}
+    timestamps = arrays['timestamps'][arrays['valid']]
+    days = timestamps.astype('datetime64[us]').astype('datetime64[D]')
+    unique, counts = np.unique(days, return_counts=True)
+    return {str(day): int(count) for day, count in zip(unique, counts)}
+
+
+def get_calls_by_hour() -> Dict[int, int]:
+    """Vectorized equivalent of stats.get_calls_by_hour.
+
+    Returns:
+        Dictionary mapping hour (0-23) to call counts.
+    """
+    arrays = load_history_arrays()
+    if arrays is None:
+        return {}
+    timestamps = arrays['timestamps'][arrays['valid']]
+    hours = (timestamps % _MICROS_PER_DAY) // _MICROS_PER_HOUR
+    counts = np.bincount(hours, minlength=24)
+    return {hour: int(count) for hour, count in enumerate(counts) if count}
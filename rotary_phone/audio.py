@@ -0,0 +1,187 @@
+"""Pulse-dial audio rendering.
+
+A rotary dial sends each digit as a train of loop interruptions at 10
+pulses per second: 60 ms with the loop open (break) and 40 ms closed
+(make), one pulse for '1' up to ten pulses for '0', with a pause between
+digits (the pulse model of :mod:`rotary_phone.timing`). The audio has a
+click at each break and a quieter one at each make, as heard on the line.
+
+Samples are 16-bit signed mono PCM. One pulse and one inter-digit gap are
+synthesized once per sample rate; a digit is then the pulse repeated by
+byte-string multiplication, so rendering does no per-sample work in
+Python. WAV files are written one digit at a time.
+"""
+
+import math
+import os
+import sys
+import wave
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from rotary_phone.timing import BREAK_RATIO, PULSES_PER_SECOND, pulse_count
+
+DEFAULT_SAMPLE_RATE = 8000
+INTERDIGIT_GAP = 0.7
+CLICK_FREQUENCY = 1000.0
+CLICK_DURATION = 0.008
+CLICK_AMPLITUDE = 0.6
+MAKE_CLICK_AMPLITUDE = 0.3
+
+
+def _sample_rate(sample_rate: Optional[int]) -> int:
+    if sample_rate is None:
+        from rotary_phone.config import get_config_value
+        sample_rate = get_config_value('audio_sample_rate', DEFAULT_SAMPLE_RATE)
+    sample_rate = int(sample_rate)
+    if sample_rate < PULSES_PER_SECOND * 100:
+        raise ValueError(f"Sample rate too low for pulse audio: {sample_rate}")
+    return sample_rate
+
+
+def _click(sample_rate: int, amplitude: float) -> array:
+    """Synthesize one click: a short, exponentially decaying tone burst."""
+    length = max(1, int(sample_rate * CLICK_DURATION))
+    step = 2 * math.pi * CLICK_FREQUENCY / sample_rate
+    decay = 5.0 / length
+    peak = amplitude * 32767
+    return array('h', (int(peak * math.exp(-i * decay) * math.sin(i * step)) for i in range(length)))
+
+
+@lru_cache(maxsize=8)
+def _pulse_blocks(sample_rate: int) -> Tuple[bytes, bytes]:
+    """Get the PCM bytes of one pulse and of one inter-digit gap."""
+    period = sample_rate // PULSES_PER_SECOND
+    make_start = int(period * BREAK_RATIO)
+    pulse = array('h', bytes(2 * period))
+    break_click = _click(sample_rate, CLICK_AMPLITUDE)
+    make_click = _click(sample_rate, MAKE_CLICK_AMPLITUDE)
+    pulse[0:len(break_click)] = break_click
+    pulse[make_start:make_start + len(make_click)] = make_click
+    if sys.byteorder == 'big':
+        pulse.byteswap()
+    return pulse.tobytes(), bytes(2 * int(sample_rate * INTERDIGIT_GAP))
+
+
+def iter_pulse_frames(digits: str, sample_rate: int) -> Iterator[bytes]:
+    """Yield the PCM audio of dialed digits, one chunk per digit.
+
+    Args:
+        digits: Normalized number; characters other than digits are skipped.
+        sample_rate: Samples per second.
+
+    Yields:
+        Little-endian 16-bit PCM bytes; every digit but the first starts
+        with the inter-digit gap.
+    """
+    pulse, gap = _pulse_blocks(sample_rate)
+    first = True
+    for digit in digits:
+        if not digit.isdigit():
+            continue
+        frames = pulse * pulse_count(digit)
+        yield frames if first else gap + frames
+        first = False
+
+
+def render_pulses(number: str, sample_rate: Optional[int] = None) -> bytes:
+    """Render the pulse-dial audio of a phone number.
+
+    The number is validated and normalized as by dial(); the '+' of E.164
+    numbers is not dialed.
+
+    Args:
+        number: Phone number in any supported format.
+        sample_rate: Samples per second (default: the ``audio_sample_rate``
+            config option).
+
+    Returns:
+        Little-endian 16-bit mono PCM bytes.
+
+    Raises:
+        InvalidNumberError: If the phone number is invalid.
+        ValueError: If the sample rate is too low.
+    """
+    from rotary_phone.dialer import prepare_number
+    return b''.join(iter_pulse_frames(prepare_number(number), _sample_rate(sample_rate)))
+
+
+def _write_wav(digits: str, output_file: str, sample_rate: int) -> float:
+    """Stream the audio of normalized digits to a WAV file."""
+    frames = 0
+    with wave.open(output_file, 'wb') as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        for chunk in iter_pulse_frames(digits, sample_rate):
+            out.writeframesraw(chunk)
+            frames += len(chunk) // 2
+    return frames / sample_rate
+
+
+def write_wav(number: str, output_file: Path, sample_rate: Optional[int] = None) -> float:
+    """Render the pulse-dial audio of a phone number to a WAV file.
+
+    Args:
+        number: Phone number in any supported format.
+        output_file: WAV file to write.
+        sample_rate: Samples per second (default: the ``audio_sample_rate``
+            config option).
+
+    Returns:
+        Duration of the audio in seconds.
+
+    Raises:
+        InvalidNumberError: If the phone number is invalid.
+        ValueError: If the sample rate is too low.
+    """
+    from rotary_phone.dialer import prepare_number
+    return _write_wav(prepare_number(number), str(output_file), _sample_rate(sample_rate))
+
+
+def _render_task(args: Tuple[str, str, int]) -> float:
+    return _write_wav(*args)
+
+
+def render_many(numbers: Iterable[str], output_dir: Path, sample_rate: Optional[int] = None,
+                workers: int = 1) -> List[Path]:
+    """Render many numbers to WAV files, across worker processes.
+
+    Every number is validated before any file is written. Each number is
+    written to ``<digits>.wav`` in output_dir; repeated numbers are
+    rendered once.
+
+    Args:
+        numbers: Phone numbers in any supported format.
+        output_dir: Directory for the WAV files (created if missing).
+        sample_rate: Samples per second (default: the ``audio_sample_rate``
+            config option).
+        workers: Number of worker processes.
+
+    Returns:
+        Paths of the written files, in input order without repeats.
+
+    Raises:
+        InvalidNumberError: If any phone number is invalid.
+        ValueError: If the sample rate is too low.
+    """
+    from rotary_phone.dialer import prepare_number
+    sample_rate = _sample_rate(sample_rate)
+    output_dir = Path(output_dir)
+    digits = list(dict.fromkeys(prepare_number(number).lstrip('+') for number in numbers))
+    os.makedirs(output_dir, exist_ok=True)
+    paths = [output_dir / f"{d}.wav" for d in digits]
+    tasks = [(d, str(path), sample_rate) for d, path in zip(digits, paths)]
+
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            _render_task(task)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            for _ in executor.map(_render_task, tasks, chunksize=chunksize):
+                pass
+    return paths
@@ -0,0 +1,604 @@
+"""Change feed for contacts and history.
+
+Every history append and contact mutation is recorded with a monotonically
+increasing sequence number, so integrations can mirror the data by asking
+only for what changed since the last sequence they saw.
+
+For the file backends the feed is two files in the data directory:
+changes.log holds one JSON record per line, and changes.idx holds a header
+with the base sequence followed by the byte offset of each later record as
+a little-endian uint64, so record ``seq`` starts at the offset stored at
+position ``seq - base - 1``. Looking up a sequence is one seek, and reading
+new records costs only their size. Appends, reads and compaction from
+several processes are serialized with an fcntl lock where available.
+
+The feed keeps the newest ``change_feed_retain`` records. Once twice that
+many have built up, an append compacts the files down to the newest ones
+and raises the base, so compaction costs a constant amount per record.
+Consumers that ask for changes from before the base get ``replace``
+records for both collections first and must reload them.
+
+Record kinds:
+
+- ``{"seq", "kind": "history", "op": "append", "entry": {...}}``
+- ``{"seq", "kind": "contacts", "op": "put", "name", "number"}``
+- ``{"seq", "kind": "contacts", "op": "delete", "name"}``
+- ``{"seq", "kind": "history" | "contacts", "op": "replace"}`` when the whole
+  collection was rewritten (import, clear); consumers should reload it.
+
+Changes applied by replication from another host carry an extra
+``"origin"`` key with that host's ID.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+_OFFSET = struct.Struct('<Q')
+# magic, version, base sequence
+_INDEX_HEADER = struct.Struct('<4sIQ')
+_INDEX_MAGIC = b'RPCF'
+_INDEX_VERSION = 1
+DEFAULT_POLL_INTERVAL = 0.5
+DEFAULT_RETAIN = 100_000
+
+# inotify event masks (linux/inotify.h)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+
+
+class ChangeFeed:
+    """File-backed change feed in a data directory."""
+
+    LOG_FILE = "changes.log"
+    INDEX_FILE = "changes.idx"
+    LOCK_FILE = "changes.lock"
+
+    def __init__(self, directory: Path) -> None:
+        """Open the change feed of a data directory.
+
+        Args:
+            directory: Directory holding the feed files.
+        """
+        self.directory = Path(directory)
+        self.log_path = self.directory / self.LOG_FILE
+        self.index_path = self.directory / self.INDEX_FILE
+        self.lock_path = self.directory / self.LOCK_FILE
+        self._lock = threading.Lock()
+        self._watcher: Optional[Any] = None
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the feed lock across threads and processes."""
+        with self._lock:
+            if fcntl is None:
+                self._recover()
+                yield
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    self._recover()
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _recover(self) -> None:
+        """Finish or undo a compaction interrupted by a crash.
+
+        Compaction writes the new index, then the new log, then renames the
+        index and the log into place. A leftover index file means neither
+        was renamed; a leftover log file alone means only the log was not.
+        """
+        index_tmp = self.index_path.with_suffix('.idx.tmp')
+        log_tmp = self.log_path.with_suffix('.log.tmp')
+        if index_tmp.exists():
+            index_tmp.unlink()
+            if log_tmp.exists():
+                log_tmp.unlink()
+        elif log_tmp.exists():
+            os.replace(log_tmp, self.log_path)
+        try:
+            with open(self.index_path, 'rb') as index:
+                legacy = self._read_header(index)[1] == 0 and os.fstat(index.fileno()).st_size > 0
+                if legacy:
+                    index.seek(0)
+                    offsets = index.read()
+        except FileNotFoundError:
+            return
+        if legacy:
+            # Add the header to an index written before compaction existed
+            with open(index_tmp, 'wb') as index:
+                index.write(_INDEX_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, 0))
+                index.write(offsets)
+            os.replace(index_tmp, self.index_path)
+
+    @staticmethod
+    def _read_header(index: Any) -> Tuple[int, int]:
+        """Read the base sequence and header size of an open index file.
+
+        Index files written before compaction existed have no header; their
+        first offset is always 0, so they never start with the magic.
+        """
+        header = index.read(_INDEX_HEADER.size)
+        if len(header) < _INDEX_HEADER.size or header[:4] != _INDEX_MAGIC:
+            return 0, 0
+        _, version, base = _INDEX_HEADER.unpack(header)
+        if version != _INDEX_VERSION:
+            raise ValueError(f"Unsupported change feed index version {version}: {index.name}")
+        return base, _INDEX_HEADER.size
+
+    def append(self, records: Iterable[Dict[str, Any]], retain: Optional[int] = None) -> int:
+        """Record changes, assigning each the next sequence number.
+
+        Args:
+            records: Change records without a 'seq' key.
+            retain: Number of records to keep; the feed is compacted when
+                twice as many have built up (None to never compact).
+
+        Returns:
+            Sequence number of the last record (the current last sequence if
+            there were no records).
+        """
+        records = list(records)
+        if not records:
+            return self.last_seq()
+        with self._locked():
+            with open(self.log_path, 'ab') as log, open(self.index_path, 'a+b') as index:
+                index.seek(0)
+                base = self._read_header(index)[0]
+                index_size = os.fstat(index.fileno()).st_size
+                if index_size < _INDEX_HEADER.size:
+                    os.ftruncate(index.fileno(), 0)
+                    index.write(_INDEX_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, base))
+                    index_size = _INDEX_HEADER.size
+                count = (index_size - _INDEX_HEADER.size) // _OFFSET.size
+                if (index_size - _INDEX_HEADER.size) % _OFFSET.size:
+                    # Drop a partially written offset left by a crash
+                    os.ftruncate(index.fileno(), _INDEX_HEADER.size + count * _OFFSET.size)
+                seq = base + count
+                # Unindexed bytes from a crash before the index write are skipped
+                offset = os.fstat(log.fileno()).st_size
+                lines = []
+                offsets = []
+                for record in records:
+                    seq += 1
+                    line = json.dumps({'seq': seq, **record}).encode() + b"\n"
+                    lines.append(line)
+                    offsets.append(_OFFSET.pack(offset))
+                    offset += len(line)
+                # Data first, then the index, so every indexed offset is valid
+                log.write(b"".join(lines))
+                log.flush()
+                index.write(b"".join(offsets))
+                count += len(records)
+            if retain is not None and count > 2 * max(retain, 0):
+                self._compact(base, count, max(retain, 0))
+        return seq
+
+    def _compact(self, base: int, count: int, retain: int) -> None:
+        """Drop all but the newest records; the feed lock must be held."""
+        drop = count - retain
+        with open(self.index_path, 'rb') as index:
+            index.seek(_INDEX_HEADER.size + drop * _OFFSET.size)
+            data = index.read(retain * _OFFSET.size)
+        offsets = [offset for (offset,) in _OFFSET.iter_unpack(data)]
+        with open(self.log_path, 'rb') as log:
+            if offsets:
+                log.seek(offsets[0])
+            else:
+                log.seek(0, os.SEEK_END)
+            kept = log.read()
+        start = offsets[0] if offsets else 0
+
+        index_tmp = self.index_path.with_suffix('.idx.tmp')
+        log_tmp = self.log_path.with_suffix('.log.tmp')
+        with open(index_tmp, 'wb') as index:
+            index.write(_INDEX_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, base + drop))
+            index.write(b"".join(_OFFSET.pack(offset - start) for offset in offsets))
+            index.flush()
+            os.fsync(index.fileno())
+        with open(log_tmp, 'wb') as log:
+            log.write(kept)
+            log.flush()
+            os.fsync(log.fileno())
+        os.replace(index_tmp, self.index_path)
+        os.replace(log_tmp, self.log_path)
+
+    def compact(self, retain: int = DEFAULT_RETAIN) -> int:
+        """Drop all but the newest records.
+
+        Args:
+            retain: Number of records to keep.
+
+        Returns:
+            Number of records dropped.
+        """
+        with self._locked():
+            try:
+                with open(self.index_path, 'rb') as index:
+                    base = self._read_header(index)[0]
+                    size = os.fstat(index.fileno()).st_size
+            except FileNotFoundError:
+                return 0
+            count = max(size - _INDEX_HEADER.size, 0) // _OFFSET.size
+            retain = max(retain, 0)
+            if count <= retain:
+                return 0
+            self._compact(base, count, retain)
+            return count - retain
+
+    def _position(self) -> Tuple[int, int, int]:
+        """Get the base sequence, last sequence and header size from one index file."""
+        try:
+            with open(self.index_path, 'rb') as index:
+                base, header_size = self._read_header(index)
+                size = os.fstat(index.fileno()).st_size
+        except FileNotFoundError:
+            return 0, 0, _INDEX_HEADER.size
+        return base, base + max(size - header_size, 0) // _OFFSET.size, header_size
+
+    def last_seq(self) -> int:
+        """Get the sequence number of the newest change (0 if none)."""
+        return self._position()[1]
+
+    def changes_since(self, seq: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the changes after a sequence number.
+
+        Args:
+            seq: Last sequence number already seen (0 for everything).
+            limit: Maximum number of records to return, not counting the
+                replace records of a compacted range.
+
+        Returns:
+            Change records in sequence order. If records after seq were
+            compacted away, they are replaced by 'replace' records for
+            contacts and history carrying the base sequence.
+        """
+        with self._locked():
+            base, last, header_size = self._position()
+            seq = max(seq, 0)
+            records = _compacted(base) if seq < base else []
+            seq = max(seq, base)
+            count = last - seq
+            if limit is not None:
+                count = min(count, limit)
+            if count <= 0:
+                return records
+
+            # Also read the following offset, if any, to know where to stop
+            with open(self.index_path, 'rb') as index:
+                index.seek(header_size + (seq - base) * _OFFSET.size)
+                data = index.read((count + 1) * _OFFSET.size)
+            offsets = [offset for (offset,) in _OFFSET.iter_unpack(data[:len(data) - len(data) % _OFFSET.size])]
+            end = offsets[count] if len(offsets) > count else None
+            offsets = offsets[:count]
+
+            with open(self.log_path, 'rb') as log:
+                log.seek(offsets[0])
+                block = log.read(end - offsets[0] if end is not None else -1)
+        for offset in offsets:
+            start = offset - offsets[0]
+            stop = block.index(b"\n", start)
+            records.append(json.loads(block[start:stop]))
+        return records
+
+    def wait_for_changes(self, seq: int, timeout: Optional[float] = None,
+                         poll_interval: float = DEFAULT_POLL_INTERVAL) -> List[Dict[str, Any]]:
+        """Wait until there are changes after a sequence number.
+
+        Uses inotify on Linux and polls the index file otherwise.
+
+        Args:
+            seq: Last sequence number already seen.
+            timeout: Maximum seconds to wait (None to wait forever).
+            poll_interval: Seconds between checks when polling.
+
+        Returns:
+            The new change records, or an empty list on timeout.
+        """
+        if self._watcher is None:
+            self._watcher = _make_watcher(self.directory, self.index_path, poll_interval)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            records = self.changes_since(seq)
+            if records:
+                return records
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                return []
+            self._watcher.wait(remaining)
+
+    def close(self) -> None:
+        """Release the file watcher, if any."""
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+
+
+class MemoryChangeFeed:
+    """In-process change feed used with the memory storage backend."""
+
+    def __init__(self) -> None:
+        self._records: List[Dict[str, Any]] = []
+        self._base = 0
+        self._condition = threading.Condition()
+
+    def append(self, records: Iterable[Dict[str, Any]], retain: Optional[int] = None) -> int:
+        with self._condition:
+            for record in records:
+                self._records.append({'seq': self._base + len(self._records) + 1, **record})
+            if retain is not None and len(self._records) > 2 * max(retain, 0):
+                self._compact(max(retain, 0))
+            self._condition.notify_all()
+            return self.last_seq()
+
+    def _compact(self, retain: int) -> None:
+        drop = len(self._records) - retain
+        self._base += drop
+        del self._records[:drop]
+
+    def compact(self, retain: int = DEFAULT_RETAIN) -> int:
+        with self._condition:
+            drop = max(len(self._records) - max(retain, 0), 0)
+            if drop:
+                self._compact(max(retain, 0))
+            return drop
+
+    def last_seq(self) -> int:
+        return self._base + len(self._records)
+
+    def changes_since(self, seq: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._condition:
+            seq = max(seq, 0)
+            prefix = _compacted(self._base) if seq < self._base else []
+            records = self._records[max(seq - self._base, 0):]
+            return prefix + (records[:limit] if limit is not None else records)
+
+    def wait_for_changes(self, seq: int, timeout: Optional[float] = None,
+                         poll_interval: float = DEFAULT_POLL_INTERVAL) -> List[Dict[str, Any]]:
+        with self._condition:
+            self._condition.wait_for(lambda: self.last_seq() > seq, timeout)
+            return self.changes_since(seq)
+
+    def close(self) -> None:
+        pass
+
+
+class _PollWatcher:
+    """Wakes up when a file's size or modification time changes."""
+
+    def __init__(self, path: Path, interval: float) -> None:
+        self.path = path
+        self.interval = interval
+        self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            stat = self.path.stat()
+            return (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            return None
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            signature = self._stat()
+            if signature != self._signature:
+                self._signature = signature
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, max(deadline - time.monotonic(), 0))
+            time.sleep(delay)
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifyWatcher:
+    """Wakes up when files in a directory are written (Linux inotify)."""
+
+    def __init__(self, libc: Any, directory: Path) -> None:
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        if libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), mask) < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        # Drain queued events; the caller re-reads the feed anyway
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def _load_libc() -> Optional[Any]:
+    """Load libc if it provides inotify."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, 'inotify_init1') else None
+
+
+def _make_watcher(directory: Path, path: Path, poll_interval: float):
+    """Create an inotify watcher, falling back to stat polling."""
+    libc = _load_libc()
+    if libc is not None:
+        try:
+            return _InotifyWatcher(libc, directory)
+        except OSError:
+            pass
+    return _PollWatcher(path, poll_interval)
+
+
+_file_feeds: Dict[Path, ChangeFeed] = {}
+_memory_feeds: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+def get_change_feed():
+    """Get the change feed of the active storage backend.
+
+    Returns:
+        A ChangeFeed for file backends, or a MemoryChangeFeed for the
+        memory backend.
+    """
+    from rotary_phone.storage import get_backend
+    backend = get_backend()
+    # Changes made while reading from a snapshot belong to the live store
+    backend = getattr(backend, 'base', backend)
+    directory = getattr(backend, 'directory', None)
+    if directory is None:
+        feed = _memory_feeds.get(backend)
+        if feed is None:
+            feed = _memory_feeds[backend] = MemoryChangeFeed()
+        return feed
+    feed = _file_feeds.get(directory)
+    if feed is None:
+        feed = _file_feeds[directory] = ChangeFeed(directory)
+    return feed
+
+
+def _compacted(base: int) -> List[Dict[str, Any]]:
+    """Stand-ins for records dropped by compaction: reload both collections."""
+    return [{'seq': base, 'kind': kind, 'op': 'replace'} for kind in ('contacts', 'history')]
+
+
+def _enabled(config: Optional[Dict[str, Any]] = None) -> bool:
+    if config is None:
+        from rotary_phone.config import load_config
+        config = load_config()
+    return config.get('enable_change_feed', False)
+
+
+def _append(records: Iterable[Dict[str, Any]], config: Optional[Dict[str, Any]] = None) -> None:
+    if config is None:
+        from rotary_phone.config import load_config
+        config = load_config()
+    get_change_feed().append(records, retain=config.get('change_feed_retain', DEFAULT_RETAIN))
+
+
+def _tagged(record: Dict[str, Any], origin: Optional[str]) -> Dict[str, Any]:
+    if origin is not None:
+        record['origin'] = origin
+    return record
+
+
+def record_history(entries: List[Dict[str, str]], config: Optional[Dict[str, Any]] = None,
+                   origin: Optional[str] = None) -> None:
+    """Record appended history entries.
+
+    Args:
+        entries: Appended entries.
+        config: Loaded configuration, to avoid reading it again.
+        origin: Host the entries were replicated from (None if local).
+    """
+    if entries and _enabled(config):
+        _append((_tagged({'kind': 'history', 'op': 'append', 'entry': entry}, origin) for entry in entries),
+                config)
+
+
+def record_contact(name: str, number: Optional[str], origin: Optional[str] = None) -> None:
+    """Record a contact being added, updated or (with number None) deleted.
+
+    Args:
+        name: Contact name.
+        number: New number, or None if the contact was deleted.
+        origin: Host the change was replicated from (None if local).
+    """
+    if not _enabled():
+        return
+    if number is None:
+        record = {'kind': 'contacts', 'op': 'delete', 'name': name}
+    else:
+        record = {'kind': 'contacts', 'op': 'put', 'name': name, 'number': number}
+    _append([_tagged(record, origin)])
+
+
+def record_replace(kind: str, origin: Optional[str] = None) -> None:
+    """Record that a whole collection was rewritten.
+
+    Args:
+        kind: 'history' or 'contacts'.
+        origin: Host whose changes caused the rewrite (None if local).
+    """
+    if _enabled():
+        _append([_tagged({'kind': kind, 'op': 'replace'}, origin)])
+
+
+def changes_since(seq: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Get the changes recorded after a sequence number.
+
+    Args:
+        seq: Last sequence number already seen (0 for everything).
+        limit: Maximum number of records to return.
+
+    Returns:
+        Change records in sequence order; pass the last record's 'seq' to
+        the next call.
+    """
+    return get_change_feed().changes_since(seq, limit)
+
+
+def last_seq() -> int:
+    """Get the sequence number of the newest recorded change."""
+    return get_change_feed().last_seq()
+
+
+def follow(seq: Optional[int] = None, poll_interval: float = DEFAULT_POLL_INTERVAL,
+           timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """Yield changes as they are recorded, like ``tail -f``.
+
+    Args:
+        seq: Start after this sequence number (default: the current last one,
+            so only future changes are yielded).
+        poll_interval: Seconds between checks when inotify is unavailable.
+        timeout: Stop after this many seconds without changes (None to
+            follow forever).
+
+    Yields:
+        Change records in sequence order.
+    """
+    feed = get_change_feed()
+    if seq is None:
+        seq = feed.last_seq()
+    while True:
+        records = feed.wait_for_changes(seq, timeout, poll_interval)
+        if not records:
+            return
+        for record in records:
+            yield record
+        seq = records[-1]['seq']
@@ -2,14 +2,14 @@
 
 import click
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from rotary_phone import __version__
 from rotary_phone.config import get_config_value, load_config, set_config_value
 from rotary_phone.contacts import add_contact, delete_contact, get_contact, get_contact_count, list_contacts
 from rotary_phone.dialer import dial
-from rotary_phone.exceptions import InvalidNumberError
-from rotary_phone.export import export_data, import_data
+from rotary_phone.exceptions import DoNotCallError, InvalidNumberError
+from rotary_phone.export import export_data, export_incremental, import_chain
 from rotary_phone.history import clear_history, get_history
 from rotary_phone.stats import get_average_calls_per_day, get_dial_stats, get_top_dialed
 from rotary_phone.utils import format_number, validate_number
@@ -17,25 +17,93 @@ from rotary_phone.utils import format_number, validate_number
 
 @click.group()
 @click.version_option(version=__version__)
-def main():
+@click.option("--metrics", "show_metrics", is_flag=True, help="Collect timing metrics and print them on exit")
+@click.option("--data-dir", type=click.Path(file_okay=False), help="Data directory (default: $ROTARY_PHONE_HOME or ~/.rotary_phone)")
+@click.option("--tenant", help="Use the isolated store of this tenant (default: $ROTARY_PHONE_TENANT)")
+@click.option("--profile", "profile_mode", type=click.Choice(["cpu", "mem"]),
+              help="Profile the command: cpu (cProfile) or mem (tracemalloc)")
+@click.option("--profile-output", type=click.Path(dir_okay=False), default="rotary_phone.pstats",
+              show_default=True, help="pstats file written by --profile cpu")
+@click.option("--profile-top", default=20, show_default=True, help="Number of entries in the profile report")
+@click.pass_context
+def main(ctx: click.Context, show_metrics: bool, data_dir: Optional[str], tenant: Optional[str],
+         profile_mode: Optional[str], profile_output: str, profile_top: int):
     """Rotary Phone CLI - A simple dialing simulation tool."""
-    pass
+    from rotary_phone import metrics
+    if profile_mode is not None:
+        from rotary_phone import profiling
+        if profiling.is_active():
+            click.echo(f"Warning: already profiling via {profiling.PROFILE_ENV_VAR}; ignoring --profile", err=True)
+        else:
+            # Closed when the context tears down, after the subcommand has run
+            ctx.with_resource(profiling.profile(profile_mode, Path(profile_output), profile_top))
+    if data_dir is not None or tenant is not None:
+        from rotary_phone.config import set_data_dir
+        from rotary_phone.exceptions import ConfigError
+        try:
+            set_data_dir(Path(data_dir) if data_dir is not None else None, tenant)
+        except ConfigError as e:
+            click.echo(f"Error: {e}", err=True)
+            raise click.Abort()
+    if show_metrics or get_config_value('enable_metrics', False):
+        metrics.enable()
+        ctx.call_on_close(lambda: _finish_metrics(show_metrics))
+
+
+def _finish_metrics(show: bool) -> None:
+    """Persist this run's metrics and optionally print them."""
+    from rotary_phone import metrics
+    try:
+        metrics.save_metrics()
+    except (IOError, OSError) as e:
+        click.echo(f"Warning: could not save metrics: {e}", err=True)
+    if show:
+        summary = metrics.format_summary()
+        if summary:
+            click.echo("\nMetrics:", err=True)
+            click.echo(summary, err=True)
 
 
 @main.command()
-@click.argument("number")
+@click.argument("number", required=False)
 @click.option("--delay", default=None, type=float, help="Delay between digits (seconds)")
 @click.option("--contact", is_flag=True, help="Treat NUMBER as a contact name")
 @click.option("--quiet", is_flag=True, help="Suppress output during dialing")
-def dial_cmd(number: str, delay: Optional[float], contact: bool, quiet: bool):
+@click.option("--batch", "batch_file", type=click.Path(exists=True), help="Dial every number listed in FILE")
+@click.option("--lines", default=1, type=int, help="Number of concurrent lines for --batch")
+@click.option("--rate", default=0.0, type=float, help="Maximum calls per second for --batch (0 = unlimited)")
+@click.option("--render", "render_path", type=click.Path(), help="Write the pulse-dial audio to this WAV file instead of dialing")
+@click.option("--workers", default=1, help="Number of worker processes for --batch --render")
+def dial_cmd(number: Optional[str], delay: Optional[float], contact: bool, quiet: bool,
+             batch_file: Optional[str], lines: int, rate: float, render_path: Optional[str],
+             workers: int):
     """Dial a phone number or contact.
     
     NUMBER: Phone number to dial (supports various formats) or contact name if --contact is used
+    
+    With --batch, dial every number in FILE (one per line, optionally
+    followed by ",PRIORITY") over --lines concurrent lines at no more than
+    --rate calls per second.
+    
+    With --render, write the pulse-dial audio to a WAV file instead of
+    dialing; with --batch, --render is a directory that gets one WAV file
+    per number, rendered by --workers processes.
     """
     # Use default delay from config if not specified
     if delay is None:
         delay = get_config_value('default_delay', 0.1)
     
+    if batch_file:
+        if render_path:
+            _render_batch(Path(batch_file), contact, Path(render_path), workers)
+        else:
+            _dial_batch(Path(batch_file), delay, contact, lines, rate)
+        return
+    
+    if number is None:
+        click.echo("Error: Missing argument 'NUMBER' (or use --batch FILE).", err=True)
+        raise click.Abort()
+    
     # Try to resolve contact name if flag is set
     if contact:
         contact_number = get_contact(number)
@@ -44,20 +112,284 @@ def dial_cmd(number: str, delay: Optional[float], contact: bool, quiet: bool):
             raise click.Abort()
         formatted_contact = format_number(contact_number)
         number = contact_number
-        click.echo(f"Dialing contact: {number} ({formatted_contact})")
+        if not render_path:
+            click.echo(f"Dialing contact: {number} ({formatted_contact})")
+    
+    if render_path:
+        from rotary_phone.audio import write_wav
+        try:
+            duration = write_wav(number, Path(render_path))
+        except (ValueError, InvalidNumberError, OSError) as e:
+            click.echo(f"Error: {e}", err=True)
+            raise click.Abort()
+        click.echo(f"Rendered {format_number(number)} ({duration:.1f}s) to {render_path}")
+        return
     
+    _dial_or_abort(number, delay, quiet)
+
+
+def _dial_or_abort(number: str, delay: Optional[float], quiet: bool) -> None:
+    """Dial a number, reporting errors and aborting the command on failure."""
+    if delay is None:
+        delay = get_config_value('default_delay', 0.1)
     try:
         dial(number, delay, quiet=quiet)
-    except (ValueError, InvalidNumberError) as e:
+    except (ValueError, InvalidNumberError, DoNotCallError) as e:
         click.echo(f"Error: {e}", err=True)
         raise click.Abort()
 
 
+@main.command()
+@click.argument("n", default=1, type=click.IntRange(min=1))
+@click.option("--delay", default=None, type=float, help="Delay between digits (seconds)")
+@click.option("--quiet", is_flag=True, help="Suppress output during dialing")
+def redial(n: int, delay: Optional[float], quiet: bool):
+    """Dial the last number again, or the Nth most recent one.
+    
+    N: 1 for the last call (default), 2 for the one before it, and so on
+    """
+    from rotary_phone.history import get_last_call
+    entry = get_last_call(n)
+    if entry is None:
+        click.echo(f"Error: Call history has fewer than {n} call{'s' if n != 1 else ''}.", err=True)
+        raise click.Abort()
+    _dial_or_abort(entry['number'], delay, quiet)
+
+
+@main.group(name="speed-dial")
+def speed_dial():
+    """Manage speed-dial slots 0-9."""
+    pass
+
+
+@speed_dial.command(name="set")
+@click.argument("slot", type=click.IntRange(0, 9))
+@click.argument("number")
+@click.option("--contact", is_flag=True, help="Treat NUMBER as a contact name")
+def speed_dial_set(slot: int, number: str, contact: bool):
+    """Store a number (or a contact's current number) in SLOT."""
+    from rotary_phone.speeddial import set_speed_dial
+    if contact:
+        contact_number = get_contact(number)
+        if not contact_number:
+            click.echo(f"Error: Contact not found: {number}", err=True)
+            raise click.Abort()
+        number = contact_number
+    try:
+        stored = set_speed_dial(slot, number)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    click.echo(f"Speed dial {slot} -> {format_number(stored)}")
+
+
+@speed_dial.command(name="clear")
+@click.argument("slot", type=click.IntRange(0, 9))
+def speed_dial_clear(slot: int):
+    """Empty SLOT."""
+    from rotary_phone.speeddial import clear_speed_dial
+    clear_speed_dial(slot)
+    click.echo(f"Speed dial {slot} cleared.")
+
+
+@speed_dial.command(name="list")
+def speed_dial_list():
+    """Show the filled speed-dial slots."""
+    from rotary_phone.contacts import get_contacts_by_number
+    from rotary_phone.speeddial import list_speed_dials
+    slots = list_speed_dials()
+    if not slots:
+        click.echo("No speed-dial slots set.")
+        return
+    for slot, number in slots.items():
+        names = get_contacts_by_number(number)
+        label = f" ({', '.join(names)})" if names else ""
+        click.echo(f"  {slot}: {format_number(number)}{label}")
+
+
+@speed_dial.command(name="call")
+@click.argument("slot", type=click.IntRange(0, 9))
+@click.option("--delay", default=None, type=float, help="Delay between digits (seconds)")
+@click.option("--quiet", is_flag=True, help="Suppress output during dialing")
+def speed_dial_call(slot: int, delay: Optional[float], quiet: bool):
+    """Dial the number in SLOT."""
+    from rotary_phone.speeddial import get_speed_dial
+    number = get_speed_dial(slot)
+    if number is None:
+        click.echo(f"Error: Speed dial {slot} is empty.", err=True)
+        raise click.Abort()
+    _dial_or_abort(number, delay, quiet)
+
+
+def _load_batch_calls(batch_file: Path, contact: bool) -> List[tuple]:
+    """Read a batch file, resolving contact names if requested."""
+    from rotary_phone.scheduler import load_batch_file
+    try:
+        calls = load_batch_file(batch_file)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    
+    if contact:
+        contacts_dict = list_contacts()
+        resolved = []
+        for name, priority in calls:
+            if name not in contacts_dict:
+                click.echo(f"Error: Contact not found: {name}", err=True)
+                raise click.Abort()
+            resolved.append((contacts_dict[name], priority))
+        calls = resolved
+    return calls
+
+
+def _render_batch(batch_file: Path, contact: bool, output_dir: Path, workers: int) -> None:
+    """Render the pulse-dial audio of every number in a batch file."""
+    from rotary_phone.audio import render_many
+    calls = _load_batch_calls(batch_file, contact)
+    try:
+        paths = render_many([number for number, _ in calls], output_dir, workers=workers)
+    except (ValueError, InvalidNumberError, OSError) as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    click.echo(f"Rendered {len(paths)} numbers to {output_dir}")
+
+
+def _dial_batch(batch_file: Path, delay: float, contact: bool, lines: int, rate: float) -> None:
+    """Dial a batch file through a DialScheduler and print its statistics."""
+    from rotary_phone.scheduler import DialScheduler
+    calls = _load_batch_calls(batch_file, contact)
+    
+    try:
+        scheduler = DialScheduler(lines=lines, rate=rate, delay=delay)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    
+    click.echo(f"Dialing {len(calls)} calls over {lines} line{'s' if lines > 1 else ''}...")
+    stats_data = scheduler.run(calls)
+    
+    for result in scheduler.results():
+        if result['error']:
+            click.echo(f"  Failed: {result['number']} ({result['error']})", err=True)
+    
+    latency = stats_data['queue_latency']
+    click.echo(f"Completed: {stats_data['calls'] - stats_data['failed']}, failed: {stats_data['failed']}")
+    click.echo(f"Elapsed: {stats_data['elapsed']:.2f}s")
+    click.echo(
+        f"Queue latency: avg {latency['avg'] * 1000:.1f} ms, "
+        f"p95 {latency['p95'] * 1000:.1f} ms, max {latency['max'] * 1000:.1f} ms"
+    )
+    for line in stats_data['lines']:
+        click.echo(f"  Line {line['line']}: {line['calls']} calls, {line['utilization'] * 100:.1f}% utilized")
+
+
 @main.command()
 @click.option("--limit", default=10, help="Number of recent calls to show")
 @click.option("--days", type=int, help="Show calls from the last N days")
-def history(limit: int, days: Optional[int]):
-    """Show call history."""
+@click.option("--offset", type=int, help="Skip this many calls (oldest first)")
+@click.option("--page-size", type=int, help="Show at most this many calls (oldest first)")
+@click.option("--after", help="Show calls after this cursor or ISO timestamp (oldest first)")
+@click.option("--number", help="Show only calls to this number")
+@click.option("--contact", multiple=True, help="Show only calls to this contact (repeatable)")
+@click.option("--since", help="Show calls at or after this ISO date/timestamp")
+@click.option("--until", help="Show calls at or before this ISO date/timestamp")
+@click.option("--with-names", is_flag=True, help="Show the contact name for each call")
+@click.option("--follow", "-f", is_flag=True, help="Keep running and print new calls as they are made")
+@click.option("--format", "output_format", type=click.Choice(["table", "jsonl", "csv"]), default="table",
+              help="Output format")
+def history(limit: int, days: Optional[int], offset: Optional[int], page_size: Optional[int],
+            after: Optional[str], number: Optional[str], contact: tuple, since: Optional[str],
+            until: Optional[str], with_names: bool, follow: bool, output_format: str):
+    """Show call history.
+    
+    By default shows the most recent calls. With --offset, --page-size,
+    --after or a non-table --format, calls are streamed oldest first from
+    storage. When a page is full, the cursor that gets the next one is
+    printed to stderr; pass it as --after.
+    
+    --number, --contact, --since and --until select calls through the
+    history index and show the newest --limit matches; they cannot be
+    combined with --offset, --page-size or --after.
+    
+    --with-names adds the contact name of each number, looked up from a
+    single contacts load.
+    
+    --follow shows the last --limit calls and then each new call as it is
+    recorded, like tail -f, until interrupted.
+    """
+    from rotary_phone.history import annotate_history
+    from rotary_phone.utils import format_timestamp
+    columns = ['number', 'formatted', 'timestamp']
+    
+    def table_row(entry):
+        row = f"  {entry['formatted']:<20} {format_timestamp(entry['timestamp'])}"
+        if with_names and entry['name']:
+            row += f"  {entry['name']}"
+        return row
+    
+    if with_names:
+        columns.append('name')
+    if follow:
+        _require_enabled('enable_change_feed', "--follow")
+        _follow_history(limit, output_format, columns, table_row, with_names)
+        return
+    if number is not None or contact or since is not None or until is not None:
+        from rotary_phone.query import query_history
+        if offset is not None or page_size is not None or after is not None:
+            raise click.UsageError(
+                "--offset, --page-size and --after cannot be combined with --number, --contact, "
+                "--since or --until"
+            )
+        if days:
+            from datetime import timedelta
+            from rotary_phone.clock import get_clock
+            cutoff = (get_clock().now() - timedelta(days=days)).isoformat()
+            since = max(since, cutoff) if since is not None else cutoff
+        try:
+            entries = query_history(number=number, since=since, until=until,
+                                    contact=list(contact) or None, limit=limit)
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            raise click.Abort()
+        if not entries and output_format == "table":
+            click.echo("No matching calls.")
+            return
+        records = reversed(entries)
+        _write_output(annotate_history(records) if with_names else records, output_format, columns, table_row)
+        return
+    
+    streaming = offset is not None or page_size is not None or after is not None or output_format != "table"
+    if streaming:
+        from rotary_phone.history import iter_history, parse_history_cursor
+        if after is not None:
+            try:
+                timestamp, ties = parse_history_cursor(after)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="--after")
+            timestamp = _parse_timestamp_option(timestamp, "--after")
+            after = f"{timestamp}#{ties}" if ties is not None else timestamp
+        if days:
+            from datetime import timedelta
+            from rotary_phone.clock import get_clock
+            cutoff = (get_clock().now() - timedelta(days=days)).isoformat()
+            if after is None or parse_history_cursor(after)[0] < cutoff:
+                after = cutoff
+        
+        shown = 0
+        next_after = None
+        
+        def entries():
+            nonlocal shown, next_after
+            for entry, cursor in iter_history(offset=offset or 0, limit=page_size, after=after, cursors=True):
+                shown += 1
+                next_after = cursor
+                yield entry
+        
+        _write_output(annotate_history(entries()) if with_names else entries(), output_format, columns, table_row)
+        if page_size is not None and shown == page_size:
+            click.echo(f"Next page: --after {next_after}", err=True)
+        return
+    
     from rotary_phone.history import get_recent_calls
     if days:
         history_list = get_recent_calls(days)
@@ -69,21 +401,41 @@ def history(limit: int, days: Optional[int]):
         click.echo("No call history.")
         return
     
-    from rotary_phone.utils import format_timestamp
     click.echo(f"Recent calls (showing last {min(limit, len(history_list))}):")
     click.echo("-" * 50)
+    if with_names:
+        history_list = list(annotate_history(history_list))
     for entry in reversed(history_list):
-        timestamp = format_timestamp(entry['timestamp'])
-        click.echo(f"  {entry['formatted']:<20} {timestamp}")
+        click.echo(table_row(entry))
 
 
 @main.command()
 @click.option("--search", help="Search contacts by name")
-def contacts(search: Optional[str]):
+@click.option("--offset", type=int, help="Skip this many contacts")
+@click.option("--page-size", type=int, help="Show at most this many contacts")
+@click.option("--after", help="Show contacts whose name sorts after this name")
+@click.option("--format", "output_format", type=click.Choice(["table", "jsonl", "csv"]), default="table",
+              help="Output format")
+def contacts(search: Optional[str], offset: Optional[int], page_size: Optional[int],
+             after: Optional[str], output_format: str):
     """List all contacts.
     
-    Use --search to filter contacts by name.
+    Use --search to filter contacts by name. With --offset, --page-size,
+    --after or a non-table --format, contacts are streamed in name order.
     """
+    streaming = offset is not None or page_size is not None or after is not None or output_format != "table"
+    if streaming:
+        from rotary_phone.contacts import iter_contacts
+        records = (
+            {'name': name, 'number': number, 'formatted': format_number(number)}
+            for name, number in iter_contacts(offset=offset or 0, limit=page_size, after=after, query=search)
+        )
+        _write_output(
+            records, output_format, ['name', 'number', 'formatted'],
+            lambda record: f"  {record['name']:<20} {record['formatted']}",
+        )
+        return
+    
     from rotary_phone.contacts import search_contacts
     if search:
         contacts_dict = search_contacts(search)
@@ -105,6 +457,123 @@ def contacts(search: Optional[str]):
         click.echo(f"  {name:<20} {formatted}")
 
 
+@main.command()
+@click.option("--digits", "pattern", required=True,
+              help="Digit pattern, e.g. '555-***-12**', '^555' (prefix) or '1234$' (suffix)")
+def search(pattern: str):
+    """Find contacts and called numbers by digit pattern.
+    
+    '*' or '?' matches any one digit; spaces, dashes, dots and parentheses
+    are ignored. The pattern matches anywhere in a number unless anchored
+    with a leading '^' (or '+') or a trailing '$'.
+    """
+    from rotary_phone.digitindex import search_digits
+    try:
+        results = search_digits(pattern)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    
+    if not results['contacts'] and not results['calls']:
+        click.echo(f"No numbers found matching '{pattern}'.")
+        return
+    if results['contacts']:
+        click.echo(f"Contacts matching '{pattern}' ({len(results['contacts'])}):")
+        for name, number in results['contacts'].items():
+            click.echo(f"  {name:<20} {format_number(number)}")
+    if results['calls']:
+        click.echo(f"Called numbers matching '{pattern}' ({len(results['calls'])}):")
+        for call in results['calls']:
+            count = call['calls']
+            click.echo(f"  {format_number(call['number']):<20} {count} call{'s' if count != 1 else ''}, "
+                       f"last {call['last_call'][:19]}")
+
+
+def _require_enabled(key: str, feature: str) -> None:
+    """Stop with a usage error if an opt-in config option is off."""
+    from rotary_phone.config import get_config_value
+    if not get_config_value(key, False):
+        raise click.UsageError(f"{feature} needs {key} (python main.py config set {key} true)")
+
+
+def _parse_timestamp_option(value: str, option: str) -> str:
+    """Validate an ISO date/timestamp option and return it in canonical form.
+
+    A date stays a date, so that as an upper bound it covers the whole day.
+    """
+    from datetime import date, datetime
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).isoformat()
+    except ValueError:
+        click.echo(f"Error: Invalid timestamp for {option}: {value}", err=True)
+        raise click.Abort()
+
+
+def _follow_history(limit: int, output_format: str, columns, table_row, with_names: bool) -> None:
+    """Print the latest calls, then new calls from the change feed until interrupted."""
+    import json
+    import sys
+    from rotary_phone.changefeed import follow, last_seq
+    from rotary_phone.history import annotate_history
+    from rotary_phone.output import RecordWriter
+    
+    # Take the position first so no call made meanwhile is missed; the
+    # feed records of calls already in the initial listing are skipped
+    seq = last_seq()
+    writer = RecordWriter(sys.stdout, output_format, columns, table_row)
+    
+    def emit(entries):
+        for entry in annotate_history(entries) if with_names else entries:
+            writer.write_record(entry)
+        writer.flush()
+    
+    try:
+        shown = list(reversed(get_history(limit)))
+        emit(shown)
+        shown_keys = {json.dumps(entry, sort_keys=True) for entry in shown}
+        for record in follow(seq):
+            if record['kind'] == 'history' and record['op'] == 'append':
+                key = json.dumps(record['entry'], sort_keys=True) if shown_keys else None
+                if key in shown_keys:
+                    shown_keys.discard(key)
+                    continue
+                emit([record['entry']])
+            elif record['kind'] == 'history' and record['op'] == 'replace':
+                click.echo("(history was replaced)", err=True)
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        _stdout_closed()
+
+
+def _stdout_closed() -> None:
+    """Exit after the reader of stdout went away (e.g. piped into head).
+    
+    Python flushes stdout again at exit; pointing it at devnull keeps that
+    flush from failing with another BrokenPipeError.
+    """
+    import os
+    import sys
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    sys.exit(1)
+
+
+def _write_output(records, output_format: str, columns, table_row) -> None:
+    """Stream records to stdout through a buffered RecordWriter."""
+    import sys
+    from rotary_phone.output import RecordWriter
+    writer = RecordWriter(sys.stdout, output_format, columns, table_row)
+    try:
+        writer.write_records(records)
+    except BrokenPipeError:
+        _stdout_closed()
+
+
 @main.command()
 @click.argument("name")
 @click.argument("number")
@@ -180,9 +649,34 @@ def clear():
 
 @main.command()
 @click.option("--top", default=5, help="Number of top dialed numbers to show")
+@click.option("--by-name", is_flag=True, help="Group --top by contact instead of by number")
 @click.option("--daily", is_flag=True, help="Show daily call statistics")
-def stats(top: int, daily: bool):
-    """Show dialing statistics."""
+@click.option("--hourly", is_flag=True, help="Show calls by hour of day")
+@click.option("--since", help="Start date/time for --daily and --hourly (ISO format)")
+@click.option("--until", help="End date/time for --daily and --hourly (ISO format)")
+def stats(top: int, by_name: bool, daily: bool, hourly: bool, since: Optional[str], until: Optional[str]):
+    """Show dialing statistics.
+    
+    With --by-name, --top counts calls per contact, adding up every number
+    format that belongs to the same contact.
+    
+    --daily and --hourly are answered from the rollup tables, which keep
+    counts after raw history has been trimmed or cleared.
+    
+    All figures are read from one snapshot, so they agree with each other
+    even while calls are being recorded.
+    """
+    from rotary_phone.snapshot import read_snapshot
+    if daily or hourly:
+        from rotary_phone.rollups import ensure_rollups, get_daily_counts, get_hourly_counts
+        _require_enabled('enable_rollups', "--daily and --hourly")
+        if since is not None:
+            since = _parse_timestamp_option(since, "--since")
+        if until is not None:
+            until = _parse_timestamp_option(until, "--until")
+        ensure_rollups()
+    click.get_current_context().with_resource(read_snapshot())
+    
     stats_data = get_dial_stats()
     
     click.echo("Statistics:")
@@ -195,7 +689,13 @@ def stats(top: int, daily: bool):
         formatted = format_number(stats_data['most_dialed'])
         click.echo(f"\nMost dialed: {formatted} ({stats_data['most_dialed_count']} times)")
         
-        if top > 0:
+        if top > 0 and by_name:
+            from rotary_phone.stats import get_top_contacts
+            click.echo(f"\nTop {top} most called contacts:")
+            for i, (names, number, count) in enumerate(get_top_contacts(top), 1):
+                label = names if names is not None else format_number(number)
+                click.echo(f"  {i}. {label} - {count} time{'s' if count > 1 else ''}")
+        elif top > 0:
             click.echo(f"\nTop {top} most dialed numbers:")
             top_dialed = get_top_dialed(top)
             for i, (number, count) in enumerate(top_dialed, 1):
@@ -209,45 +709,200 @@ def stats(top: int, daily: bool):
     
     # Show daily statistics if requested
     if daily:
-        from rotary_phone.stats import get_calls_by_day
-        daily_stats = get_calls_by_day()
+        daily_stats = get_daily_counts(since, until)
         if daily_stats:
+            # Without an explicit range, show the most recent 10 days
+            rows = sorted(daily_stats.items(), reverse=True)
+            if since is None and until is None:
+                rows = rows[:10]
             click.echo("\nDaily call statistics:")
-            for date, count in sorted(daily_stats.items(), reverse=True)[:10]:
+            for date, count in rows:
                 click.echo(f"  {date}: {count} call{'s' if count > 1 else ''}")
+    
+    if hourly:
+        hourly_stats = get_hourly_counts(since, until)
+        if hourly_stats:
+            click.echo("\nCalls by hour of day:")
+            for hour in range(24):
+                count = hourly_stats.get(hour, 0)
+                if count:
+                    click.echo(f"  {hour:02d}:00  {count} call{'s' if count > 1 else ''}")
 
 
 @main.command()
 @click.argument("output_file", type=click.Path())
 @click.option("--no-history", is_flag=True, help="Exclude history from export")
-def export(output_file: str, no_history: bool):
+@click.option("--incremental", is_flag=True, help="Export only changes since the --since backup")
+@click.option("--since", "since_file", type=click.Path(exists=True, dir_okay=False),
+              help="Backup the incremental export extends")
+def export(output_file: str, no_history: bool, incremental: bool, since_file: Optional[str]):
     """Export contacts and history to a JSON file.
     
     OUTPUT_FILE: Path to the output JSON file
+    
+    Contacts and history are exported from one consistent snapshot. With
+    --incremental, only the contacts changed and the calls made since the
+    --since backup (full or incremental) are written.
     """
+    from rotary_phone.exceptions import ExportError
     output_path = Path(output_file)
-    export_data(output_path, include_history=not no_history)
-    click.echo(f"Data exported to {output_file}")
+    if incremental != (since_file is not None):
+        click.echo("Error: --incremental and --since must be used together", err=True)
+        raise click.Abort()
+    
+    try:
+        if incremental:
+            result = export_incremental(output_path, Path(since_file), include_history=not no_history)
+        else:
+            export_data(output_path, include_history=not no_history)
+    except ExportError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    
+    if incremental:
+        click.echo(f"Incremental backup written to {output_file}: "
+                   f"{result['contacts_changed']} contacts changed, "
+                   f"{result['contacts_deleted']} deleted, "
+                   f"{result['history_entries']} history entries")
+    else:
+        click.echo(f"Data exported to {output_file}")
 
 
 @main.command()
-@click.argument("input_file", type=click.Path(exists=True))
+@click.argument("input_files", nargs=-1, required=True, type=click.Path(exists=True))
 @click.option("--replace", is_flag=True, help="Replace existing data instead of merging")
-def import_cmd(input_file: str, replace: bool):
-    """Import contacts and history from a JSON file.
+def import_cmd(input_files: Tuple[str, ...], replace: bool):
+    """Import contacts and history from JSON backup files.
     
-    INPUT_FILE: Path to the input JSON file
+    INPUT_FILES: A full backup, optionally followed by its incremental
+    backups oldest first. The chain is verified before anything is
+    imported.
     """
-    input_path = Path(input_file)
-    stats = import_data(input_path, merge=not replace)
+    from rotary_phone.exceptions import ImportError
+    try:
+        stats = import_chain([Path(f) for f in input_files], merge=not replace)
+    except ImportError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
     
     click.echo("Import complete:")
     click.echo(f"  Contacts added: {stats['contacts_added']}")
     if stats['contacts_skipped'] > 0:
         click.echo(f"  Contacts skipped: {stats['contacts_skipped']}")
+    if stats['contacts_deleted'] > 0:
+        click.echo(f"  Contacts deleted: {stats['contacts_deleted']}")
     click.echo(f"  History entries added: {stats['history_entries_added']}")
 
 
+@main.command()
+@click.option("--contacts", "contacts_count", default=1000, help="Number of contacts to generate")
+@click.option("--calls", "calls_count", default=10000, help="Number of history entries to generate")
+@click.option("--days", default=30, help="Number of days the history spans")
+@click.option("--seed", default=0, help="Random seed for reproducible data")
+@click.option("--workers", default=1, help="Number of worker processes")
+@click.option("--zipf", "zipf_exponent", default=1.1, help="Skew of the called-number distribution")
+@click.option("--direct", is_flag=True, help="Write history straight to disk instead of via save_history")
+@click.confirmation_option(prompt="This replaces existing contacts and history. Continue?")
+def loadgen(contacts_count: int, calls_count: int, days: int, seed: int, workers: int,
+            zipf_exponent: float, direct: bool):
+    """Generate synthetic contacts and call history for load testing."""
+    from rotary_phone.loadgen import generate_workload
+    try:
+        result = generate_workload(contacts_count, calls_count, days=days, seed=seed,
+                                   workers=workers, direct=direct, zipf_exponent=zipf_exponent)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    
+    click.echo(f"Generated {result['contacts']} contacts and {result['calls']} calls over {days} days.")
+    history_limit = get_config_value('history_limit', 100)
+    if result['calls'] > history_limit:
+        click.echo(
+            f"Note: history_limit is {history_limit}; the next dial will trim history to that size.",
+            err=True,
+        )
+
+
+@main.group()
+def rollups():
+    """Manage materialized call-count rollups."""
+    pass
+
+
+@rollups.command(name="rebuild")
+def rollups_rebuild():
+    """Rebuild rollups from the current call history.
+    
+    Counts for calls no longer in history are lost.
+    """
+    from rotary_phone.rollups import rebuild_rollups
+    count = rebuild_rollups()
+    click.echo(f"Rebuilt rollups from {count} history entries.")
+
+
+@rollups.command(name="compact")
+def rollups_compact():
+    """Fold expired minute and hour buckets into coarser tiers."""
+    from rotary_phone.rollups import compact, load_rollups, save_rollups
+    data = load_rollups()
+    # Force a pass even if one already ran this hour
+    data['compacted_through'] = ''
+    compact(data)
+    save_rollups(data)
+    click.echo(
+        f"Rollup buckets: {len(data['minute'])} minute, {len(data['hour'])} hour, {len(data['day'])} day"
+    )
+
+
+@main.group()
+def dnc():
+    """Manage the do-not-call list."""
+    pass
+
+
+@dnc.command(name="import")
+@click.argument("input_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--append", is_flag=True, help="Keep the numbers already on the list")
+def dnc_import(input_file: str, append: bool):
+    """Build the do-not-call list from a file with one number per line.
+    
+    Numbers without a country code are read in the default_region. The
+    list replaces the previous one unless --append is given.
+    """
+    from rotary_phone.dnc import import_dnc_file
+    try:
+        count = import_dnc_file(Path(input_file), append=append)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    click.echo(f"Do-not-call list now holds {count} number{'s' if count != 1 else ''}.")
+
+
+@dnc.command(name="check")
+@click.argument("numbers", nargs=-1, required=True)
+def dnc_check(numbers: Tuple[str, ...]):
+    """Check whether numbers are on the do-not-call list.
+    
+    Exits with status 1 if any number is listed.
+    """
+    from rotary_phone.dnc import is_do_not_call
+    listed = False
+    for number in numbers:
+        blocked = is_do_not_call(number)
+        listed = listed or blocked
+        click.echo(f"{number}: {'do not call' if blocked else 'ok'}")
+    if listed:
+        click.get_current_context().exit(1)
+
+
+@dnc.command(name="clear")
+def dnc_clear():
+    """Remove the do-not-call list."""
+    from rotary_phone.dnc import clear_dnc_list
+    clear_dnc_list()
+    click.echo("Do-not-call list cleared.")
+
+
 @main.group()
 def config():
     """Manage configuration settings."""
@@ -311,3 +966,173 @@ def unset(key: str):
         click.echo(f"Configuration key '{key}' not found", err=True)
         raise click.Abort()
 
+
+@main.command(name="metrics")
+@click.option("--prometheus", "prometheus_file", type=click.Path(), help="Write metrics in Prometheus text format to FILE")
+@click.option("--reset", is_flag=True, help="Discard accumulated metrics")
+def metrics_cmd(prometheus_file: Optional[str], reset: bool):
+    """Show metrics accumulated by runs with --metrics enabled."""
+    from rotary_phone import metrics
+    if reset:
+        metrics.clear_metrics()
+        click.echo("Metrics reset.")
+        return
+    
+    data = metrics.load_metrics()
+    if prometheus_file:
+        metrics.export_prometheus(Path(prometheus_file), data)
+        click.echo(f"Metrics exported to {prometheus_file}")
+        return
+    
+    summary = metrics.format_summary(data)
+    if not summary:
+        click.echo("No metrics recorded. Run commands with --metrics to collect them.")
+        return
+    click.echo(summary)
+
+
+@main.command()
+@click.option("--since", "since_seq", default=0, show_default=True, help="Show changes after this sequence number")
+@click.option("--limit", type=int, help="Show at most this many changes")
+@click.option("--follow", "-f", is_flag=True, help="Keep running and print new changes as they happen")
+def changes(since_seq: int, limit: Optional[int], follow: bool):
+    """Print the change feed as JSON lines.
+    
+    Each line is a change to contacts or history with its sequence number;
+    pass the last 'seq' seen as --since to resume.
+    """
+    import json
+    from rotary_phone.changefeed import changes_since, follow as follow_changes
+    _require_enabled('enable_change_feed', "The changes command")
+    records = changes_since(since_seq, limit)
+    for record in records:
+        click.echo(json.dumps(record))
+    if not follow:
+        return
+    seq = records[-1]['seq'] if records else since_seq
+    try:
+        for record in follow_changes(seq):
+            click.echo(json.dumps(record))
+    except KeyboardInterrupt:
+        pass
+
+
+@main.command()
+@click.option("--shards", type=int, help="Also show which of N shard tenants each NUMBER maps to")
+@click.argument("numbers", nargs=-1)
+def tenants(shards: Optional[int], numbers: tuple):
+    """List tenant stores, or map NUMBERS to shard tenants.
+    
+    With --shards N, print the shard tenant ('shard-NN') that owns each
+    NUMBER, for routing work to one worker per shard.
+    """
+    from rotary_phone.config import get_data_home, list_tenants, shard_for_number
+    if shards is not None:
+        if shards <= 0:
+            click.echo("Error: --shards must be positive", err=True)
+            raise click.Abort()
+        for number in numbers:
+            click.echo(f"{number}\t{shard_for_number(number, shards)}")
+        return
+    
+    names = list_tenants()
+    if not names:
+        click.echo(f"No tenants under {get_data_home()}.")
+        return
+    click.echo(f"Tenants under {get_data_home()} ({len(names)}):")
+    for name in names:
+        click.echo(f"  {name}")
+
+
+@main.command()
+@click.option("--repair", is_flag=True, help="Salvage damaged files and rewrite a clean store")
+@click.option("--workers", type=int, help="Threads verifying checksums (default: CPU count)")
+def fsck(repair: bool, workers: Optional[int]):
+    """Verify the checksums of the data files.
+    
+    Files that fail their checksums, fail to decode, or were moved aside as
+    FILE.corrupt-N when they failed to load are reported. With --repair the
+    records that still decode are kept and the files are rewritten.
+    Exits with status 1 if problems remain.
+    """
+    from rotary_phone.integrity import fsck as check_store
+    from rotary_phone.storage import get_backend_name
+    if get_backend_name() == 'memory':
+        click.echo("Nothing to check: the memory backend keeps no files.")
+        return
+    try:
+        reports = check_store(repair=repair, workers=workers)
+    except (IOError, OSError) as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    
+    for report in reports:
+        line = f"  {report['file']:<28} {report['status']}"
+        if report['detail']:
+            line += f": {report['detail']}"
+        click.echo(line)
+    problems = [r for r in reports if r['status'] not in ('ok', 'repaired')]
+    total = sum(r['size'] for r in reports)
+    click.echo(f"Checked {len(reports)} file{'s' if len(reports) != 1 else ''} ({total} bytes), "
+               f"{len(problems)} with problems.")
+    if problems:
+        if not repair:
+            click.echo("Run 'fsck --repair' to salvage them.", err=True)
+        click.get_current_context().exit(1)
+
+
+@main.group()
+def replicate():
+    """Replicate contacts and history with other hosts."""
+    pass
+
+
+@replicate.command(name="init")
+@click.option("--host", "host_id", help="Host ID for this data directory (default: random)")
+def replicate_init(host_id: Optional[str]):
+    """Make this data directory a replica with a host ID."""
+    from rotary_phone.exceptions import ReplicationError
+    from rotary_phone.replication import init_replica
+    try:
+        host_id = init_replica(host_id)
+    except ReplicationError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    click.echo(f"Replicating as {host_id}.")
+
+
+@replicate.command(name="sync")
+@click.argument("shared_dir", required=False, type=click.Path(file_okay=False))
+def replicate_sync(shared_dir: Optional[str]):
+    """Exchange changes with other hosts through SHARED_DIR.
+    
+    SHARED_DIR is a directory every host can read and write, such as a
+    network share; it defaults to the replication_dir config option.
+    """
+    from rotary_phone.exceptions import ReplicationError
+    from rotary_phone.replication import sync
+    try:
+        stats = sync(Path(shared_dir) if shared_dir else None)
+    except (ReplicationError, IOError, OSError) as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    click.echo(
+        f"{stats['host']}: published {stats['published']}, received {stats['received']} "
+        f"({stats['contacts_changed']} contacts changed, {stats['history_added']} calls added)."
+    )
+
+
+@replicate.command(name="status")
+def replicate_status():
+    """Show the host ID and what has been replicated."""
+    from rotary_phone.replication import get_replica_state
+    state = get_replica_state()
+    if state is None:
+        click.echo("Not a replica yet; run 'replicate sync' or 'replicate init'.")
+        return
+    click.echo(f"Host: {state['host']}")
+    click.echo(f"Lamport clock: {state['clock']}")
+    click.echo(f"Operations published: {state['ops']}")
+    for host, applied in sorted(state['vector'].items()):
+        if host != state['host']:
+            click.echo(f"  from {host}: {applied} operations applied")
@@ -0,0 +1,184 @@
+"""Pluggable clocks for dialing, history and statistics.
+
+Everything that waits or timestamps goes through :func:`get_clock`. The
+default :class:`SystemClock` uses real time; installing a
+:class:`VirtualClock` makes sleeps instant and timestamps reproducible, so
+long simulations run at full speed.
+
+Deadlines are absolute ``monotonic_ns()`` values: waiting with
+``sleep_until()`` does not accumulate the overshoot of successive sleeps.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, Optional, Union
+
+# Sleep until this close to a deadline, then spin for the rest
+SPIN_THRESHOLD_NS = 1_000_000
+
+
+class SystemClock:
+    """Clock backed by real wall and monotonic time."""
+
+    def now(self) -> datetime:
+        """Get the current local date and time."""
+        return datetime.now()
+
+    def monotonic(self) -> float:
+        """Get a monotonic time in seconds."""
+        return time.monotonic()
+
+    def monotonic_ns(self) -> int:
+        """Get a high-resolution monotonic time in nanoseconds."""
+        return time.perf_counter_ns()
+
+    def sleep(self, seconds: float) -> None:
+        """Block for the given number of seconds."""
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def sleep_until(self, deadline_ns: int) -> None:
+        """Block until monotonic_ns() reaches a deadline.
+
+        Sleeps until SPIN_THRESHOLD_NS before the deadline, then spins for
+        the rest, since time.sleep() may overshoot by a scheduler tick. The
+        spin yields the GIL on every iteration so other dialing threads keep
+        running.
+
+        Args:
+            deadline_ns: Deadline on the monotonic_ns() scale.
+        """
+        remaining = deadline_ns - time.perf_counter_ns()
+        if remaining > SPIN_THRESHOLD_NS:
+            time.sleep((remaining - SPIN_THRESHOLD_NS) / 1e9)
+        while time.perf_counter_ns() < deadline_ns:
+            time.sleep(0)
+
+
+class VirtualClock:
+    """Simulated clock whose time only moves when advanced.
+
+    Sleeping advances the clock instantly instead of blocking, so code that
+    waits between digits runs at full speed and produces deterministic
+    timestamps.
+    """
+
+    def __init__(self, start: Optional[datetime] = None) -> None:
+        """Create a virtual clock.
+
+        Args:
+            start: Wall-clock time at which the clock starts
+                (default: 2024-01-01 00:00:00).
+        """
+        self._start = start if start is not None else datetime(2024, 1, 1)
+        self._elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        """Get the simulated date and time."""
+        with self._lock:
+            return self._start + timedelta(seconds=self._elapsed)
+
+    def monotonic(self) -> float:
+        """Get seconds elapsed since the clock started."""
+        with self._lock:
+            return self._elapsed
+
+    def monotonic_ns(self) -> int:
+        """Get nanoseconds elapsed since the clock started."""
+        with self._lock:
+            return round(self._elapsed * 1e9)
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the clock by the given number of seconds."""
+        self.advance(seconds)
+
+    def sleep_until(self, deadline_ns: int) -> None:
+        """Advance the clock to a deadline on the monotonic_ns() scale."""
+        with self._lock:
+            self._elapsed = max(self._elapsed, deadline_ns / 1e9)
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward.
+
+        Args:
+            seconds: Amount to advance; negative values are ignored.
+        """
+        if seconds > 0:
+            with self._lock:
+                self._elapsed += seconds
+
+    def set(self, when: datetime) -> None:
+        """Jump to a specific time, which must not be in the simulated past.
+
+        Args:
+            when: New simulated date and time.
+
+        Raises:
+            ValueError: If ``when`` is earlier than the current simulated time.
+        """
+        with self._lock:
+            elapsed = (when - self._start).total_seconds()
+            if elapsed < self._elapsed:
+                raise ValueError("Virtual clock cannot move backwards")
+            self._elapsed = elapsed
+
+    def seek(self, seconds: float) -> None:
+        """Move to a point in simulated time, backwards if need be.
+
+        Event-driven simulations use this to interleave several timelines
+        (such as the lines of a DialScheduler) on one clock.
+
+        Args:
+            seconds: Seconds since the clock started.
+        """
+        with self._lock:
+            self._elapsed = max(seconds, 0.0)
+
+
+Clock = Union[SystemClock, VirtualClock]
+
+_clock: Clock = SystemClock()
+
+
+def get_clock() -> Clock:
+    """Get the active clock.
+
+    Returns:
+        The clock installed with set_clock(), or the system clock.
+    """
+    return _clock
+
+
+def set_clock(clock: Optional[Clock]) -> Clock:
+    """Install a clock for the whole process.
+
+    Args:
+        clock: Clock to install, or None to restore the system clock.
+
+    Returns:
+        The previously active clock.
+    """
+    global _clock
+    previous = _clock
+    _clock = clock if clock is not None else SystemClock()
+    return previous
+
+
+@contextmanager
+def use_clock(clock: Clock) -> Iterator[Clock]:
+    """Temporarily install a clock.
+
+    Args:
+        clock: Clock to use inside the block.
+
+    Yields:
+        The installed clock.
+    """
+    previous = set_clock(clock)
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
@@ -1,32 +1,166 @@
-"""Configuration handling for rotary phone."""
+"""Configuration handling for rotary phone.
 
-import json
+All data lives in one directory, resolved once per process. It defaults to
+~/.rotary_phone and can be moved with the ``ROTARY_PHONE_HOME`` environment
+variable or the ``--data-dir`` option. Setting a tenant (the
+``ROTARY_PHONE_TENANT`` environment variable or ``--tenant``) selects the
+isolated store ``<home>/tenants/<tenant>``, so independent workers can run in
+parallel without sharing files.
+"""
+
+import os
+import re
+import zlib
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from rotary_phone import metrics
+
+DATA_DIR_ENV_VAR = 'ROTARY_PHONE_HOME'
+TENANT_ENV_VAR = 'ROTARY_PHONE_TENANT'
+_TENANT_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*$')
+
+_data_dir_override: Optional[Path] = None
+_tenant_override: Optional[str] = None
+_resolved_dir: Optional[Path] = None
+_ensured_dir: Optional[Path] = None
+
+
+def get_data_home() -> Path:
+    """Get the root data directory shared by all tenants.
+    
+    Returns:
+        The --data-dir override, else ``ROTARY_PHONE_HOME``, else ~/.rotary_phone.
+    """
+    if _data_dir_override is not None:
+        return _data_dir_override
+    home = os.environ.get(DATA_DIR_ENV_VAR)
+    if home:
+        return Path(home).expanduser()
+    return Path.home() / ".rotary_phone"
+
+
+def get_tenant() -> Optional[str]:
+    """Get the active tenant name.
+    
+    Returns:
+        The --tenant override, else ``ROTARY_PHONE_TENANT``, else None.
+    """
+    if _tenant_override is not None:
+        return _tenant_override
+    return os.environ.get(TENANT_ENV_VAR) or None
+
+
+def _validate_tenant(tenant: str) -> str:
+    from rotary_phone.exceptions import ConfigError
+    if not _TENANT_PATTERN.match(tenant):
+        raise ConfigError(f"Invalid tenant name: {tenant!r} (use letters, digits, '.', '_' and '-')")
+    return tenant
 
 
 def get_config_dir() -> Path:
     """Get the configuration directory path.
     
+    The path is resolved on first use and then reused for the rest of the
+    process; call set_data_dir() to change it.
+    
     Returns:
-        Path object pointing to ~/.rotary_phone directory.
+        Path object pointing to the data directory of the active tenant.
+    
+    Raises:
+        ConfigError: If the tenant name is invalid.
     """
-    return Path.home() / ".rotary_phone"
+    global _resolved_dir
+    if _resolved_dir is None:
+        config_dir = get_data_home()
+        tenant = get_tenant()
+        if tenant:
+            config_dir = config_dir / "tenants" / _validate_tenant(tenant)
+        _resolved_dir = config_dir
+    return _resolved_dir
 
 
 def ensure_config_dir() -> Path:
     """Ensure configuration directory exists.
     
-    Creates the configuration directory if it doesn't exist.
+    The directory is created on the first call for each resolved path only;
+    later calls just return it.
     
     Returns:
         Path object pointing to the configuration directory.
     """
+    global _ensured_dir
     config_dir = get_config_dir()
-    config_dir.mkdir(exist_ok=True)
+    if config_dir != _ensured_dir:
+        config_dir.mkdir(parents=True, exist_ok=True)
+        _ensured_dir = config_dir
     return config_dir
 
 
+def set_data_dir(data_dir: Optional[Path] = None, tenant: Optional[str] = None) -> Path:
+    """Override the data directory and tenant for this process.
+    
+    The storage backend is reselected so it uses the new location.
+    
+    Args:
+        data_dir: Root data directory (None to use the default resolution).
+        tenant: Tenant name (None to use ``ROTARY_PHONE_TENANT``).
+    
+    Returns:
+        The new configuration directory.
+    
+    Raises:
+        ConfigError: If the tenant name is invalid.
+    """
+    global _data_dir_override, _tenant_override, _resolved_dir, _ensured_dir
+    from rotary_phone.storage import set_backend
+    if tenant is not None:
+        _validate_tenant(tenant)
+    _data_dir_override = Path(data_dir).expanduser() if data_dir is not None else None
+    _tenant_override = tenant
+    _resolved_dir = None
+    _ensured_dir = None
+    set_backend(None)
+    return get_config_dir()
+
+
+def list_tenants() -> List[str]:
+    """List the tenants that have a store under the data home.
+    
+    Returns:
+        Sorted tenant names.
+    """
+    tenants_dir = get_data_home() / "tenants"
+    if not tenants_dir.is_dir():
+        return []
+    return sorted(path.name for path in tenants_dir.iterdir() if path.is_dir())
+
+
+def shard_for_number(number: str, shards: int) -> str:
+    """Map a phone number to one of ``shards`` tenant names.
+    
+    The mapping is a stable hash of the normalized number, so every process
+    routes a number to the same shard. Running one worker per shard tenant
+    spreads calls over independent stores.
+    
+    Args:
+        number: Phone number in any format.
+        shards: Number of shards.
+    
+    Returns:
+        Tenant name such as 'shard-03'.
+    
+    Raises:
+        ValueError: If shards is not positive.
+    """
+    from rotary_phone.utils import normalize_number
+    if shards <= 0:
+        raise ValueError(f"Number of shards must be positive: {shards}")
+    index = zlib.crc32(normalize_number(number).encode()) % shards
+    width = len(str(shards - 1))
+    return f"shard-{index:0{width}d}"
+
+
 def get_config_file() -> Path:
     """Get the path to the configuration file.
     
@@ -38,38 +172,33 @@ def get_config_file() -> Path:
 
 
 def load_config() -> Dict[str, Any]:
-    """Load configuration from the config file.
+    """Load configuration from storage.
     
     Returns:
         Dictionary with configuration settings.
     """
-    config_file = get_config_file()
-    if not config_file.exists():
-        return _get_default_config()
-    
-    try:
-        with open(config_file, 'r') as f:
-            config = json.load(f)
-            # Merge with defaults to ensure all keys exist
-            default = _get_default_config()
+    from rotary_phone.storage import get_backend
+    with metrics.timed('config.load'):
+        config = get_backend().load_config()
+        # Merge with defaults to ensure all keys exist
+        default = _get_default_config()
+        if isinstance(config, dict):
             default.update(config)
-            return default
-    except (json.JSONDecodeError, IOError):
-        return _get_default_config()
+        return default
 
 
 def save_config(config: Dict[str, Any]) -> None:
-    """Save configuration to the config file.
+    """Save configuration to storage.
     
     Args:
         config: Dictionary with configuration settings.
     
     Raises:
-        IOError: If the config file cannot be written.
+        IOError: If the configuration cannot be written.
     """
-    config_file = get_config_file()
-    with open(config_file, 'w') as f:
-        json.dump(config, f, indent=2)
+    from rotary_phone.storage import get_backend
+    with metrics.timed('config.save'):
+        get_backend().save_config(config)
 
 
 def get_config_value(key: str, default: Any = None) -> Any:
@@ -82,6 +211,7 @@ def get_config_value(key: str, default: Any = None) -> Any:
     Returns:
         Configuration value or default.
     """
+    metrics.incr('config.reads')
     config = load_config()
     return config.get(key, default)
 
@@ -113,11 +243,33 @@ def _get_default_config() -> Dict[str, Any]:
     """
     return {
         'default_delay': 0.1,
+        'dial_timing': 'fixed',
         'history_limit': 100,
+        'history_flush_batch': 1,
+        'history_flush_interval': 0,
+        'enable_rollups': False,
+        'enable_change_feed': False,
+        'change_feed_retain': 100000,
+        'rollup_raw_days': 7,
+        'rollup_hourly_days': 180,
+        'rollup_flush_batch': 100,
         'auto_save_history': True,
         'enable_logging': True,
+        'log_async': True,
+        'log_file': None,
+        'log_file_max_bytes': 1000000,
+        'log_file_backups': 3,
+        'log_debug_sample_rate': 1.0,
+        'enable_metrics': False,
+        'analytics_backend': 'auto',
+        'storage_backend': 'json',
         'min_number_length': 7,
         'max_number_length': 15,
+        'default_region': 'US',
+        'dnc_false_positive_rate': 0.001,
+        'audio_sample_rate': 8000,
+        'replication_dir': None,
+        'enable_digit_index': True,
         'quiet_mode': False,
         'show_dialing_progress': True,
     }
@@ -1,47 +1,84 @@
 """Contact management for rotary phone."""
 
-import json
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
 
+from rotary_phone import metrics
+from rotary_phone.changefeed import record_contact
 from rotary_phone.config import ensure_config_dir
+from rotary_phone.digitindex import index_contact, updating_digit_index
+
+_number_index: Optional[Tuple[Hashable, Dict[str, List[str]]]] = None
 
 
 def get_contacts_file() -> Path:
-    """Get the path to the contacts file."""
+    """Get the path to the contacts file of the JSON storage backend."""
     config_dir = ensure_config_dir()
     return config_dir / "contacts.json"
 
 
 def load_contacts() -> Dict[str, str]:
-    """Load contacts from the contacts file.
+    """Load contacts from storage.
     
     Returns:
         Dictionary mapping contact names to phone numbers.
     """
-    contacts_file = get_contacts_file()
-    if not contacts_file.exists():
-        return {}
-    
-    try:
-        with open(contacts_file, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {}
+    from rotary_phone.storage import get_backend
+    with metrics.timed('contacts.load'):
+        return get_backend().load_contacts()
 
 
 def save_contacts(contacts: Dict[str, str]) -> None:
-    """Save contacts to the contacts file.
+    """Save contacts, replacing what is stored.
     
     Args:
         contacts: Dictionary mapping contact names to phone numbers.
     
     Raises:
-        IOError: If the contacts file cannot be written.
+        IOError: If the contacts cannot be written.
+    """
+    from rotary_phone.changefeed import record_replace
+    from rotary_phone.storage import get_backend
+    with metrics.timed('contacts.save'):
+        get_backend().save_contacts(contacts)
+    record_replace('contacts')
+
+
+def iter_contacts(offset: int = 0, limit: Optional[int] = None, after: Optional[str] = None,
+                  query: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    """Stream contacts in name order.
+    
+    With the JSON backend, contacts are parsed one at a time from the
+    contacts file instead of loading the whole file, starting where a
+    binary search finds ``after``.
+    
+    Args:
+        offset: Number of matching contacts to skip.
+        limit: Maximum number of contacts to yield (None for no limit).
+        after: Only yield contacts whose name sorts after this name.
+        query: Only yield contacts whose name contains this text (case-insensitive).
+    
+    Yields:
+        (name, number) tuples.
     """
-    contacts_file = get_contacts_file()
-    with open(contacts_file, 'w') as f:
-        json.dump(contacts, f, indent=2, sort_keys=True)
+    from rotary_phone.storage import get_backend
+    
+    if limit is not None and limit <= 0:
+        return
+    
+    query_lower = query.lower() if query else None
+    skipped = 0
+    yielded = 0
+    for name, number in get_backend().scan_contacts(after):
+        if query_lower is not None and query_lower not in name.lower():
+            continue
+        if skipped < offset:
+            skipped += 1
+            continue
+        yield name, number
+        yielded += 1
+        if limit is not None and yielded >= limit:
+            return
 
 
 def add_contact(name: str, number: str) -> bool:
@@ -54,11 +91,14 @@ def add_contact(name: str, number: str) -> bool:
     Returns:
         True if contact was added, False if contact already exists.
     """
-    contacts = load_contacts()
-    if name in contacts:
+    from rotary_phone.storage import get_backend
+    backend = get_backend()
+    if backend.get_contact(name) is not None:
         return False
-    contacts[name] = number
-    save_contacts(contacts)
+    with updating_digit_index('contacts') as index:
+        backend.put_contact(name, number)
+        record_contact(name, number)
+        index_contact(index, name, number)
     return True
 
 
@@ -71,8 +111,8 @@ def get_contact(name: str) -> Optional[str]:
     Returns:
         Phone number if contact exists, None otherwise.
     """
-    contacts = load_contacts()
-    return contacts.get(name)
+    from rotary_phone.storage import get_backend
+    return get_backend().get_contact(name)
 
 
 def list_contacts() -> Dict[str, str]:
@@ -93,12 +133,13 @@ def delete_contact(name: str) -> bool:
     Returns:
         True if contact was deleted, False if not found.
     """
-    contacts = load_contacts()
-    if name in contacts:
-        del contacts[name]
-        save_contacts(contacts)
-        return True
-    return False
+    from rotary_phone.storage import get_backend
+    with updating_digit_index('contacts') as index:
+        if not get_backend().delete_contact(name):
+            return False
+        record_contact(name, None)
+        index_contact(index, name, None)
+    return True
 
 
 def update_contact(name: str, number: str) -> bool:
@@ -111,11 +152,14 @@ def update_contact(name: str, number: str) -> bool:
     Returns:
         True if contact was updated, False if contact not found.
     """
-    contacts = load_contacts()
-    if name not in contacts:
+    from rotary_phone.storage import get_backend
+    backend = get_backend()
+    if backend.get_contact(name) is None:
         return False
-    contacts[name] = number
-    save_contacts(contacts)
+    with updating_digit_index('contacts') as index:
+        backend.put_contact(name, number)
+        record_contact(name, number)
+        index_contact(index, name, number)
     return True
 
 
@@ -146,6 +190,30 @@ def search_contacts(query: str) -> Dict[str, str]:
     }
 
 
+def get_number_index() -> Dict[str, List[str]]:
+    """Get the reverse index from normalized number to contact names.
+    
+    The index is built from one contacts load and reused until the
+    stored contacts change.
+    
+    Returns:
+        Dictionary mapping normalized numbers to contact names in name order.
+    """
+    global _number_index
+    from rotary_phone.storage import get_backend
+    from rotary_phone.utils import normalize_number
+    
+    signature = get_backend().signature('contacts')
+    if _number_index is not None and _number_index[0] == signature:
+        return _number_index[1]
+    
+    index: Dict[str, List[str]] = {}
+    for name, number in load_contacts().items():
+        index.setdefault(normalize_number(number), []).append(name)
+    _number_index = (signature, index)
+    return index
+
+
 def get_contacts_by_number(number: str) -> List[str]:
     """Get all contact names that have the given phone number.
     
@@ -156,17 +224,4 @@ def get_contacts_by_number(number: str) -> List[str]:
         List of contact names with the given number.
     """
     from rotary_phone.utils import normalize_number
-    contacts = load_contacts()
-    normalized = normalize_number(number)
-    
-    matching = []
-    for name, contact_number in contacts.items():
-        if normalize_number(contact_number) == normalized:
-            matching.append(name)
-    
-    return matching
-
-
-
-
-
+    return list(get_number_index().get(normalize_number(number), []))
@@ -1,69 +1,108 @@
 """Dialer functionality for rotary phone."""
 
-import time
+import logging
 
-from rotary_phone.exceptions import InvalidDelayError, InvalidNumberError
+from rotary_phone import metrics
+from rotary_phone.clock import get_clock
+from rotary_phone.exceptions import DoNotCallError, InvalidDelayError, InvalidNumberError
 from rotary_phone.history import add_to_history
 from rotary_phone.logger import setup_logger
+from rotary_phone.timing import DialTimer, dial_schedule
 from rotary_phone.utils import validate_number, format_number
 
 logger = setup_logger()
 
 
+def prepare_number(number: str) -> str:
+    """Validate a phone number and reduce it to the digits that are dialed.
+    
+    Args:
+        number: Phone number in any supported format.
+    
+    Returns:
+        The normalized number (digits, with a leading '+' for E.164 numbers).
+    
+    Raises:
+        InvalidNumberError: If the phone number is invalid.
+    """
+    if not validate_number(number):
+        logger.error("Invalid phone number: %s", number)
+        raise InvalidNumberError(f"Invalid phone number: {number}")
+    from rotary_phone.utils import normalize_number
+    return normalize_number(number)
+
+
 def dial(number: str, delay: float = 0.1, quiet: bool = False) -> None:
     """Simulate dialing a phone number.
     
     Args:
         number: Phone number to dial. Must be a valid number format.
-        delay: Delay in seconds between each digit (default: 0.1).
+        delay: Delay in seconds between each digit (default: 0.1). With the
+            ``pulse`` timing model (``dial_timing`` config option) digits
+            take their pulse time plus this inter-digit delay.
         quiet: If True, suppress output during dialing (default: False).
     
     Raises:
         InvalidNumberError: If the phone number is invalid.
         InvalidDelayError: If delay is negative.
+        DoNotCallError: If the number is on the do-not-call list.
+        ValueError: If the configured timing model is unknown.
     """
-    if not validate_number(number):
-        logger.error(f"Invalid phone number: {number}")
-        raise InvalidNumberError(f"Invalid phone number: {number}")
+    cleaned = prepare_number(number)
     
     if delay < 0:
         logger.error("Delay must be non-negative")
         raise InvalidDelayError("Delay must be non-negative")
     
     if delay > 10.0:
-        logger.warning(f"Delay value {delay} is very high, dialing may take a long time")
+        logger.warning("Delay value %s is very high, dialing may take a long time", delay)
     
     # Warn if delay is too small (might be too fast to see)
     if 0 < delay < 0.01:
-        logger.warning(f"Delay value {delay} is very small, dialing may be too fast to see")
+        logger.warning("Delay value %s is very small, dialing may be too fast to see", delay)
+    
+    from rotary_phone.dnc import is_do_not_call
+    if is_do_not_call(cleaned):
+        logger.warning("Refusing to dial %s: number is on the do-not-call list", cleaned)
+        metrics.incr('dial.dnc_blocked')
+        raise DoNotCallError(f"Number is on the do-not-call list: {number}")
     
-    from rotary_phone.utils import normalize_number
-    cleaned = normalize_number(number)
     formatted = format_number(cleaned)
-    logger.info(f"Dialing {formatted}...")
+    logger.info("Dialing %s...", formatted)
     if not quiet:
         print(f"Dialing {formatted}...")
     
-    for i, digit in enumerate(cleaned):
-        if not quiet:
-            print(f"  {digit}", end="", flush=True)
-        time.sleep(delay)
-        # Add visual feedback every 3 digits
-        if not quiet and (i + 1) % 3 == 0 and i + 1 < len(cleaned):
-            print(".", end="", flush=True)
+    # Wait for absolute deadlines so sleep overshoot does not accumulate
+    schedule = dial_schedule(cleaned, delay)
+    with metrics.timed('dial.loop'):
+        timer = DialTimer(get_clock())
+        for i, (digit, deadlines) in enumerate(zip(cleaned, schedule)):
+            if not quiet:
+                print(f"  {digit}", end="", flush=True)
+            for deadline in deadlines:
+                timer.wait_until(deadline)
+            # Add visual feedback every 3 digits
+            if not quiet and (i + 1) % 3 == 0 and i + 1 < len(cleaned):
+                print(".", end="", flush=True)
+        timing = timer.summary()
+    metrics.record('dial.jitter', timing['jitter_ms'] / 1000)
+    metrics.incr('dial.calls')
+    metrics.incr('dial.digits', len(cleaned))
     
     if not quiet:
         print()  # New line after dialing
     
     # Add to history
-    add_to_history(cleaned, formatted)
+    add_to_history(cleaned, formatted, timing)
     
-    logger.info(f"Connection established to {formatted}")
+    logger.info("Connection established to %s", formatted)
     if not quiet:
         print("Connection established!")
     
-    # Calculate and log dialing duration
-    from rotary_phone.utils import format_duration
-    duration = len(cleaned) * delay
-    logger.debug(f"Dialing took {format_duration(duration)}")
+    # Log the measured dialing duration
+    if logger.isEnabledFor(logging.DEBUG):
+        from rotary_phone.utils import format_duration
+        logger.debug("Dialing took %s (%.1f ms, target %.1f ms, jitter %.3f ms)",
+                     format_duration(timing['duration_ms'] / 1000), timing['duration_ms'],
+                     timing['target_ms'], timing['jitter_ms'])
 
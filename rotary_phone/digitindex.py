@@ -0,0 +1,332 @@
+"""Digit-pattern search over contacts and history with a trigram index.
+
+The index maps every distinct number in contacts and history, reduced to
+its digits, to the contacts that have it and the timestamps of calls to
+it. Every trigram of ``^<digits>$`` maps to the set of numbers containing
+it. The anchors make prefix and suffix patterns selective even with only
+two known digits.
+
+The index lives in memory, one per process. It is built by the first
+search and then updated in place by the writes that go through contacts,
+history and replication: each write checks that the index is current for
+the active backend (by the storage signatures it last saw), applies its
+change and records the new signatures. Anything else that changes the data
+(another process, an import or a history merge) leaves a signature the
+index does not know, and the next search rebuilds it. A stored index was
+tried and dropped: over 100k contacts and 100k calls the document was
+31.5 MB and loading it took as long as scanning the data. With the index
+disabled, and inside a snapshot, a search scans the data instead.
+
+A query is narrowed to the numbers holding all its literal trigrams, and
+only those candidates are matched against the full pattern.
+"""
+
+import re
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rotary_phone import metrics
+
+WILDCARDS = '*?'
+_SEPARATORS = str.maketrans('', '', ' -().')
+
+_index: Optional[Dict[str, Any]] = None
+_lock = threading.RLock()
+
+
+def digit_key(number: str) -> str:
+    """Get the digits of a number, as indexed."""
+    return ''.join(c for c in number if c.isdigit())
+
+
+def _grams(text: str) -> List[str]:
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
+
+def _key_grams(key: str) -> set:
+    return set(_grams(f"^{key}$"))
+
+
+def _enabled() -> bool:
+    from rotary_phone.config import get_config_value
+    return get_config_value('enable_digit_index', True)
+
+
+def _posting(index: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """Get the entry of a number, adding it to the trigram sets if new."""
+    entry = index['numbers'].get(key)
+    if entry is None:
+        entry = index['numbers'][key] = {'contacts': {}, 'calls': deque()}
+        for gram in _key_grams(key):
+            index['grams'].setdefault(gram, set()).add(key)
+    return entry
+
+
+def _drop_if_unused(index: Dict[str, Any], key: str) -> None:
+    entry = index['numbers'].get(key)
+    if entry is None or entry['contacts'] or entry['calls']:
+        return
+    del index['numbers'][key]
+    for gram in _key_grams(key):
+        keys = index['grams'].get(gram)
+        if keys is None:
+            continue
+        keys.discard(key)
+        if not keys:
+            del index['grams'][gram]
+
+
+def _put_contact(index: Dict[str, Any], name: str, number: Optional[str]) -> None:
+    """Point a contact name at a new number (None to remove it)."""
+    old_key = index['names'].pop(name, None)
+    if old_key is not None:
+        entry = index['numbers'].get(old_key)
+        if entry is not None:
+            entry['contacts'].pop(name, None)
+            _drop_if_unused(index, old_key)
+    key = digit_key(number) if number is not None else ''
+    if key:
+        _posting(index, key)['contacts'][name] = number
+        index['names'][name] = key
+
+
+def _add_calls(index: Dict[str, Any], entries: Iterable[Dict[str, str]]) -> None:
+    for entry in entries:
+        # Calls without digits still count towards the history limit
+        key = digit_key(entry.get('number', ''))
+        if key:
+            _posting(index, key)['calls'].append(entry.get('timestamp', ''))
+        index['order'].append(key)
+
+
+def _trim_calls(index: Dict[str, Any], limit: int) -> None:
+    """Forget the calls that history trimming has dropped.
+
+    History keeps the newest ``limit`` entries, and so does the index: the
+    oldest calls are dropped in the order they were added.
+    """
+    order = index['order']
+    while len(order) > max(limit, 0):
+        key = order.popleft()
+        if key:
+            index['numbers'][key]['calls'].popleft()
+            _drop_if_unused(index, key)
+
+
+def _signatures(backend: Any) -> Dict[str, Any]:
+    return {kind: backend.signature(kind) for kind in ('contacts', 'history')}
+
+
+def _build(backend: Any) -> Dict[str, Any]:
+    from rotary_phone.history import iter_history
+    index: Dict[str, Any] = {'numbers': {}, 'names': {}, 'grams': {}, 'order': deque()}
+    with metrics.timed('digit_index.rebuild'):
+        # Take the signatures first: a write during the scan then leaves
+        # the index stale rather than looking current
+        index['signatures'] = _signatures(backend)
+        for name, number in backend.scan_contacts():
+            _put_contact(index, name, number)
+        _add_calls(index, iter_history())
+    return index
+
+
+def _is_current(index: Optional[Dict[str, Any]], backend: Any) -> bool:
+    return index is not None and index['signatures'] == _signatures(backend)
+
+
+def _install(backend: Any) -> Dict[str, Any]:
+    global _index
+    index = _build(backend)
+    with _lock:
+        _index = index
+    return index
+
+
+def rebuild_digit_index() -> int:
+    """Build the index from the current contacts and history.
+
+    Returns:
+        Number of distinct numbers indexed.
+    """
+    from rotary_phone.history import flush_history
+    from rotary_phone.storage import get_backend
+    flush_history()
+    return len(_install(get_backend())['numbers'])
+
+
+def ensure_digit_index() -> Dict[str, Any]:
+    """Get the index, rebuilt if the data changed behind its back."""
+    from rotary_phone.history import flush_history
+    from rotary_phone.storage import get_backend
+    # Buffered calls reach the index when they are written
+    flush_history()
+    backend = get_backend()
+    with _lock:
+        index = _index
+        if _is_current(index, backend):
+            return index
+    return _install(backend)
+
+
+@contextmanager
+def updating_digit_index(kind: str) -> Iterator[Optional[Dict[str, Any]]]:
+    """Hold the index while contacts or history are written.
+
+    Yields the index if it is current for the active backend (dropping a
+    stale one, and yielding None, otherwise). The writer applies its change
+    with index_contact() or index_calls(); once the write is done the index
+    takes the new signature of ``kind``. A failed write drops the index.
+
+    Args:
+        kind: 'contacts' or 'history'.
+    """
+    global _index
+    from rotary_phone.storage import get_backend
+    with _lock:
+        index = _index
+        if index is not None:
+            backend = get_backend()
+            if backend.signature(kind) != index['signatures'][kind]:
+                index = _index = None
+        try:
+            yield index
+        except BaseException:
+            _index = None
+            raise
+        if index is not None and _index is index:
+            index['signatures'][kind] = backend.signature(kind)
+
+
+def index_contact(index: Optional[Dict[str, Any]], name: str, number: Optional[str]) -> None:
+    """Apply a contact write to the index from updating_digit_index().
+
+    Args:
+        index: Index to update (None if there is none).
+        name: Contact name.
+        number: New number (None if the contact was deleted).
+    """
+    if index is not None:
+        _put_contact(index, name, number)
+
+
+def index_calls(index: Optional[Dict[str, Any]], entries: List[Dict[str, str]], limit: int) -> None:
+    """Apply a history append to the index from updating_digit_index().
+
+    Args:
+        index: Index to update (None if there is none).
+        entries: Appended history entries.
+        limit: History limit the append trimmed to.
+    """
+    if index is not None:
+        _add_calls(index, entries)
+        _trim_calls(index, limit)
+
+
+def invalidate_digit_index() -> None:
+    """Drop the index after contacts or history were rewritten directly."""
+    global _index
+    with _lock:
+        _index = None
+
+
+def compile_pattern(pattern: str) -> Tuple[str, 're.Pattern']:
+    """Parse a digit pattern.
+
+    Spaces, '-', '.' and parentheses are ignored. '*' or '?' stands for any
+    one digit. A pattern matches anywhere in a number unless it starts with
+    '^' or '+' (prefix) or ends with '$' (suffix).
+
+    Args:
+        pattern: Digit pattern such as ``555-***-12**``, ``^555`` or ``1234$``.
+
+    Returns:
+        Tuple of the pattern as indexed text (digits, wildcards and anchors)
+        and a compiled regular expression matching digit keys.
+
+    Raises:
+        ValueError: If the pattern has other characters or no digit positions.
+    """
+    text = pattern.strip().translate(_SEPARATORS)
+    start = text[:1] in ('^', '+')
+    end = text.endswith('$') and len(text) > int(start)
+    body = text[int(start):len(text) - int(end)]
+    if not body or any(not (c.isdigit() or c in WILDCARDS) for c in body):
+        raise ValueError(f"Invalid digit pattern: {pattern!r} (use digits, '*' or '?', '^' and '$')")
+    regex = ''.join(r'\d' if c in WILDCARDS else c for c in body)
+    return (('^' if start else '') + body + ('$' if end else ''),
+            re.compile(('^' if start else '') + regex + ('$' if end else '')))
+
+
+def _scan(regex: 're.Pattern') -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+    """Match every stored number against a pattern, without the index."""
+    from rotary_phone.history import iter_history
+    from rotary_phone.storage import get_backend
+    contacts = {}
+    calls: Dict[str, List[str]] = {}
+    with metrics.timed('digit_index.scan'):
+        for name, number in get_backend().scan_contacts():
+            if regex.search(digit_key(number)):
+                contacts[name] = number
+        for entry in iter_history():
+            key = digit_key(entry.get('number', ''))
+            if key and regex.search(key):
+                calls.setdefault(key, []).append(entry.get('timestamp', ''))
+    return contacts, calls
+
+
+def _lookup(text: str, regex: 're.Pattern') -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Match the indexed numbers holding the literal trigrams of a pattern."""
+    index = ensure_digit_index()
+    with _lock:
+        numbers = index['numbers']
+        grams = [g for g in _grams(text) if not any(c in WILDCARDS for c in g)]
+        if grams:
+            postings = sorted((index['grams'].get(g, set()) for g in grams), key=len)
+            candidates = set(postings[0])
+            for keys in postings[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(keys)
+        else:
+            candidates = set(numbers)
+        contacts: Dict[str, str] = {}
+        calls = {}
+        for key in candidates:
+            if regex.search(key):
+                entry = numbers[key]
+                contacts.update(entry['contacts'])
+                if entry['calls']:
+                    calls[key] = list(entry['calls'])
+    metrics.incr('digit_index.candidates', len(candidates))
+    return contacts, calls
+
+
+def search_digits(pattern: str) -> Dict[str, Any]:
+    """Find contacts and called numbers matching a digit pattern.
+
+    Args:
+        pattern: Digit pattern (see compile_pattern()).
+
+    Returns:
+        Dictionary with contacts ({name: number} in name order) and calls
+        (list of {'number', 'calls', 'last_call'} in number order, where
+        number is the digits of the called number).
+
+    Raises:
+        ValueError: If the pattern is invalid.
+    """
+    from rotary_phone.snapshot import Snapshot
+    from rotary_phone.storage import get_backend
+    text, regex = compile_pattern(pattern)
+    with metrics.timed('digit_index.search'):
+        if _enabled() and not isinstance(get_backend(), Snapshot):
+            contacts, calls = _lookup(text, regex)
+        else:
+            contacts, calls = _scan(regex)
+    return {
+        'contacts': dict(sorted(contacts.items())),
+        'calls': [{'number': key, 'calls': len(calls[key]), 'last_call': max(calls[key])}
+                  for key in sorted(calls)],
+    }
@@ -0,0 +1,307 @@
+"""Do-not-call list with a memory-mapped Bloom filter front-end.
+
+The list is stored in the data directory as ``dnc.list``: a header, the
+bits of a Bloom filter over all listed numbers, and every listed number as
+a sorted array of little-endian uint64 keys. Keeping both in one file lets
+a rebuild replace them together with one rename.
+
+The file is memory-mapped, so checking a number reads a few pages instead
+of loading the list into Python objects. Most numbers are not listed and
+are rejected by the Bloom filter alone. A Bloom hit is confirmed by a
+binary search of the sorted keys, so false positives never block a call.
+
+Numbers are compared in E.164 form: numbers without a country code are
+read in the region recorded when the list was built (the
+``default_region`` config option).
+"""
+
+import mmap
+import os
+import struct
+from math import ceil, log
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+DNC_FILE = "dnc.list"
+DEFAULT_FALSE_POSITIVE_RATE = 0.001
+_MAGIC = b'RPDN'
+_VERSION = 1
+# magic, version, hash count, region, bit count, number count, key offset
+_HEADER = struct.Struct('<4sHH4sQQQ')
+_KEY = struct.Struct('<Q')
+_MASK64 = (1 << 64) - 1
+# Keys encode the digit count so numbers with leading zeros stay distinct
+_LENGTH_FACTOR = 10 ** 15
+
+_cache: Optional[Tuple[Tuple[int, int, str], 'DncList']] = None
+
+
+def _mix(value: int) -> int:
+    """SplitMix64 finalizer: spread a 64-bit key over all bits."""
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def number_key(number: str, region: str) -> Optional[int]:
+    """Get the uint64 key of a number, as stored in the list.
+
+    Args:
+        number: Phone number in any format.
+        region: Region for numbers without a country code.
+
+    Returns:
+        The key, or None if the number has no digits or is too long.
+    """
+    from rotary_phone.numbering import get_numbering_plan
+    from rotary_phone.utils import normalize_number
+    info = get_numbering_plan().parse(number, region)
+    digits = info['e164'][1:] if info['valid'] else normalize_number(number).lstrip('+')
+    if not digits.isdigit() or len(digits) > 15:
+        return None
+    return len(digits) * _LENGTH_FACTOR + int(digits)
+
+
+class DncList:
+    """Read-only view of a built do-not-call list."""
+
+    def __init__(self, path: Path) -> None:
+        """Map a list file.
+
+        Args:
+            path: The dnc.list file.
+
+        Raises:
+            OSError: If the file cannot be opened.
+            ValueError: If the file is not a do-not-call list.
+        """
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self.hashes, region, self.bits, self.count,
+             self._keys_offset) = _HEADER.unpack_from(self._map)
+        except struct.error:
+            magic = version = None
+        if magic != _MAGIC or version != _VERSION:
+            self._map.close()
+            raise ValueError(f"Not a do-not-call list: {path}")
+        self.region = region.rstrip(b'\0').decode('ascii')
+
+    def might_contain(self, key: int) -> bool:
+        """Check the Bloom filter for a key (may give false positives)."""
+        if not self.bits:
+            return False
+        h1 = _mix(key)
+        h2 = _mix(h1 ^ key) | 1
+        data = self._map
+        offset = _HEADER.size
+        for i in range(self.hashes):
+            bit = ((h1 + i * h2) & _MASK64) % self.bits
+            if not data[offset + (bit >> 3)] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def key_at(self, position: int) -> int:
+        """Get the listed key at a position of the sorted array."""
+        return _KEY.unpack_from(self._map, self._keys_offset + position * _KEY.size)[0]
+
+    def contains_key(self, key: int) -> bool:
+        """Check whether a key is listed (exact)."""
+        if not self.might_contain(key):
+            return False
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            value = self.key_at(middle)
+            if value < key:
+                low = middle + 1
+            elif value > key:
+                high = middle
+            else:
+                return True
+        return False
+
+    def __contains__(self, number: str) -> bool:
+        key = number_key(number, self.region)
+        return key is not None and self.contains_key(key)
+
+    def close(self) -> None:
+        """Unmap the list file."""
+        self._map.close()
+
+
+def _directory() -> Path:
+    from rotary_phone.config import ensure_config_dir
+    return ensure_config_dir()
+
+
+def get_dnc_list() -> Optional[DncList]:
+    """Get the do-not-call list of the data directory.
+
+    The mapped list is reused until the file is rebuilt.
+
+    Returns:
+        The DncList, or None if no list has been imported.
+    """
+    global _cache
+    from rotary_phone.config import get_config_dir
+    path = get_config_dir() / DNC_FILE
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    signature = (stat.st_ino, stat.st_mtime_ns, str(path))
+    if _cache is not None and _cache[0] == signature:
+        return _cache[1]
+    dnc_list = DncList(path)
+    if _cache is not None:
+        _cache[1].close()
+    _cache = (signature, dnc_list)
+    return dnc_list
+
+
+def is_do_not_call(number: str) -> bool:
+    """Check whether a number is on the do-not-call list.
+
+    Args:
+        number: Phone number in any format.
+
+    Returns:
+        True if the number is listed; False if not, or if there is no list.
+    """
+    dnc_list = get_dnc_list()
+    return dnc_list is not None and number in dnc_list
+
+
+def _bloom_size(count: int, rate: float) -> Tuple[int, int]:
+    """Get the bit count and hash count for a target false positive rate."""
+    if count == 0:
+        return 0, 0
+    bits = max(64, ceil(-count * log(rate) / (log(2) ** 2)))
+    hashes = max(1, round(bits / count * log(2)))
+    return bits, min(hashes, 30)
+
+
+def _set_bits(keys: List[int], bits: int, hashes: int) -> bytes:
+    """Build the Bloom filter bit array for the keys."""
+    if np is not None:
+        return _set_bits_numpy(keys, bits, hashes)
+    data = bytearray((bits + 7) // 8)
+    for key in keys:
+        h1 = _mix(key)
+        h2 = _mix(h1 ^ key) | 1
+        for i in range(hashes):
+            bit = ((h1 + i * h2) & _MASK64) % bits
+            data[bit >> 3] |= 1 << (bit & 7)
+    return bytes(data)
+
+
+def _mix_numpy(values: 'np.ndarray') -> 'np.ndarray':
+    """Vectorized _mix; uint64 arithmetic wraps like the masked version."""
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _set_bits_numpy(keys: List[int], bits: int, hashes: int) -> bytes:
+    data = np.zeros((bits + 7) // 8, dtype=np.uint8)
+    array = np.asarray(keys, dtype=np.uint64)
+    h1 = _mix_numpy(array)
+    h2 = _mix_numpy(h1 ^ array) | np.uint64(1)
+    for i in range(hashes):
+        positions = (h1 + np.uint64(i) * h2) % np.uint64(bits)
+        np.bitwise_or.at(data, (positions >> np.uint64(3)).astype(np.intp),
+                         np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8))
+    return data.tobytes()
+
+
+def build_dnc_list(numbers: Iterable[str], append: bool = False,
+                   false_positive_rate: Optional[float] = None) -> int:
+    """Build the do-not-call list files from numbers.
+
+    The file is replaced atomically, so dialers checking the list while it
+    is rebuilt see either the old or the new list.
+
+    Args:
+        numbers: Numbers to list, in any format.
+        append: Keep the numbers already listed.
+        false_positive_rate: Bloom filter false positive rate (default: the
+            ``dnc_false_positive_rate`` config option).
+
+    Returns:
+        Number of distinct numbers on the list.
+
+    Raises:
+        ValueError: If the false positive rate is not between 0 and 1.
+    """
+    from rotary_phone.config import get_config_value
+    from rotary_phone.numbering import get_default_region
+
+    if false_positive_rate is None:
+        false_positive_rate = get_config_value('dnc_false_positive_rate', DEFAULT_FALSE_POSITIVE_RATE)
+    if not 0 < false_positive_rate < 1:
+        raise ValueError(f"False positive rate must be between 0 and 1: {false_positive_rate}")
+
+    existing = get_dnc_list() if append else None
+    region = existing.region if existing is not None else get_default_region()
+    keys = set()
+    for number in numbers:
+        key = number_key(number, region)
+        if key is not None:
+            keys.add(key)
+    if existing is not None:
+        keys.update(existing.key_at(i) for i in range(existing.count))
+    keys = sorted(keys)
+
+    bits, hashes = _bloom_size(len(keys), false_positive_rate)
+    bloom = _set_bits(keys, bits, hashes) if bits else b''
+    # Align the key array to 8 bytes
+    keys_offset = -(-(_HEADER.size + len(bloom)) // _KEY.size) * _KEY.size
+    path = _directory() / DNC_FILE
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, hashes, region.encode('ascii')[:4],
+                             bits, len(keys), keys_offset))
+        f.write(bloom)
+        f.write(b'\0' * (keys_offset - _HEADER.size - len(bloom)))
+        if np is not None:
+            np.asarray(keys, dtype='<u8').tofile(f)
+        else:
+            f.write(struct.pack(f'<{len(keys)}Q', *keys))
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+def import_dnc_file(input_file: Path, append: bool = False) -> int:
+    """Build the do-not-call list from a file with one number per line.
+
+    Empty lines and lines starting with '#' are ignored.
+
+    Args:
+        input_file: File to read.
+        append: Keep the numbers already listed.
+
+    Returns:
+        Number of distinct numbers on the list.
+    """
+    with open(input_file, 'r') as f:
+        numbers = (line.strip() for line in f)
+        return build_dnc_list((n for n in numbers if n and not n.startswith('#')), append=append)
+
+
+def clear_dnc_list() -> None:
+    """Remove the do-not-call list."""
+    global _cache
+    from rotary_phone.config import get_config_dir
+    if _cache is not None:
+        _cache[1].close()
+        _cache = None
+    try:
+        (get_config_dir() / DNC_FILE).unlink()
+    except FileNotFoundError:
+        pass
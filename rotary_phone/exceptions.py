@@ -6,7 +6,7 @@ class RotaryPhoneError(Exception):
     pass
 
 
-class InvalidNumberError(RotaryPhoneError):
+class InvalidNumberError(RotaryPhoneError, ValueError):
     """Raised when a phone number is invalid."""
     pass
 
@@ -26,7 +26,7 @@ class ContactExistsError(RotaryPhoneError):
     pass
 
 
-class InvalidDelayError(RotaryPhoneError):
+class InvalidDelayError(RotaryPhoneError, ValueError):
     """Raised when an invalid delay value is provided."""
     pass
 
@@ -46,3 +46,16 @@ class ImportError(RotaryPhoneError):
     pass
 
 
+class QueueFullError(DialError):
+    """Raised when the dial queue is full and cannot accept more calls."""
+    pass
+
+
+class DoNotCallError(DialError):
+    """Raised when dialing a number on the do-not-call list."""
+    pass
+
+
+class ReplicationError(RotaryPhoneError):
+    """Raised when replication between hosts cannot proceed."""
+    pass
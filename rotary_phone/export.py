@@ -1,19 +1,33 @@
-"""Export and import functionality for rotary phone data."""
+"""Export and import functionality for rotary phone data.
 
+A full export records the change feed sequence it covers (``change_seq``)
+and a sha256 ``content_hash`` of its canonical JSON. An incremental export
+made with ``--since`` a previous backup holds only the contacts changed and
+the history appended after that backup's ``change_seq``, and names the
+backup it extends by ``base_hash``. Importing a full backup followed by its
+incrementals verifies each file's hash and the chain links before applying
+anything.
+"""
+
+import hashlib
 import json
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Sequence
 
 from rotary_phone.contacts import load_contacts, save_contacts
 from rotary_phone.history import load_history, save_history
 
 
-def export_data(output_file: Path, include_history: bool = True) -> None:
+def export_data(output_file: Path, include_history: bool = True, snapshot=None) -> None:
     """Export contacts and optionally history to a JSON file.
     
+    Contacts and history are read from one snapshot, so the export is
+    consistent even if calls are recorded while it is written.
+    
     Args:
         output_file: Path to the output JSON file.
         include_history: Whether to include call history in export.
+        snapshot: Snapshot to export (default: take a new one).
     
     Raises:
         IOError: If the file cannot be written.
@@ -21,21 +35,144 @@ def export_data(output_file: Path, include_history: bool = True) -> None:
     """
     from datetime import datetime
     from rotary_phone.exceptions import ExportError
+    from rotary_phone.snapshot import read_snapshot
     
     try:
-        data = {
-            'contacts': load_contacts(),
-            'export_version': '1.0',
-            'export_date': datetime.now().isoformat(),
-        }
-        
-        if include_history:
-            data['history'] = load_history()
+        with read_snapshot(snapshot) as pinned:
+            data = {
+                'contacts': load_contacts(),
+                'export_version': '1.0',
+                'export_date': datetime.now().isoformat(),
+                'backup_type': 'full',
+                'change_seq': pinned.change_seq,
+            }
+            
+            if include_history:
+                data['history'] = load_history()
         
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2, sort_keys=True)
+        _write_backup(output_file, data)
+    except (IOError, OSError) as e:
+        raise ExportError(f"Failed to export data: {e}") from e
+
+
+def export_incremental(output_file: Path, base_file: Path, include_history: bool = True) -> Dict[str, int]:
+    """Export only what changed since a previous backup.
+    
+    The changes are read from the change feed. If a collection was
+    rewritten as a whole since the base backup (by an import or clear),
+    the incremental carries that collection in full.
+    
+    Args:
+        output_file: Path to the output JSON file.
+        base_file: Full or incremental backup this one extends.
+        include_history: Whether to include appended history.
+    
+    Returns:
+        Dictionary with export statistics:
+        - contacts_changed: Number of contacts added or updated
+        - contacts_deleted: Number of contacts deleted
+        - history_entries: Number of history entries written
+    
+    Raises:
+        ExportError: If the base backup is unusable or the file cannot be written.
+    """
+    from datetime import datetime
+    from rotary_phone import changefeed
+    from rotary_phone.config import get_config_value
+    from rotary_phone.exceptions import ExportError
+    
+    try:
+        base = _read_backup(base_file)
+    except ValueError as e:
+        raise ExportError(str(e)) from e
+    if 'change_seq' not in base or 'content_hash' not in base:
+        raise ExportError(f"{base_file} has no backup watermark; make a new full export first")
+    if not get_config_value('enable_change_feed', False):
+        raise ExportError("Incremental export needs the change feed (enable_change_feed)")
+    
+    since_seq = base['change_seq']
+    records = changefeed.changes_since(since_seq)
+    if not records and since_seq > changefeed.last_seq():
+        raise ExportError(f"{base_file} is newer than this store's change feed")
+    
+    contacts_replace = any(r['kind'] == 'contacts' and r['op'] == 'replace' for r in records)
+    history_replace = any(r['kind'] == 'history' and r['op'] == 'replace' for r in records)
+    contacts: Dict[str, str] = {}
+    deleted: List[str] = []
+    history: List[Dict[str, str]] = []
+    if contacts_replace:
+        contacts = load_contacts()
+    else:
+        latest: Dict[str, Any] = {}
+        for record in records:
+            if record['kind'] == 'contacts':
+                latest[record['name']] = record.get('number')
+        contacts = {name: number for name, number in latest.items() if number is not None}
+        deleted = sorted(name for name, number in latest.items() if number is None)
+    if include_history:
+        if history_replace:
+            history = load_history()
+        else:
+            history = [r['entry'] for r in records if r['kind'] == 'history' and r['op'] == 'append']
+    
+    data = {
+        'contacts': contacts,
+        'deleted_contacts': deleted,
+        'contacts_replace': contacts_replace,
+        'export_version': '1.0',
+        'export_date': datetime.now().isoformat(),
+        'backup_type': 'incremental',
+        'base_hash': base['content_hash'],
+        'since_seq': since_seq,
+        'change_seq': records[-1]['seq'] if records else since_seq,
+    }
+    if include_history:
+        data['history'] = history
+        data['history_replace'] = history_replace
+    
+    try:
+        _write_backup(output_file, data)
     except (IOError, OSError) as e:
         raise ExportError(f"Failed to export data: {e}") from e
+    return {
+        'contacts_changed': len(contacts),
+        'contacts_deleted': len(deleted),
+        'history_entries': len(history),
+    }
+
+
+def _content_hash(data: Dict[str, Any]) -> str:
+    """Hash the canonical JSON of a backup, excluding its own hash."""
+    payload = {key: value for key, value in data.items() if key != 'content_hash'}
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _write_backup(output_file: Path, data: Dict[str, Any]) -> None:
+    """Add the content hash and write a backup file."""
+    data['content_hash'] = _content_hash(data)
+    with open(output_file, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def _read_backup(input_file: Path) -> Dict[str, Any]:
+    """Read a backup file and check its content hash if it has one.
+    
+    Raises:
+        ValueError: If the file cannot be read, is not JSON or fails its hash check.
+    """
+    try:
+        with open(input_file, 'r') as f:
+            data = json.load(f)
+    except (IOError, OSError) as e:
+        raise ValueError(f"Failed to read import file: {e}") from e
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in import file: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError(f"Invalid backup file: {input_file}")
+    if 'content_hash' in data and data['content_hash'] != _content_hash(data):
+        raise ValueError(f"Content hash mismatch in {input_file}; the file is damaged or was edited")
+    return data
 
 
 def import_data(input_file: Path, merge: bool = True) -> Dict[str, int]:
@@ -49,21 +186,66 @@ def import_data(input_file: Path, merge: bool = True) -> Dict[str, int]:
         Dictionary with import statistics:
         - contacts_added: Number of contacts added
         - contacts_skipped: Number of contacts skipped (if merge and already exists)
+        - contacts_deleted: Number of contacts deleted by incremental backups
         - history_entries_added: Number of history entries added
     
     Raises:
         ImportError: If import operation fails.
     """
+    return import_chain([input_file], merge)
+
+
+def import_chain(input_files: Sequence[Path], merge: bool = True) -> Dict[str, int]:
+    """Import a full backup followed by incremental backups, in order.
+    
+    Every file is read and verified before anything is changed: each file
+    must match its content hash, and each incremental must extend the file
+    before it. The whole chain is applied in one write transaction.
+    
+    Args:
+        input_files: Full backup first, then its incrementals oldest first.
+        merge: If True, merge the full backup with existing data. If False,
+            replace. Incrementals are always applied as changes.
+    
+    Returns:
+        Dictionary with import statistics, as for import_data().
+    
+    Raises:
+        ImportError: If a file cannot be read or the chain does not verify.
+    """
     from rotary_phone.exceptions import ImportError
+    from rotary_phone.snapshot import write_transaction
     
-    try:
-        with open(input_file, 'r') as f:
-            data = json.load(f)
-    except (IOError, OSError) as e:
-        raise ImportError(f"Failed to read import file: {e}") from e
-    except json.JSONDecodeError as e:
-        raise ImportError(f"Invalid JSON in import file: {e}") from e
+    backups = []
+    for position, input_file in enumerate(input_files):
+        try:
+            data = _read_backup(input_file)
+        except ValueError as e:
+            raise ImportError(str(e)) from e
+        incremental = data.get('backup_type') == 'incremental'
+        if position == 0 and incremental:
+            raise ImportError(f"{input_file} is an incremental backup; import its full backup first")
+        if position > 0:
+            if not incremental:
+                raise ImportError(f"{input_file} is not an incremental backup")
+            if data.get('base_hash') is None or data['base_hash'] != backups[-1].get('content_hash'):
+                raise ImportError(f"{input_file} does not extend {input_files[position - 1]}")
+        backups.append(data)
     
+    stats = {'contacts_added': 0, 'contacts_skipped': 0, 'contacts_deleted': 0, 'history_entries_added': 0}
+    with write_transaction():
+        for data in backups:
+            if data.get('backup_type') == 'incremental':
+                result = _apply_incremental(data)
+            else:
+                result = _import_data(data, merge)
+            for key, value in result.items():
+                stats[key] += value
+    return stats
+
+
+def _import_data(data: Dict, merge: bool) -> Dict[str, int]:
+    """Apply parsed import data; runs inside a write transaction."""
     stats = {
         'contacts_added': 0,
         'contacts_skipped': 0,
@@ -86,16 +268,20 @@ def import_data(input_file: Path, merge: bool = True) -> Dict[str, int]:
     
     # Import history
     if 'history' in data:
+        from rotary_phone.config import get_config_value
+        from rotary_phone.rollups import rebuild_rollups, record_calls
         existing_history = load_history() if merge else []
         new_history = data['history']
         
         # Merge histories and keep unique entries
+        added = []
         if merge:
             existing_numbers = {entry['number'] + entry['timestamp'] for entry in existing_history}
             for entry in new_history:
                 key = entry['number'] + entry.get('timestamp', '')
                 if key not in existing_numbers:
                     existing_history.append(entry)
+                    added.append(entry)
                     stats['history_entries_added'] += 1
                     existing_numbers.add(key)
         else:
@@ -103,10 +289,56 @@ def import_data(input_file: Path, merge: bool = True) -> Dict[str, int]:
             stats['history_entries_added'] = len(new_history)
         
         save_history(existing_history)
+        
+        # Keep rollups in step: count merged entries, or start over on replace
+        if get_config_value('enable_rollups', False):
+            if merge:
+                record_calls(added)
+            else:
+                rebuild_rollups()
     
     return stats
 
 
-
-
-
+def _apply_incremental(data: Dict) -> Dict[str, int]:
+    """Apply an incremental backup; runs inside a write transaction."""
+    from rotary_phone.config import get_config_value
+    from rotary_phone.rollups import rebuild_rollups, record_calls
+    
+    stats = {'contacts_added': 0, 'contacts_deleted': 0, 'history_entries_added': 0}
+    
+    if data.get('contacts_replace'):
+        contacts = dict(data['contacts'])
+    else:
+        contacts = load_contacts()
+        for name in data.get('deleted_contacts', []):
+            if contacts.pop(name, None) is not None:
+                stats['contacts_deleted'] += 1
+        contacts.update(data['contacts'])
+    stats['contacts_added'] = len(data['contacts'])
+    save_contacts(contacts)
+    
+    if 'history' in data:
+        if data.get('history_replace'):
+            history = list(data['history'])
+            added = history
+        else:
+            history = load_history()
+            seen = {entry['number'] + entry.get('timestamp', '') for entry in history}
+            added = []
+            for entry in data['history']:
+                key = entry['number'] + entry.get('timestamp', '')
+                if key not in seen:
+                    added.append(entry)
+                    seen.add(key)
+            history.extend(added)
+        stats['history_entries_added'] = len(added)
+        save_history(history)
+        
+        if get_config_value('enable_rollups', False):
+            if data.get('history_replace'):
+                rebuild_rollups()
+            else:
+                record_calls(added)
+    
+    return stats
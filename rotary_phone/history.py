@@ -1,74 +1,154 @@
 """Call history tracking for rotary phone."""
 
-import json
+import threading
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from rotary_phone import metrics
+from rotary_phone.clock import get_clock
 from rotary_phone.config import ensure_config_dir
+from rotary_phone.history_buffer import HistoryBuffer
+
+_buffer: Optional[HistoryBuffer] = None
+# Serializes read-modify-write cycles on the history file within a process
+_write_lock = threading.RLock()
 
 
 def get_history_file() -> Path:
-    """Get the path to the history file."""
+    """Get the path to the history file of the JSON storage backend."""
     config_dir = ensure_config_dir()
     return config_dir / "history.json"
 
 
 def load_history() -> List[Dict[str, str]]:
-    """Load call history from the history file.
+    """Load call history from storage.
+    
+    Any buffered entries are flushed first so the result is never stale.
     
     Returns:
         List of call history entries, each with 'number', 'formatted', and 'timestamp'.
     """
-    history_file = get_history_file()
-    if not history_file.exists():
-        return []
-    
-    try:
-        with open(history_file, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return []
+    flush_history()
+    return _read_history()
+
+
+def _read_history() -> List[Dict[str, str]]:
+    """Read stored history without flushing the write buffer."""
+    from rotary_phone.storage import get_backend
+    with metrics.timed('history.load'):
+        return get_backend().load_history()
 
 
 def save_history(history: List[Dict[str, str]]) -> None:
-    """Save call history to the history file.
+    """Save call history, replacing what is stored.
     
     Args:
         history: List of call history entries.
     
     Raises:
-        IOError: If the history file cannot be written.
+        IOError: If the history cannot be written.
     """
-    history_file = get_history_file()
-    with open(history_file, 'w') as f:
-        json.dump(history, f, indent=2)
+    from rotary_phone.changefeed import record_replace
+    from rotary_phone.storage import get_backend
+    with metrics.timed('history.save'):
+        get_backend().save_history(history)
+    record_replace('history')
 
 
-def add_to_history(number: str, formatted: str) -> None:
+def add_to_history(number: str, formatted: str, timing: Optional[Dict[str, float]] = None) -> None:
     """Add a dialed number to history.
     
+    When a write-behind policy is configured (``history_flush_batch`` > 1 or
+    ``history_flush_interval`` > 0) the entry is buffered and written later;
+    otherwise it is written immediately.
+    
     Args:
         number: The dialed number.
         formatted: Formatted version of the number.
+        timing: Measured dial timing to store with the entry (duration_ms,
+            target_ms and jitter_ms, as from DialTimer.summary()).
     """
-    from rotary_phone.config import get_config_value
+    from rotary_phone.config import load_config
     
+    config = load_config()
     # Check if auto_save_history is enabled
-    if not get_config_value('auto_save_history', True):
+    if not config.get('auto_save_history', True):
         return
     
-    history = load_history()
     entry = {
         'number': number,
         'formatted': formatted,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': get_clock().now().isoformat()
     }
-    history.append(entry)
-    # Keep only last N entries based on config
-    history_limit = get_config_value('history_limit', 100)
-    history = history[-history_limit:]
-    save_history(history)
+    if timing:
+        entry.update(timing)
+    history_buffer = get_history_buffer(config)
+    if history_buffer.enabled:
+        history_buffer.append(entry)
+    else:
+        history_buffer.flush()
+        _write_entries([entry])
+
+
+def _write_entries(entries: List[Dict[str, str]], origin: Optional[str] = None) -> None:
+    """Append entries to stored history, trimming it to the history limit.
+    
+    The entries are also recorded in the change feed (tagged with the
+    replication origin, if any) and counted into the rollup tables when
+    those are enabled, all in one write transaction so that snapshots see
+    the calls in history, the feed and rollups alike, and added to the
+    digit index. With neither enabled there is nothing to keep in step and
+    no transaction is taken.
+    """
+    from rotary_phone.config import load_config
+    from rotary_phone.digitindex import index_calls, updating_digit_index
+    from rotary_phone.snapshot import write_transaction
+    
+    config = load_config()
+    history_limit = config.get('history_limit', 100)
+    derived = config.get('enable_change_feed', False) or config.get('enable_rollups', False)
+    # Transaction first: sync() holds one when it takes the write lock
+    with (write_transaction() if derived else nullcontext()), _write_lock:
+        from rotary_phone.storage import get_backend
+        # Keep only last N entries based on config
+        from rotary_phone.changefeed import record_history
+        with updating_digit_index('history') as index:
+            with metrics.timed('history.save'):
+                get_backend().append_history(entries, history_limit)
+            index_calls(index, entries, history_limit)
+        record_history(entries, config, origin)
+        if config.get('enable_rollups', False):
+            from rotary_phone.rollups import record_calls
+            record_calls(entries)
+
+
+def get_history_buffer(config: Optional[Dict[str, Any]] = None) -> HistoryBuffer:
+    """Get the process-wide history write buffer.
+    
+    Args:
+        config: Configuration to take the flush policy from. If omitted, the
+            buffer keeps its current policy.
+    
+    Returns:
+        The shared HistoryBuffer instance.
+    """
+    global _buffer
+    if _buffer is None:
+        _buffer = HistoryBuffer(_write_entries)
+    if config is not None:
+        _buffer.configure(
+            config.get('history_flush_batch', 1),
+            config.get('history_flush_interval', 0),
+        )
+    return _buffer
+
+
+def flush_history() -> None:
+    """Write any buffered history entries to disk."""
+    if _buffer is not None:
+        _buffer.flush()
 
 
 def get_history(limit: int = 10) -> List[Dict[str, str]]:
@@ -86,8 +166,139 @@ def get_history(limit: int = 10) -> List[Dict[str, str]]:
     return sorted_history[:limit]
 
 
+def get_last_call(n: int = 1) -> Optional[Dict[str, str]]:
+    """Get the Nth most recent call without loading the whole history.
+    
+    Only the end of the stored history is read.
+    
+    Args:
+        n: 1 for the last call, 2 for the one before it, and so on.
+    
+    Returns:
+        The history entry, or None if there are fewer than N calls.
+    
+    Raises:
+        ValueError: If n is less than 1.
+    """
+    from rotary_phone.storage import get_backend
+    if n < 1:
+        raise ValueError(f"n must be at least 1: {n}")
+    flush_history()
+    with metrics.timed('history.tail'):
+        entries = get_backend().tail_history(n)
+    return entries[0] if len(entries) == n else None
+
+
+def parse_history_cursor(cursor: str) -> Tuple[str, Optional[int]]:
+    """Split a history cursor into its timestamp and tie count.
+    
+    A cursor is ``TIMESTAMP#N``: resume after the first N calls made at
+    TIMESTAMP. A bare timestamp resumes after all of them.
+    
+    Args:
+        cursor: Cursor from iter_history(cursors=True), or an ISO timestamp.
+    
+    Returns:
+        Tuple of (timestamp, N), with N None for a bare timestamp.
+    
+    Raises:
+        ValueError: If the tie count is not a positive integer.
+    """
+    timestamp, sep, ties = cursor.rpartition('#')
+    if not sep:
+        return cursor, None
+    if not ties.isdigit() or int(ties) < 1:
+        raise ValueError(f"Invalid history cursor: {cursor}")
+    return timestamp, int(ties)
+
+
+def iter_history(offset: int = 0, limit: Optional[int] = None, after: Optional[str] = None,
+                 cursors: bool = False) -> Iterator[Any]:
+    """Stream call history in stored (oldest first) order.
+    
+    With the JSON backend, entries are parsed one at a time from the history
+    file, so memory use does not grow with the size of the history. Reading
+    starts where the storage engine finds the ``after`` timestamp, so a page
+    costs the same wherever it is.
+    
+    Args:
+        offset: Number of matching entries to skip.
+        limit: Maximum number of entries to yield (None for no limit).
+        after: Cursor to resume after (see parse_history_cursor()). Pass
+            the cursor of the last entry of a page to get the next one;
+            calls made at the same time are neither repeated nor lost.
+        cursors: Yield (entry, cursor) pairs instead of entries.
+    
+    Yields:
+        History entries, or (entry, cursor) pairs.
+    
+    Raises:
+        ValueError: If ``after`` is not a valid cursor.
+    """
+    from rotary_phone.storage import get_backend
+    
+    start, skip = parse_history_cursor(after) if after is not None else (None, 0)
+    flush_history()
+    if limit is not None and limit <= 0:
+        return
+    
+    skipped = 0
+    yielded = 0
+    # Position of each entry among those made at the same time
+    current, ties = None, 0
+    for entry in get_backend().scan_history(start):
+        timestamp = entry.get('timestamp', '')
+        if timestamp != current:
+            current, ties = timestamp, 0
+        ties += 1
+        if start is not None and (timestamp < start or
+                                  (timestamp == start and (skip is None or ties <= skip))):
+            continue
+        if skipped < offset:
+            skipped += 1
+            continue
+        yield (entry, f"{timestamp}#{ties}") if cursors else entry
+        yielded += 1
+        if limit is not None and yielded >= limit:
+            return
+
+
+def annotate_history(entries: Iterable[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+    """Add caller-ID names to history entries.
+    
+    Entries are joined against the cached number index from
+    rotary_phone.contacts, so contacts are loaded at most once however many
+    entries are annotated.
+    
+    Args:
+        entries: History entries; consumed lazily.
+    
+    Yields:
+        Copies of the entries with a 'name' key holding the matching contact
+        names joined by ", " (empty if the number is not a contact).
+    """
+    from rotary_phone.contacts import get_number_index
+    from rotary_phone.utils import normalize_number
+    
+    index = get_number_index()
+    names_by_number: Dict[str, str] = {}
+    for entry in entries:
+        number = entry.get('number', '')
+        name = names_by_number.get(number)
+        if name is None:
+            name = ", ".join(index.get(normalize_number(number), ()))
+            names_by_number[number] = name
+        annotated = dict(entry)
+        annotated['name'] = name
+        yield annotated
+
+
 def clear_history() -> None:
-    """Clear all call history."""
+    """Clear all call history.
+    
+    Buffered entries are flushed first so none of them survive the clear.
+    """
+    flush_history()
     save_history([])
 
 
@@ -109,9 +320,9 @@ def get_recent_calls(days: int = 7) -> List[Dict[str, str]]:
     Returns:
         List of call history entries within the specified period.
     """
-    from datetime import datetime, timedelta
+    from datetime import timedelta
     history = load_history()
-    cutoff_date = datetime.now() - timedelta(days=days)
+    cutoff_date = get_clock().now() - timedelta(days=days)
     
     recent = []
     for entry in history:
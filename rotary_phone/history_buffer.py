@@ -0,0 +1,123 @@
+"""Write-behind buffering for call history."""
+
+import atexit
+import threading
+from typing import Callable, Dict, List, Optional
+
+
+class HistoryBuffer:
+    """Queue history entries in memory and write them out in batches.
+
+    Pending entries are handed to ``writer`` from a background thread when
+    ``flush_batch`` entries have accumulated or every ``flush_interval``
+    milliseconds. They are also flushed on an explicit :meth:`flush` and at
+    interpreter exit.
+    """
+
+    def __init__(self, writer: Callable[[List[Dict[str, str]]], None],
+                 flush_batch: int = 1, flush_interval: float = 0) -> None:
+        """Create a history buffer.
+
+        Args:
+            writer: Callable that persists a list of entries.
+            flush_batch: Flush once this many entries are pending.
+            flush_interval: Flush pending entries every N milliseconds (0 disables).
+        """
+        self._writer = writer
+        self._pending: List[Dict[str, str]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.configure(flush_batch, flush_interval)
+        atexit.register(self.close)
+
+    def configure(self, flush_batch: int, flush_interval: float) -> None:
+        """Update the flush policy.
+
+        Args:
+            flush_batch: Flush once this many entries are pending.
+            flush_interval: Flush pending entries every N milliseconds (0 disables).
+        """
+        flush_batch = max(int(flush_batch), 1)
+        flush_interval = max(float(flush_interval), 0.0)
+        changed = (flush_batch, flush_interval) != (
+            getattr(self, 'flush_batch', None), getattr(self, 'flush_interval', None)
+        )
+        self.flush_batch = flush_batch
+        self.flush_interval = flush_interval
+        if changed and self._thread is not None:
+            # Wake the flush thread so it picks up the new interval
+            self._wakeup.set()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the policy actually defers writes."""
+        return self.flush_batch > 1 or self.flush_interval > 0
+
+    def pending_count(self) -> int:
+        """Get the number of entries waiting to be flushed.
+
+        Returns:
+            Number of buffered entries.
+        """
+        with self._lock:
+            return len(self._pending)
+
+    def append(self, entry: Dict[str, str]) -> None:
+        """Queue an entry for writing.
+
+        Args:
+            entry: History entry to buffer.
+        """
+        with self._lock:
+            self._pending.append(entry)
+            pending = len(self._pending)
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(
+                    target=self._run, name="rotary-phone-history-flush", daemon=True
+                )
+                self._thread.start()
+        if pending >= self.flush_batch:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """Write all pending entries synchronously.
+
+        If the writer fails, the entries are put back at the front of the queue
+        so that a later flush can retry them.
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries, self._pending = self._pending, []
+            if not entries:
+                return
+            try:
+                self._writer(entries)
+            except Exception:
+                with self._lock:
+                    self._pending[:0] = entries
+                raise
+
+    def close(self) -> None:
+        """Stop the background thread and flush anything still pending."""
+        self._closed = True
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5.0)
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._closed:
+            timeout = self.flush_interval / 1000.0 if self.flush_interval > 0 else None
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            if self._closed:
+                break
+            try:
+                self.flush()
+            except (IOError, OSError):
+                # Entries stay queued; the next trigger or close() retries them
+                continue
@@ -0,0 +1,492 @@
+"""Checksums, verification and repair of the data files.
+
+Every file written through the file storage engines gets a checksum
+manifest next to it (``<file>.crc``): a header, then the CRC-32 of each
+1 MiB segment of the file. Full rewrites write a new manifest; appends to
+the logs of the ``log`` engine extend the last CRC in place (CRC-32 can be
+continued over appended bytes), so an append never rereads the file.
+
+Verifying a file compares segment checksums only, without parsing, and
+the segments of all files are checked in parallel threads (zlib releases
+the GIL while hashing), so even a multi-GB history verifies at disk speed.
+
+A file that cannot be decoded when loaded is moved aside as
+``<file>.corrupt-N`` instead of being read as empty, so the next save does
+not destroy it. :func:`fsck` reports damaged and quarantined files and,
+with ``repair=True``, salvages the records that still parse and rewrites a
+clean store.
+"""
+
+import json
+import logging
+import os
+import re
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from rotary_phone import metrics
+
+MANIFEST_SUFFIX = '.crc'
+SEGMENT_SIZE = 1 << 20
+_MAGIC = b'RPCK'
+_VERSION = 1
+# magic, version, reserved, segment size, bytes covered
+_HEADER = struct.Struct('<4sHHIQ')
+_CRC = struct.Struct('<I')
+_QUARANTINE = re.compile(r'^(?P<name>.+)\.corrupt-\d+$')
+# Files of the stores checked even when they have no manifest yet
+_STORE_FILES = ('contacts.json', 'history.json', 'config.json', 'contacts.log', 'history.log')
+
+logger = logging.getLogger('rotary_phone')
+
+
+def manifest_path(path: Path) -> Path:
+    """Get the checksum manifest of a data file."""
+    return path.with_name(path.name + MANIFEST_SUFFIX)
+
+
+def _segment_crcs(data: bytes) -> List[int]:
+    segment_size = SEGMENT_SIZE
+    view = memoryview(data)
+    return [zlib.crc32(view[i:i + segment_size]) for i in range(0, len(data), segment_size)]
+
+
+def _pack(size: int, crcs: List[int]) -> bytes:
+    return (_HEADER.pack(_MAGIC, _VERSION, 0, SEGMENT_SIZE, size)
+            + struct.pack(f'<{len(crcs)}I', *crcs))
+
+
+def read_manifest(path: Path) -> Optional[Tuple[int, int, List[int]]]:
+    """Read the checksum manifest of a data file.
+
+    Args:
+        path: The data file.
+
+    Returns:
+        Tuple of (segment size, bytes covered, segment CRCs), or None if
+        the file has no readable manifest.
+    """
+    try:
+        data = manifest_path(path).read_bytes()
+        magic, version, _, segment_size, size = _HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    count = -(-size // segment_size) if segment_size else 0
+    if magic != _MAGIC or version != _VERSION or len(data) < _HEADER.size + count * _CRC.size:
+        return None
+    return segment_size, size, list(struct.unpack_from(f'<{count}I', data, _HEADER.size))
+
+
+def write_manifest(path: Path, data: bytes) -> None:
+    """Write the checksum manifest for the full contents of a data file.
+
+    Args:
+        path: The data file.
+        data: Its contents, as written.
+    """
+    target = manifest_path(path)
+    tmp_path = target.with_name(target.name + '.tmp')
+    with metrics.timed('integrity.checksum'):
+        manifest = _pack(len(data), _segment_crcs(data))
+    with open(tmp_path, 'wb') as f:
+        f.write(manifest)
+    os.replace(tmp_path, target)
+
+
+def seal_file(path: Path) -> None:
+    """Write a manifest for a data file as it is now on disk."""
+    write_manifest(path, path.read_bytes())
+
+
+@contextmanager
+def _locked_manifest(path: Path) -> Iterator[int]:
+    """Open a manifest for in-place update, locked against other appenders."""
+    fd = os.open(manifest_path(path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield fd
+    finally:
+        os.close(fd)
+
+
+def append_file(path: Path, data: bytes) -> int:
+    """Append to a data file and extend its checksum manifest.
+
+    The append and the manifest update happen under one lock, so appends
+    from several processes are checksummed in the order they were written.
+
+    Args:
+        path: The data file.
+        data: Bytes to append.
+
+    Returns:
+        Offset at which the data was written.
+    """
+    with _locked_manifest(path) as fd:
+        with open(path, 'ab') as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(data)
+        manifest = read_manifest(path)
+        if manifest is None or manifest[1] != offset or manifest[0] != SEGMENT_SIZE:
+            # Missing, or out of step with the file: checksum it as it is
+            seal_file(path)
+            return offset
+
+        _, size, crcs = manifest
+        first_changed = len(crcs)
+        position = 0
+        partial = size % SEGMENT_SIZE
+        if partial:
+            position = min(SEGMENT_SIZE - partial, len(data))
+            crcs[-1] = zlib.crc32(data[:position], crcs[-1])
+            first_changed -= 1
+        crcs.extend(_segment_crcs(data[position:]))
+        os.pwrite(fd, struct.pack(f'<{len(crcs) - first_changed}I', *crcs[first_changed:]),
+                  _HEADER.size + first_changed * _CRC.size)
+        os.pwrite(fd, _HEADER.pack(_MAGIC, _VERSION, 0, SEGMENT_SIZE, size + len(data)), 0)
+    return offset
+
+
+def remove_manifest(path: Path) -> None:
+    """Remove the manifest of a deleted data file."""
+    try:
+        manifest_path(path).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def quarantine(path: Path) -> Optional[Path]:
+    """Move a damaged data file aside as ``<file>.corrupt-N``.
+
+    Args:
+        path: The damaged file.
+
+    Returns:
+        The new path, or None if the file no longer exists.
+    """
+    number = 1
+    while True:
+        target = path.with_name(f"{path.name}.corrupt-{number}")
+        if not target.exists():
+            break
+        number += 1
+    try:
+        os.rename(path, target)
+    except FileNotFoundError:
+        return None
+    remove_manifest(path)
+    metrics.incr('integrity.quarantined')
+    logger.warning("%s could not be decoded and was moved to %s; run 'fsck --repair' to salvage it",
+                   path.name, target.name)
+    return target
+
+
+def _verify_segment(path: Path, index: int, segment_size: int, expected: int) -> bool:
+    with open(path, 'rb') as f:
+        return zlib.crc32(os.pread(f.fileno(), segment_size, index * segment_size)) == expected
+
+
+def _parses(path: Path) -> bool:
+    """Check a file without a manifest by decoding it."""
+    try:
+        text = path.read_text()
+        if path.suffix == '.log':
+            for line in text.splitlines():
+                json.loads(line)
+        else:
+            json.loads(text)
+    except (ValueError, OSError):
+        return False
+    return True
+
+
+def _candidates(directory: Path) -> List[Path]:
+    files = set()
+    for path in directory.iterdir():
+        if path.name.endswith(MANIFEST_SUFFIX):
+            data_file = path.with_name(path.name[:-len(MANIFEST_SUFFIX)])
+            if data_file.exists():
+                files.add(data_file)
+        elif path.name in _STORE_FILES or _QUARANTINE.match(path.name):
+            files.add(path)
+    return sorted(files)
+
+
+def verify(directory: Optional[Path] = None, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Verify the checksums of every data file in a data directory.
+
+    Args:
+        directory: Data directory (default: the active one).
+        workers: Threads checking segments (default: CPU count).
+
+    Returns:
+        One report per file with:
+        - file: File name
+        - status: 'ok', 'damaged', 'unverified' (no manifest, but the file
+          decodes) or 'quarantined' (moved aside when it failed to load)
+        - size: File size in bytes
+        - segments: Number of checksummed segments
+        - bad_segments: Indexes of segments whose checksum does not match
+        - detail: Explanation for anything but 'ok'
+    """
+    if directory is None:
+        from rotary_phone.config import ensure_config_dir
+        directory = ensure_config_dir()
+    reports = []
+    tasks = []
+    for path in _candidates(Path(directory)):
+        report: Dict[str, Any] = {'file': path.name, 'status': 'ok', 'size': path.stat().st_size,
+                                  'segments': 0, 'bad_segments': [], 'detail': ''}
+        reports.append(report)
+        if _QUARANTINE.match(path.name):
+            report.update(status='quarantined', detail='moved aside after failing to load')
+            continue
+        manifest = read_manifest(path)
+        if manifest is None:
+            if not _parses(path):
+                report.update(status='damaged', detail='no checksums and the file does not decode')
+            else:
+                report.update(status='unverified', detail='no checksums yet')
+            continue
+        segment_size, size, crcs = manifest
+        report['segments'] = len(crcs)
+        if size != report['size']:
+            report.update(status='damaged',
+                          detail=f"size is {report['size']} bytes, checksummed {size}")
+            continue
+        tasks.extend((report, path, index, segment_size, crc) for index, crc in enumerate(crcs))
+
+    with metrics.timed('integrity.verify'):
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+            results = executor.map(lambda task: _verify_segment(*task[1:]), tasks)
+            for task, ok in zip(tasks, results):
+                if not ok:
+                    task[0]['bad_segments'].append(task[2])
+    for report in reports:
+        if report['bad_segments']:
+            count = len(report['bad_segments'])
+            report.update(status='damaged',
+                          detail=f"{count} of {report['segments']} segments fail their checksum")
+    return reports
+
+
+def _salvage_object(text: str, value_type: Optional[type]) -> Dict[str, Any]:
+    """Recover the one-per-line members of an indented JSON object."""
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return data
+    except ValueError:
+        pass
+    result = {}
+    for line in text.splitlines():
+        line = line.strip().rstrip(',')
+        if not line.startswith('"'):
+            continue
+        try:
+            member = json.loads('{' + line + '}')
+        except ValueError:
+            continue
+        for key, value in member.items():
+            if value_type is None or isinstance(value, value_type):
+                result[key] = value
+    return result
+
+
+def _salvage_history(data: bytes) -> List[Dict[str, Any]]:
+    """Recover the entries of an indented JSON history array."""
+    from rotary_phone.storage import _entry_segments, _entry_starts
+    try:
+        history = json.loads(data)
+        if isinstance(history, list):
+            return history
+    except ValueError:
+        pass
+    entries = []
+    for segment in _entry_segments(data, _entry_starts(data)):
+        try:
+            entry = json.loads(segment)
+        except ValueError:
+            continue
+        if isinstance(entry, dict) and 'number' in entry and 'timestamp' in entry:
+            entries.append(entry)
+    return entries
+
+
+def _salvage_log(kind: str, data: bytes) -> Any:
+    """Replay the records of a log that still decode."""
+    from rotary_phone.storage import AppendLogBackend, _LogState
+    state = _LogState()
+    state.value = {} if kind == 'contacts' else []
+    for line in data.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict):
+            AppendLogBackend._apply(kind, state, record)
+    return state.value
+
+
+def _salvage(kind: str, log: bool, data: bytes) -> Any:
+    """Recover what can be read from a damaged file.
+
+    Returns:
+        The salvaged value, or None for a document that does not decode.
+    """
+    if log:
+        return _salvage_log(kind, data)
+    if kind == 'history':
+        return _salvage_history(data)
+    text = data.decode('utf-8', errors='replace')
+    if kind == 'contacts':
+        return _salvage_object(text, str)
+    if kind == 'config':
+        return _salvage_object(text, None)
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def _merge(kind: str, current: Any, salvaged: Any) -> Any:
+    """Merge salvaged data into what the store holds now; current data wins."""
+    if current is None:
+        return salvaged
+    if kind in ('contacts', 'config'):
+        return {**salvaged, **current}
+    if kind == 'history':
+        seen = set()
+        merged = []
+        for entry in sorted(salvaged + current, key=lambda e: e.get('timestamp', '')):
+            key = json.dumps(entry, sort_keys=True)
+            if key not in seen:
+                seen.add(key)
+                merged.append(entry)
+        return merged
+    return current
+
+
+def _repair_file(directory: Path, report: Dict[str, Any]) -> str:
+    """Salvage one damaged or quarantined file and rewrite it cleanly."""
+    from rotary_phone.storage import AppendLogBackend, JsonFileBackend
+
+    match = _QUARANTINE.match(report['file'])
+    name = match.group('name') if match else report['file']
+    stem, suffix = os.path.splitext(name)
+    log = suffix == '.log'
+    backend = AppendLogBackend(directory) if log else JsonFileBackend(directory)
+    kind = stem if stem in ('contacts', 'history', 'config') else 'document'
+    source = directory / report['file']
+
+    if report['status'] == 'unverified':
+        seal_file(source)
+        return 'checksummed'
+
+    salvaged = _salvage(kind, log, source.read_bytes())
+    if match:
+        target = directory / name
+        current = None
+        if target.exists():
+            current = {'contacts': backend.load_contacts, 'history': backend.load_history,
+                       'config': backend.load_config}.get(kind, lambda: backend.load_document(stem))()
+        value = _merge(kind, current, salvaged)
+    else:
+        value = salvaged
+
+    if kind == 'contacts':
+        backend.save_contacts(value)
+    elif kind == 'history':
+        backend.save_history(value)
+    elif kind == 'config':
+        backend.save_config(value)
+    elif value is not None:
+        backend.save_document(stem, value)
+    else:
+        backend.delete_document(stem)
+        remove_manifest(directory / name)
+
+    if match:
+        source.unlink()
+        remove_manifest(source)
+    if value is None:
+        return 'removed (nothing could be recovered)'
+    return f"salvaged {len(value) if kind != 'document' else 1} records"
+
+
+def fsck(directory: Optional[Path] = None, repair: bool = False,
+         workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Check a data directory and optionally repair it.
+
+    Repairing rewrites every damaged file from the records that still
+    decode, merges quarantined files back into the store (current records
+    win over salvaged ones) and adds checksums to files that have none.
+    Repaired contacts and history are recorded as replaced in the change
+    feed, the digit index is dropped and built rollup tables are rebuilt.
+
+    Args:
+        directory: Data directory (default: the active one).
+        repair: Repair what is not 'ok'.
+        workers: Threads checking segments (default: CPU count).
+
+    Returns:
+        Reports as from verify(); with repair, reports of repaired files
+        have status 'repaired' and the outcome in 'detail'.
+    """
+    if directory is None:
+        from rotary_phone.config import ensure_config_dir
+        directory = ensure_config_dir()
+    directory = Path(directory)
+    reports = verify(directory, workers)
+    if not repair or all(report['status'] == 'ok' for report in reports):
+        return reports
+
+    from rotary_phone.snapshot import write_transaction
+    with write_transaction():
+        rewritten = {}
+        for report in reports:
+            if report['status'] == 'ok':
+                continue
+            if report['status'] != 'unverified':
+                match = _QUARANTINE.match(report['file'])
+                stem, suffix = os.path.splitext(match.group('name') if match else report['file'])
+                if stem in ('contacts', 'history'):
+                    rewritten[stem] = suffix == '.log'
+            report['detail'] = _repair_file(directory, report)
+            report['status'] = 'repaired'
+        if rewritten:
+            _refresh_derived(directory, rewritten)
+    return reports
+
+
+def _refresh_derived(directory: Path, rewritten: Dict[str, bool]) -> None:
+    """Bring data derived from contacts and history in line with repaired files.
+
+    Args:
+        directory: Data directory.
+        rewritten: Whether each rewritten collection ('contacts',
+            'history') is stored by the log engine.
+    """
+    from rotary_phone.changefeed import record_replace
+    from rotary_phone.config import get_config_value
+    from rotary_phone.digitindex import invalidate_digit_index
+    from rotary_phone.rollups import _built, rebuild_rollups
+    from rotary_phone.storage import AppendLogBackend, JsonFileBackend, use_backend
+
+    backend = AppendLogBackend(directory) if any(rewritten.values()) else JsonFileBackend(directory)
+    with use_backend(backend):
+        for kind in sorted(rewritten):
+            record_replace(kind)
+        invalidate_digit_index()
+        if 'history' in rewritten and get_config_value('enable_rollups', False) and _built(backend):
+            rebuild_rollups()
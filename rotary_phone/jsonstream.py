@@ -0,0 +1,214 @@
+"""Incremental readers for large JSON files.
+
+These parse a top-level JSON array or object one element at a time from a
+file, keeping only a small read buffer in memory regardless of file size.
+In files written with ``indent=2`` every element starts on a new line
+indented by two spaces, so seek_sorted() can binary-search for where to
+start reading when the elements are sorted.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+class _Reader:
+    """Buffered text reader that refills on demand."""
+
+    def __init__(self, f: Any, chunk_size: int) -> None:
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Append another chunk to the buffer; False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop consumed text so the buffer stays small
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def skip_whitespace(self) -> str:
+        """Skip whitespace and return the next character ('' at end of file)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        """Consume one of the expected structural characters."""
+        char = self.skip_whitespace()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f"Expected one of {chars!r}", self.buf, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next JSON value, reading more input as needed."""
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number may be cut off at the chunk boundary
+            if end == len(self.buf) and not self.eof and isinstance(value, (int, float)):
+                if self.fill():
+                    continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    offset: Optional[int] = None) -> Iterator[Any]:
+    """Iterate over the elements of a top-level JSON array in a file.
+
+    Args:
+        path: Path to a file containing a JSON array.
+        chunk_size: Number of characters to read at a time.
+        offset: Byte offset of the element to start at, or of the closing
+            bracket, as from seek_sorted() (None to read the whole array).
+
+    Yields:
+        Each array element in order.
+
+    Raises:
+        json.JSONDecodeError: If the file is not a well-formed JSON array.
+    """
+    with open(path, 'r') as f:
+        reader = _Reader(f, chunk_size)
+        if offset is None:
+            reader.expect('[')
+        else:
+            f.seek(offset)
+        if reader.skip_whitespace() == ']':
+            return
+        while True:
+            yield reader.value()
+            if reader.expect(',]') == ']':
+                return
+
+
+def iter_json_object(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     offset: Optional[int] = None) -> Iterator[Tuple[str, Any]]:
+    """Iterate over the members of a top-level JSON object in a file.
+
+    Args:
+        path: Path to a file containing a JSON object.
+        chunk_size: Number of characters to read at a time.
+        offset: Byte offset of the member to start at, or of the closing
+            brace, as from seek_sorted() (None to read the whole object).
+
+    Yields:
+        (key, value) pairs in file order.
+
+    Raises:
+        json.JSONDecodeError: If the file is not a well-formed JSON object.
+    """
+    with open(path, 'r') as f:
+        reader = _Reader(f, chunk_size)
+        if offset is None:
+            reader.expect('{')
+        else:
+            f.seek(offset)
+        if reader.skip_whitespace() == '}':
+            return
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            yield key, reader.value()
+            if reader.expect(',}') == '}':
+                return
+
+
+def _element_at(f: Any, position: int, marker: bytes, chunk_size: int) -> Optional[Tuple[int, Any]]:
+    """Decode the first element starting at or after a byte position.
+
+    Returns:
+        (byte offset, decoded value) of the element, or None if no element
+        starts there or later. For an object member the value is its key.
+    """
+    start = max(position - len(marker) + 1, 0)
+    f.seek(start)
+    data = b''
+    found = -1
+    while found == -1:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return None
+        data += chunk
+        found = data.find(marker)
+    element = found + len(marker) - 1
+    while True:
+        try:
+            value, _ = _decoder.raw_decode(data[element:].decode('utf-8'))
+            return start + element, value
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise
+            data += chunk
+
+
+def seek_sorted(path: Path, before: Callable[[Any], bool],
+                chunk_size: int = 4096) -> Optional[int]:
+    """Binary-search a sorted, ``indent=2`` JSON array or object in a file.
+
+    Args:
+        path: Path to the file.
+        before: Called with an array element or object key; True if it
+            sorts before the element wanted. Must be True for a prefix of
+            the elements and False for the rest.
+        chunk_size: Number of bytes to read at a time.
+
+    Returns:
+        Byte offset of the first element for which ``before`` is False (or
+        of the closing bracket if there is none), to pass to
+        iter_json_array() or iter_json_object(). None if the file is not in
+        the indented layout and has to be read from the start.
+
+    Raises:
+        json.JSONDecodeError: If an element cannot be decoded.
+    """
+    with open(path, 'rb') as f:
+        opening = f.read(1)
+        if opening not in (b'[', b'{'):
+            return None
+        marker = b'\n  {' if opening == b'[' else b'\n  "'
+        if _element_at(f, 0, marker, chunk_size) is None:
+            # Empty, or written without indentation
+            return None
+        size = f.seek(0, os.SEEK_END)
+        low, high = 0, size
+        while low < high:
+            middle = (low + high) // 2
+            found = _element_at(f, middle, marker, chunk_size)
+            if found is None or not before(found[1]):
+                high = middle
+            else:
+                low = found[0] + 1
+        found = _element_at(f, low, marker, chunk_size)
+        if found is not None:
+            return found[0]
+        # Every element sorts before: point at the closing bracket
+        f.seek(max(size - chunk_size, 0))
+        tail = f.read()
+        closing = tail.rfind(b']' if opening == b'[' else b'}')
+        return size - len(tail) + closing if closing != -1 else None
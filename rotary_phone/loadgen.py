@@ -0,0 +1,341 @@
+"""Synthetic workload generation for load-testing the storage layer.
+
+Contacts get realistic first/last name distributions and valid North
+American numbers. Call histories pick numbers from a Zipf distribution (a few
+numbers receive most calls) and place calls on a diurnal hourly curve.
+
+Generation is split into fixed chunks (one per day for history) that are
+built in parallel worker processes. Each chunk has its own seed, so results
+do not depend on the number of workers, and each day is already in time
+order, so the pieces are concatenated without a global sort.
+"""
+
+import json
+import os
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from rotary_phone.utils import format_number
+
+CONTACTS_CHUNK_SIZE = 10000
+
+# Relative name frequencies, roughly following US census data
+FIRST_NAMES = {
+    'James': 331, 'Mary': 312, 'Robert': 323, 'Patricia': 160, 'John': 326,
+    'Jennifer': 147, 'Michael': 433, 'Linda': 110, 'David': 360, 'Elizabeth': 144,
+    'William': 304, 'Barbara': 100, 'Richard': 239, 'Susan': 93, 'Joseph': 209,
+    'Jessica': 119, 'Thomas': 196, 'Sarah': 107, 'Christopher': 215, 'Karen': 95,
+    'Charles': 146, 'Lisa': 93, 'Daniel': 195, 'Nancy': 75, 'Matthew': 158,
+    'Betty': 64, 'Anthony': 128, 'Sandra': 78, 'Mark': 133, 'Margaret': 59,
+    'Donald': 110, 'Ashley': 87, 'Steven': 117, 'Emily': 79, 'Andrew': 112,
+    'Donna': 56, 'Paul': 106, 'Michelle': 76, 'Joshua': 123, 'Carol': 55,
+    'Kenneth': 90, 'Amanda': 77, 'Kevin': 97, 'Melissa': 66, 'Brian': 97,
+    'Deborah': 50, 'Olivia': 42, 'Noah': 38, 'Emma': 50, 'Liam': 30,
+}
+LAST_NAMES = {
+    'Smith': 245, 'Johnson': 193, 'Williams': 162, 'Brown': 144, 'Jones': 143,
+    'Garcia': 116, 'Miller': 113, 'Davis': 112, 'Rodriguez': 109, 'Martinez': 106,
+    'Hernandez': 104, 'Lopez': 94, 'Gonzalez': 90, 'Wilson': 78, 'Anderson': 78,
+    'Thomas': 76, 'Taylor': 72, 'Moore': 70, 'Jackson': 70, 'Martin': 69,
+    'Lee': 66, 'Perez': 64, 'Thompson': 64, 'White': 63, 'Harris': 60,
+    'Sanchez': 59, 'Clark': 55, 'Ramirez': 54, 'Lewis': 51, 'Robinson': 51,
+    'Walker': 49, 'Young': 47, 'Allen': 47, 'King': 46, 'Wright': 46,
+    'Scott': 44, 'Torres': 44, 'Nguyen': 44, 'Hill': 43, 'Flores': 43,
+    'Green': 43, 'Adams': 42, 'Nelson': 42, 'Baker': 41, 'Hall': 40,
+    'Rivera': 39, 'Campbell': 37, 'Mitchell': 37, 'Carter': 37, 'Roberts': 36,
+}
+# One history entry laid out exactly as json.dumps(history, indent=2) does
+_ENTRY_LAYOUT = '  {{\n    "number": {0},\n    "formatted": {1},\n    "timestamp": "{2}"\n  }}'
+
+# Relative call volume for each hour of the day (0-23)
+HOURLY_WEIGHTS = [
+    1.0, 0.5, 0.3, 0.2, 0.2, 0.4, 1.0, 3.0, 6.0, 8.0, 9.0, 9.0,
+    8.0, 9.0, 9.0, 8.0, 8.0, 7.0, 6.0, 5.0, 4.0, 3.0, 2.0, 1.5,
+]
+
+
+def generate_number(rng: random.Random) -> str:
+    """Generate a random valid 10-digit North American number.
+
+    Args:
+        rng: Random number generator.
+
+    Returns:
+        Number formatted as XXX-XXX-XXXX.
+    """
+    while True:
+        area = rng.randint(200, 999)
+        # N11 codes (211, 311, ... 911) are service codes, not area codes
+        if area % 100 != 11:
+            break
+    exchange = rng.randint(200, 999)
+    line = rng.randint(0, 9999)
+    return f"{area}-{exchange}-{line:04d}"
+
+
+def _cumulative(weights: List[float]) -> List[float]:
+    total = 0.0
+    cumulative = []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+def _contacts_chunk(args: Tuple[int, int, int]) -> List[Tuple[str, str]]:
+    seed, chunk, count = args
+    rng = random.Random(f"{seed}:contacts:{chunk}")
+    first_names = list(FIRST_NAMES)
+    last_names = list(LAST_NAMES)
+    first_weights = _cumulative(list(FIRST_NAMES.values()))
+    last_weights = _cumulative(list(LAST_NAMES.values()))
+    firsts = rng.choices(first_names, cum_weights=first_weights, k=count)
+    lasts = rng.choices(last_names, cum_weights=last_weights, k=count)
+    return [(f"{first} {last}", generate_number(rng)) for first, last in zip(firsts, lasts)]
+
+
+def generate_contacts(count: int, seed: int = 0, workers: int = 1) -> Dict[str, str]:
+    """Generate contacts with realistic names and valid numbers.
+
+    Duplicate names get a numeric suffix ("Mary Smith 2").
+
+    Args:
+        count: Number of contacts to generate.
+        seed: Random seed; the same seed always gives the same contacts.
+        workers: Number of worker processes.
+
+    Returns:
+        Dictionary mapping contact names to phone numbers.
+    """
+    chunks = _split(count, (count + CONTACTS_CHUNK_SIZE - 1) // CONTACTS_CHUNK_SIZE)
+    tasks = [(seed, chunk, size) for chunk, size in enumerate(chunks)]
+    contacts: Dict[str, str] = {}
+    seen: Dict[str, int] = {}
+    for chunk in _map(_contacts_chunk, tasks, workers):
+        for name, number in chunk:
+            if name in seen:
+                seen[name] += 1
+                name = f"{name} {seen[name]}"
+            else:
+                seen[name] = 1
+            contacts[name] = number
+    return contacts
+
+
+# Per-process state shared by all history chunks, set by _init_history_worker
+_history_state: Dict[str, Any] = {}
+
+
+def _init_history_worker(pool: List[str], zipf_exponent: float, start: datetime,
+                         out_dir: Optional[str]) -> None:
+    formatted = {number: format_number(number) for number in pool}
+    _history_state.update({
+        'pool': pool,
+        'number_weights': _cumulative([1.0 / (rank ** zipf_exponent) for rank in range(1, len(pool) + 1)]),
+        'hour_weights': _cumulative(HOURLY_WEIGHTS),
+        'formatted': formatted,
+        'quoted': {number: (json.dumps(number), json.dumps(formatted[number])) for number in pool},
+        'start': start,
+        'out_dir': out_dir,
+    })
+
+
+def _history_chunk(args: Tuple[int, int, int]) -> Tuple[int, Optional[str], Optional[List[Dict[str, str]]]]:
+    seed, day_offset, count = args
+    state = _history_state
+    rng = random.Random(f"{seed}:history:{day_offset}")
+    day = state['start'] + timedelta(days=day_offset)
+    formatted = state['formatted']
+
+    hours = rng.choices(range(24), cum_weights=state['hour_weights'], k=count)
+    numbers = rng.choices(state['pool'], cum_weights=state['number_weights'], k=count)
+    seconds = sorted(hour * 3600 + rng.random() * 3600 for hour in hours)
+    entries = [
+        {
+            'number': number,
+            'formatted': formatted[number],
+            'timestamp': (day + timedelta(seconds=offset)).isoformat(),
+        }
+        for offset, number in zip(seconds, numbers)
+    ]
+
+    if state['out_dir'] is None:
+        return len(entries), None, entries
+
+    # Write the fragment in the same layout save_history() produces
+    quoted = state['quoted']
+    fd, path = tempfile.mkstemp(prefix="history-", suffix=".part", dir=state['out_dir'])
+    with os.fdopen(fd, 'w') as f:
+        f.write(",\n".join(
+            _ENTRY_LAYOUT.format(quoted[entry['number']][0], quoted[entry['number']][1], entry['timestamp'])
+            for entry in entries
+        ))
+    return len(entries), path, None
+
+
+def generate_history(count: int, numbers: List[str], days: int = 30,
+                     start: Optional[datetime] = None, seed: int = 0,
+                     zipf_exponent: float = 1.1, workers: int = 1,
+                     output_file: Optional[Path] = None) -> List[Dict[str, str]]:
+    """Generate a call history with Zipf-distributed numbers and diurnal timing.
+
+    Args:
+        count: Number of calls to generate.
+        numbers: Numbers to call; earlier numbers are called more often.
+        days: Number of days the history spans.
+        start: Midnight of the first day (default: ``days`` days before today
+            according to the active clock).
+        seed: Random seed; the same seed always gives the same history.
+        zipf_exponent: Skew of the number distribution (higher is more skewed).
+        workers: Number of worker processes.
+        output_file: If given, stream the history straight to this file in
+            save_history() format and return an empty list.
+
+    Returns:
+        List of history entries in time order (empty when output_file is used).
+
+    Raises:
+        ValueError: If there are no numbers to call or days is not positive.
+    """
+    if not numbers:
+        raise ValueError("At least one number is required to generate history")
+    if days < 1:
+        raise ValueError("Days must be at least 1")
+    if start is None:
+        from rotary_phone.clock import get_clock
+        today = get_clock().now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = today - timedelta(days=days)
+
+    out_dir = str(Path(output_file).parent) if output_file is not None else None
+    tasks = [(seed, day_offset, size) for day_offset, size in enumerate(_split(count, days))]
+    initargs = (list(numbers), zipf_exponent, start, out_dir)
+
+    if output_file is None:
+        history: List[Dict[str, str]] = []
+        for _, _, entries in _map(_history_chunk, tasks, workers, _init_history_worker, initargs):
+            history.extend(entries)
+        return history
+
+    # Concatenate the per-day fragments in order without loading them
+    tmp_file = Path(output_file).with_suffix('.tmp')
+    wrote_any = False
+    with open(tmp_file, 'w') as out:
+        out.write("[\n")
+        for written, path, _ in _map(_history_chunk, tasks, workers, _init_history_worker, initargs):
+            if written:
+                if wrote_any:
+                    out.write(",\n")
+                with open(path, 'r') as part:
+                    while True:
+                        block = part.read(1 << 20)
+                        if not block:
+                            break
+                        out.write(block)
+                wrote_any = True
+            os.unlink(path)
+        out.write("\n]" if wrote_any else "]")
+    os.replace(tmp_file, output_file)
+    return []
+
+
+def build_number_pool(contacts: Dict[str, str], extra: int = 0, seed: int = 0) -> List[str]:
+    """Build the list of numbers to draw calls from, in popularity order.
+
+    Args:
+        contacts: Contacts whose numbers should be called.
+        extra: Number of additional non-contact numbers to include.
+        seed: Random seed.
+
+    Returns:
+        Shuffled list of normalized numbers.
+    """
+    from rotary_phone.utils import normalize_number
+    rng = random.Random(f"{seed}:pool")
+    pool = sorted({normalize_number(number) for number in contacts.values()})
+    pool.extend(normalize_number(generate_number(rng)) for _ in range(extra))
+    rng.shuffle(pool)
+    return pool
+
+
+def generate_workload(contacts_count: int, calls_count: int, days: int = 30,
+                      seed: int = 0, workers: int = 1, direct: bool = False,
+                      zipf_exponent: float = 1.1, extra_numbers: Optional[int] = None) -> Dict[str, int]:
+    """Generate contacts and history into the active data directory.
+
+    Args:
+        contacts_count: Number of contacts to create.
+        calls_count: Number of history entries to create.
+        days: Number of days the history spans.
+        seed: Random seed.
+        workers: Number of worker processes.
+        direct: Write history straight to disk in parallel-built fragments
+            instead of going through save_history() (JSON storage backend
+            only; other backends always use save_history()).
+        zipf_exponent: Skew of the number distribution.
+        extra_numbers: Non-contact numbers to mix into the calls
+            (default: as many as there are contacts, at least 100).
+
+    Returns:
+        Dictionary with 'contacts' and 'calls' counts written.
+    """
+    from rotary_phone.contacts import save_contacts
+    from rotary_phone.history import flush_history, save_history
+
+    contacts = generate_contacts(contacts_count, seed=seed, workers=workers)
+    save_contacts(contacts)
+
+    if calls_count <= 0:
+        return {'contacts': len(contacts), 'calls': 0}
+
+    if extra_numbers is None:
+        extra_numbers = max(contacts_count, 100)
+    pool = build_number_pool(contacts, extra=extra_numbers, seed=seed)
+
+    from rotary_phone.storage import JsonFileBackend, get_backend
+    flush_history()
+    backend = get_backend()
+    if direct and isinstance(backend, JsonFileBackend):
+        generate_history(calls_count, pool, days=days, seed=seed, zipf_exponent=zipf_exponent,
+                         workers=workers, output_file=backend.path('history'))
+        from rotary_phone.changefeed import record_replace
+        from rotary_phone.digitindex import invalidate_digit_index
+        from rotary_phone.integrity import seal_file
+        seal_file(backend.path('history'))
+        record_replace('history')
+        invalidate_digit_index()
+    else:
+        history = generate_history(calls_count, pool, days=days, seed=seed,
+                                   zipf_exponent=zipf_exponent, workers=workers)
+        save_history(history)
+
+    from rotary_phone.config import get_config_value
+    if get_config_value('enable_rollups', False):
+        from rotary_phone.rollups import rebuild_rollups
+        rebuild_rollups()
+    return {'contacts': len(contacts), 'calls': calls_count}
+
+
+def _split(total: int, parts: int) -> List[int]:
+    """Split total into parts that differ by at most one."""
+    parts = max(1, parts)
+    base, remainder = divmod(total, parts)
+    return [base + (1 if i < remainder else 0) for i in range(parts)]
+
+
+def _map(func: Callable, tasks: List[Any], workers: int,
+         initializer: Optional[Callable] = None, initargs: Tuple = ()) -> Iterable[Any]:
+    """Map func over tasks in order, across worker processes if workers > 1."""
+    if workers <= 1 or len(tasks) <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        return map(func, tasks)
+
+    def results():
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                                 initargs=initargs) as executor:
+            yield from executor.map(func, tasks)
+    return results()
@@ -1,46 +1,181 @@
-"""Logging configuration for rotary phone."""
+"""Logging configuration for rotary phone.
 
+By default log records are handed to a queue and written by a background
+thread (``QueueHandler``/``QueueListener``), so the caller never waits for
+formatting or for the stream. Records go through the queue unformatted:
+the ``%``-style arguments are only merged into the message by the writer
+thread, and not at all for records below the logger level.
+
+Config options:
+
+- ``log_async``: write through the background thread (default True).
+- ``log_file``: also write JSON lines to this file, rotated by size.
+- ``log_file_max_bytes`` / ``log_file_backups``: rotation size and number
+  of rotated files kept.
+- ``log_debug_sample_rate``: fraction of DEBUG records kept (1.0 keeps all).
+"""
+
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+from datetime import datetime, timezone
+from typing import List, Optional
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_configured: List[logging.Logger] = []
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of DEBUG (and lower) records.
+
+    Sampling is deterministic: with a rate of 0.1 every tenth debug record
+    is kept. Records above DEBUG always pass.
+    """
+
+    def __init__(self, rate: float) -> None:
+        """Create the filter.
+
+        Args:
+            rate: Fraction of debug records to keep, from 0.0 to 1.0.
+        """
+        super().__init__()
+        self.rate = min(max(rate, 0.0), 1.0)
+        self._credit = 0.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        self._credit += self.rate
+        if self._credit >= 1.0:
+            self._credit -= 1.0
+            return True
+        return False
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """Queue records as they are, leaving formatting to the writer thread.
+
+    The standard QueueHandler formats each record before queueing it, which
+    is needed for queues that cross process boundaries but not here.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _make_handlers(level: int) -> List[logging.Handler]:
+    """Create the handlers that write log records out."""
+    from rotary_phone.config import get_config_value
+
+    console = logging.StreamHandler(sys.stdout)
+    # Use more detailed format with milliseconds
+    console.setFormatter(logging.Formatter(
+        '%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    handlers: List[logging.Handler] = [console]
+
+    log_file = get_config_value('log_file')
+    if log_file:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(get_config_value('log_file_max_bytes', 1_000_000)),
+            backupCount=int(get_config_value('log_file_backups', 3)),
+            encoding='utf-8',
+        )
+        file_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(file_handler)
+
+    for handler in handlers:
+        handler.setLevel(level)
+    return handlers
 
 
 def setup_logger(name: str = "rotary_phone", level: int = logging.INFO) -> logging.Logger:
     """Set up and configure the logger.
-    
+
+    The output handlers are built from the config the first time; call
+    shutdown_logging() to rebuild them after changing it.
+
     Args:
         name: Logger name.
         level: Logging level.
-    
+
     Returns:
         Configured logger instance.
     """
+    global _listener
     from rotary_phone.config import get_config_value
-    
+
     logger = logging.getLogger(name)
-    
+
     # Check if logging is enabled in config
     if not get_config_value('enable_logging', True):
         logger.setLevel(logging.CRITICAL)
         return logger
-    
+
     logger.setLevel(level)
-    
+
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setLevel(level)
-        
-        # Use more detailed format with milliseconds
-        formatter = logging.Formatter(
-            '%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        handler.setFormatter(formatter)
-        
-        logger.addHandler(handler)
-    
+        if get_config_value('log_async', True):
+            if _listener is None:
+                log_queue: queue.SimpleQueue = queue.SimpleQueue()
+                _listener = logging.handlers.QueueListener(log_queue, *_make_handlers(level),
+                                                           respect_handler_level=True)
+                _listener.start()
+            handlers = [_LazyQueueHandler(_listener.queue)]
+        else:
+            handlers = _make_handlers(level)
+
+        for handler in handlers:
+            logger.addHandler(handler)
+        # Sample on the logger so dropped records are never queued
+        sample_rate = float(get_config_value('log_debug_sample_rate', 1.0))
+        if sample_rate < 1.0:
+            logger.addFilter(SamplingFilter(sample_rate))
+        _configured.append(logger)
+
     return logger
 
 
+def shutdown_logging() -> None:
+    """Write out queued records and remove the handlers added by setup_logger.
 
+    Called automatically at exit. setup_logger() may be called again
+    afterwards, e.g. after changing the logging config.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    while _configured:
+        logger = _configured.pop()
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        for log_filter in list(logger.filters):
+            if isinstance(log_filter, SamplingFilter):
+                logger.removeFilter(log_filter)
 
 
+atexit.register(shutdown_logging)
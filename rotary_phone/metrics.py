@@ -0,0 +1,311 @@
+"""Timers and counters for hot-path instrumentation.
+
+Instrumentation is disabled by default. While disabled, :func:`timed` returns
+a shared no-op context manager and :func:`instrument` wrappers fall straight
+through to the wrapped function, so the cost is a single global lookup.
+"""
+
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+_enabled = False
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+# name -> [count, total_seconds, max_seconds]
+_timers: Dict[str, list] = {}
+
+
+def enable(flag: bool = True) -> None:
+    """Turn metric collection on or off.
+
+    Args:
+        flag: True to collect metrics, False to stop collecting.
+    """
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled() -> bool:
+    """Check whether metrics are being collected.
+
+    Returns:
+        True if collection is enabled.
+    """
+    return _enabled
+
+
+def incr(name: str, value: float = 1) -> None:
+    """Increment a counter.
+
+    Args:
+        name: Counter name (dotted, e.g. 'config.reads').
+        value: Amount to add.
+    """
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def record(name: str, seconds: float) -> None:
+    """Record one timed operation.
+
+    Args:
+        name: Timer name (dotted, e.g. 'history.load').
+        seconds: Elapsed time in seconds.
+    """
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            _timers[name] = [1, seconds, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+
+
+class _Timer:
+    """Context manager that records its elapsed time on exit."""
+
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        record(self.name, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    """No-op stand-in for _Timer used while metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timed(name: str):
+    """Time a block of code.
+
+    Args:
+        name: Timer name.
+
+    Returns:
+        A context manager; a shared no-op one when metrics are disabled.
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def instrument(name: str) -> Callable[[F], F]:
+    """Decorator that times every call of a function.
+
+    Args:
+        name: Timer name.
+
+    Returns:
+        Decorator.
+    """
+    def decorator(func: F) -> F:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Get a copy of the collected metrics.
+
+    Returns:
+        Dictionary with 'counters' (name -> value) and 'timers'
+        (name -> {'count', 'total', 'max'}).
+    """
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'timers': {
+                name: {'count': count, 'total': total, 'max': max_seconds}
+                for name, (count, total, max_seconds) in _timers.items()
+            },
+        }
+
+
+def reset() -> None:
+    """Discard all collected metrics."""
+    with _lock:
+        _counters.clear()
+        _timers.clear()
+
+
+def merge(base: Dict[str, Dict[str, Any]], extra: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Combine two metric snapshots.
+
+    Args:
+        base: Snapshot to merge into (not modified).
+        extra: Snapshot to add.
+
+    Returns:
+        New snapshot with counters summed and timers combined.
+    """
+    counters = dict(base.get('counters', {}))
+    for name, value in extra.get('counters', {}).items():
+        counters[name] = counters.get(name, 0) + value
+
+    timers = {name: dict(values) for name, values in base.get('timers', {}).items()}
+    for name, values in extra.get('timers', {}).items():
+        if name in timers:
+            timers[name]['count'] += values['count']
+            timers[name]['total'] += values['total']
+            timers[name]['max'] = max(timers[name]['max'], values['max'])
+        else:
+            timers[name] = dict(values)
+
+    return {'counters': counters, 'timers': timers}
+
+
+def format_summary(data: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """Format metrics as a human-readable table, slowest operations first.
+
+    Args:
+        data: Snapshot to format. Defaults to the current process metrics.
+
+    Returns:
+        Multi-line summary string.
+    """
+    if data is None:
+        data = snapshot()
+    lines = []
+    timers = sorted(data.get('timers', {}).items(), key=lambda item: item[1]['total'], reverse=True)
+    if timers:
+        lines.append(f"{'operation':<32} {'calls':>8} {'total ms':>12} {'avg ms':>10} {'max ms':>10}")
+        for name, values in timers:
+            avg = values['total'] / values['count'] if values['count'] else 0.0
+            lines.append(
+                f"{name:<32} {values['count']:>8} {values['total'] * 1000:>12.3f} "
+                f"{avg * 1000:>10.3f} {values['max'] * 1000:>10.3f}"
+            )
+    counters = sorted(data.get('counters', {}).items())
+    if counters:
+        if lines:
+            lines.append("")
+        lines.append(f"{'counter':<32} {'value':>8}")
+        for name, value in counters:
+            lines.append(f"{name:<32} {value:>8g}")
+    return "\n".join(lines)
+
+
+def format_prometheus(data: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """Format metrics in the Prometheus text exposition format.
+
+    Args:
+        data: Snapshot to format. Defaults to the current process metrics.
+
+    Returns:
+        Prometheus text format string.
+    """
+    if data is None:
+        data = snapshot()
+    timers = sorted(data.get('timers', {}).items())
+    counters = sorted(data.get('counters', {}).items())
+    lines = []
+
+    if timers:
+        series = (
+            ('rotary_phone_operation_calls_total', 'counter', 'Number of timed operations.', 'count'),
+            ('rotary_phone_operation_seconds_total', 'counter', 'Total time spent in operation.', 'total'),
+            ('rotary_phone_operation_seconds_max', 'gauge', 'Slowest single operation.', 'max'),
+        )
+        for metric, metric_type, help_text, field in series:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for name, values in timers:
+                lines.append(f'{metric}{{operation="{_escape_label(name)}"}} {values[field]:.9g}')
+
+    if counters:
+        lines.append("# HELP rotary_phone_events_total Event counters.")
+        lines.append("# TYPE rotary_phone_events_total counter")
+        for name, value in counters:
+            lines.append(f'rotary_phone_events_total{{name="{_escape_label(name)}"}} {value:g}')
+
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def export_prometheus(output_file: Path, data: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+    """Write metrics to a file in Prometheus text format.
+
+    Args:
+        output_file: Path to write.
+        data: Snapshot to export. Defaults to the current process metrics.
+
+    Raises:
+        IOError: If the file cannot be written.
+    """
+    with open(output_file, 'w') as f:
+        f.write(format_prometheus(data))
+
+
+def get_metrics_file() -> Path:
+    """Get the path to the accumulated metrics file of the file storage backends."""
+    from rotary_phone.config import ensure_config_dir
+    return ensure_config_dir() / "metrics.json"
+
+
+def load_metrics() -> Dict[str, Dict[str, Any]]:
+    """Load metrics accumulated by previous runs.
+
+    Returns:
+        Metrics snapshot, empty if nothing has been recorded yet.
+    """
+    from rotary_phone.storage import get_backend
+    data = get_backend().load_document('metrics')
+    if not isinstance(data, dict):
+        return {'counters': {}, 'timers': {}}
+    return data
+
+
+def save_metrics() -> None:
+    """Add this process's metrics to the accumulated metrics.
+
+    Raises:
+        IOError: If the metrics cannot be written.
+    """
+    from rotary_phone.storage import get_backend
+    combined = merge(load_metrics(), snapshot())
+    get_backend().save_document('metrics', combined)
+
+
+def clear_metrics() -> None:
+    """Remove accumulated metrics and reset the in-process counters."""
+    from rotary_phone.storage import get_backend
+    reset()
+    get_backend().delete_document('metrics')
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,254 @@
+"""International numbering plans for validating and formatting numbers.
+
+Per-region rules (country code, trunk prefix, valid national lengths,
+digit grouping and number type by leading digits) are read from
+``data/numbering_plans.json`` and compiled on first use into a digit trie
+keyed by country code plus leading digits. Looking up a number is a single
+walk down the trie, taking the deepest rule whose lengths fit.
+
+Numbers starting with ``+`` are parsed as E.164; other numbers are taken
+as national numbers of a region (the ``default_region`` config option
+unless given).
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PLAN_FILE = Path(__file__).with_name("data") / "numbering_plans.json"
+# E.164 allows at most 15 digits including the country code
+MAX_E164_DIGITS = 15
+_RULES = '$'
+
+_plan: Optional['NumberingPlan'] = None
+
+
+class NumberingPlan:
+    """Compiled numbering plans of all known regions."""
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        """Compile plan data into the lookup trie.
+
+        Args:
+            data: Parsed numbering plan file.
+
+        Raises:
+            ValueError: If a region is missing its country code or lengths.
+        """
+        self.regions: Dict[str, Dict[str, Any]] = {}
+        self._trie: Dict[str, Any] = {}
+        for region, spec in data.get('regions', {}).items():
+            if 'country_code' not in spec or 'lengths' not in spec:
+                raise ValueError(f"Numbering plan for {region} needs country_code and lengths")
+            default = {
+                'region': region,
+                'country_code': spec['country_code'],
+                'trunk_prefix': spec.get('trunk_prefix', ''),
+                'prefix': '',
+                'lengths': spec['lengths'],
+                'groups': spec.get('groups', []),
+                'type': spec.get('type', 'unknown'),
+                'national_format': spec.get('national_format'),
+                'international_format': spec.get('international_format'),
+            }
+            self.regions[region] = default
+            # More specific rules first, so they win at the same trie node
+            for rule in spec.get('rules', []):
+                self._insert({**default, **rule})
+            self._insert(default)
+
+    def _insert(self, rule: Dict[str, Any]) -> None:
+        rule['lengths'] = frozenset(rule['lengths'])
+        node = self._trie
+        for digit in rule['country_code'] + rule['prefix']:
+            node = node.setdefault(digit, {})
+        node.setdefault(_RULES, []).append(rule)
+
+    def lookup(self, digits: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Find the rule for an international number.
+
+        Args:
+            digits: Country code and national number, digits only.
+
+        Returns:
+            Tuple of (rule, region); the rule is None if the national number
+            has no valid length, and both are None for an unknown country code.
+        """
+        path = []
+        node = self._trie
+        for digit in digits:
+            node = node.get(digit)
+            if node is None:
+                break
+            if _RULES in node:
+                path.append(node[_RULES])
+        if not path:
+            return None, None
+        region = self.regions[path[0][0]['region']]
+        national_length = len(digits) - len(region['country_code'])
+        for rules in reversed(path):
+            for rule in rules:
+                if national_length in rule['lengths']:
+                    return rule, region
+        return None, region
+
+    def parse(self, number: str, region: Optional[str] = None) -> Dict[str, Any]:
+        """Parse, validate and format a number.
+
+        Args:
+            number: Number to parse, with or without formatting characters.
+            region: Region for numbers without ``+`` (e.g. 'US').
+
+        Returns:
+            Dictionary with:
+            - number: The input number
+            - valid: Whether the number fits a numbering plan
+            - region, country_code, national_number, type: None if unknown
+            - e164, international, national: Formatted number, or None if invalid
+        """
+        from rotary_phone.utils import normalize_number
+        cleaned = normalize_number(number)
+        info: Dict[str, Any] = {
+            'number': number, 'valid': False, 'region': None, 'country_code': None,
+            'national_number': None, 'type': None,
+            'e164': None, 'international': None, 'national': None,
+        }
+
+        if cleaned.startswith('+'):
+            digits = cleaned[1:]
+            if not digits.isdigit():
+                return info
+            rule, plan = self.lookup(digits)
+            if plan is not None and rule is None and plan['trunk_prefix']:
+                # Written with the trunk prefix, as in +44 (0)20 ...
+                trunk_digits = plan['country_code'] + plan['trunk_prefix']
+                if digits.startswith(trunk_digits):
+                    digits = plan['country_code'] + digits[len(trunk_digits):]
+                    rule, plan = self.lookup(digits)
+        else:
+            plan = self.regions.get(region.upper()) if region else None
+            if plan is None or not cleaned.isdigit():
+                return info
+            trunk = plan['trunk_prefix']
+            national = cleaned
+            if trunk and national.startswith(trunk) and len(national) - len(trunk) in plan['lengths']:
+                national = national[len(trunk):]
+            digits = plan['country_code'] + national
+            rule, plan = self.lookup(digits)
+
+        if plan is None:
+            return info
+        national = digits[len(plan['country_code']):]
+        info.update(region=plan['region'], country_code=plan['country_code'], national_number=national)
+        if rule is None or len(digits) > MAX_E164_DIGITS:
+            return info
+
+        groups = _split(national, rule['groups'])
+        info.update(
+            valid=True,
+            type=rule['type'],
+            e164=f"+{digits}",
+            international=f"+{rule['country_code']} " + _apply(rule['international_format'], groups),
+            national=_format_national(rule, groups),
+        )
+        return info
+
+
+def _split(digits: str, groups: List[int]) -> List[str]:
+    """Split digits into groups; any remainder joins the last group."""
+    parts = []
+    position = 0
+    for size in groups:
+        if position >= len(digits):
+            break
+        parts.append(digits[position:position + size])
+        position += size
+    if position < len(digits):
+        if parts:
+            parts[-1] += digits[position:]
+        else:
+            parts.append(digits[position:])
+    return parts
+
+
+def _apply(template: Optional[str], groups: List[str]) -> str:
+    if template is not None and template.count('{}') == len(groups):
+        return template.format(*groups)
+    return " ".join(groups)
+
+
+def _format_national(rule: Dict[str, Any], groups: List[str]) -> str:
+    if rule['national_format'] is not None:
+        return _apply(rule['national_format'], groups)
+    return rule['trunk_prefix'] + " ".join(groups)
+
+
+def load_numbering_plan(path: Optional[Path] = None) -> NumberingPlan:
+    """Read and compile a numbering plan file.
+
+    Args:
+        path: Plan file (default: the one shipped with the package).
+
+    Returns:
+        Compiled NumberingPlan.
+    """
+    with open(path or PLAN_FILE, 'r', encoding='utf-8') as f:
+        return NumberingPlan(json.load(f))
+
+
+def get_numbering_plan() -> NumberingPlan:
+    """Get the shipped numbering plan, compiling it on first use."""
+    global _plan
+    if _plan is None:
+        _plan = load_numbering_plan()
+    return _plan
+
+
+def get_default_region() -> str:
+    """Get the region used for numbers without a country code."""
+    from rotary_phone.config import get_config_value
+    return get_config_value('default_region', 'US')
+
+
+def parse_number(number: str, region: Optional[str] = None) -> Dict[str, Any]:
+    """Parse, validate and format a number.
+
+    Args:
+        number: Number to parse.
+        region: Region for numbers without ``+`` (default: the
+            ``default_region`` config option).
+
+    Returns:
+        Dictionary as returned by NumberingPlan.parse().
+    """
+    if region is None:
+        region = get_default_region()
+    return get_numbering_plan().parse(number, region)
+
+
+def classify_numbers(numbers: Iterable[str], region: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Parse, validate and format many numbers in one pass.
+
+    The plan and region are resolved once, and repeated numbers are parsed
+    only once.
+
+    Args:
+        numbers: Numbers to classify.
+        region: Region for numbers without ``+`` (default: the
+            ``default_region`` config option).
+
+    Returns:
+        One dictionary per input number, in order, as from parse_number().
+        Repeated numbers share one dictionary.
+    """
+    if region is None:
+        region = get_default_region()
+    plan = get_numbering_plan()
+    seen: Dict[str, Dict[str, Any]] = {}
+    results = []
+    for number in numbers:
+        info = seen.get(number)
+        if info is None:
+            info = seen[number] = plan.parse(number, region)
+        results.append(info)
+    return results
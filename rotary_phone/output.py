@@ -0,0 +1,92 @@
+"""Buffered record output in table, JSON lines and CSV formats."""
+
+import csv
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO
+
+FORMATS = ('table', 'jsonl', 'csv')
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+class RecordWriter:
+    """Write records to a text stream in large buffered blocks.
+
+    Rendered rows are collected in memory and handed to the stream once
+    ``buffer_size`` characters have accumulated, so output cost is dominated
+    by I/O rather than per-row write calls.
+    """
+
+    def __init__(self, stream: TextIO, fmt: str, columns: List[str],
+                 table_row: Optional[Callable[[Dict[str, Any]], str]] = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        """Create a record writer.
+
+        Args:
+            stream: Text stream to write to.
+            fmt: Output format: 'table', 'jsonl' or 'csv'.
+            columns: Record keys to output, in order.
+            table_row: Function rendering one record as a table row
+                (default: columns separated by two spaces).
+            buffer_size: Number of characters to buffer before writing.
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format: {fmt}")
+        self.stream = stream
+        self.fmt = fmt
+        self.columns = columns
+        self.table_row = table_row
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._parts: List[str] = []
+        self._size = 0
+        self._csv = csv.writer(self, lineterminator='\n') if fmt == 'csv' else None
+        if self._csv is not None:
+            self._csv.writerow(columns)
+
+    def write(self, text: str) -> None:
+        """Append raw text to the buffer (also the file interface for csv)."""
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def write_record(self, record: Dict[str, Any]) -> None:
+        """Render and buffer one record.
+
+        Args:
+            record: Record to write.
+        """
+        if self.fmt == 'jsonl':
+            self.write(json.dumps({key: record.get(key) for key in self.columns}) + "\n")
+        elif self.fmt == 'csv':
+            self._csv.writerow([record.get(key, '') for key in self.columns])
+        elif self.table_row is not None:
+            self.write(self.table_row(record) + "\n")
+        else:
+            self.write("  ".join(str(record.get(key, '')) for key in self.columns) + "\n")
+        self.count += 1
+
+    def write_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Write every record from an iterable and flush.
+
+        Args:
+            records: Records to write; consumed lazily.
+
+        Returns:
+            Number of records written.
+        """
+        for record in records:
+            self.write_record(record)
+        self.flush()
+        return self.count
+
+    def flush(self) -> None:
+        """Write buffered text to the stream."""
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self._parts = []
+            self._size = 0
+        self.stream.flush()
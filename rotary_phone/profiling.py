@@ -0,0 +1,190 @@
+"""CPU and memory profiling for CLI commands and library use.
+
+``--profile cpu`` runs the command under cProfile, writes a pstats file and
+prints the functions with the highest cumulative time. ``--profile mem``
+traces allocations with tracemalloc and prints the peak traced memory and
+the source lines holding the most memory when profiling stops.
+
+Setting ``RP_PROFILE=cpu`` or ``RP_PROFILE=mem`` does the same for any
+process that imports rotary_phone; the report is written at exit.
+``RP_PROFILE_OUTPUT`` and ``RP_PROFILE_TOP`` set the pstats path and the
+number of report lines.
+"""
+
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import tracemalloc
+import warnings
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, TextIO
+
+MODES = ('cpu', 'mem')
+PROFILE_ENV_VAR = 'RP_PROFILE'
+OUTPUT_ENV_VAR = 'RP_PROFILE_OUTPUT'
+TOP_ENV_VAR = 'RP_PROFILE_TOP'
+DEFAULT_OUTPUT = "rotary_phone.pstats"
+DEFAULT_TOP = 20
+# Stack depth recorded per allocation in memory mode
+TRACE_FRAMES = 5
+
+_active: Optional['Profiler'] = None
+
+
+class Profiler:
+    """Profile the code run between start() and stop()."""
+
+    def __init__(self, mode: str = 'cpu', output: Optional[Path] = None, top: int = DEFAULT_TOP,
+                 stream: Optional[TextIO] = None) -> None:
+        """Create a profiler.
+
+        Args:
+            mode: 'cpu' for cProfile or 'mem' for tracemalloc.
+            output: pstats file written in CPU mode (default: rotary_phone.pstats).
+            top: Number of functions or allocation sites to report.
+            stream: Where to print the report (default: stderr).
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (choose from {', '.join(MODES)})")
+        self.mode = mode
+        self.output = Path(output) if output is not None else Path(DEFAULT_OUTPUT)
+        self.top = top
+        self.stream = stream
+        self._profile: Optional[cProfile.Profile] = None
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """Start profiling."""
+        global _active
+        if self.mode == 'cpu':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start(TRACE_FRAMES)
+            elif hasattr(tracemalloc, 'reset_peak'):  # Python 3.9+
+                tracemalloc.reset_peak()
+        _active = self
+
+    def stop(self) -> str:
+        """Stop profiling and print the report.
+
+        Returns:
+            The report text.
+        """
+        global _active
+        if _active is self:
+            _active = None
+        report = self._stop_cpu() if self.mode == 'cpu' else self._stop_mem()
+        stream = self.stream if self.stream is not None else sys.stderr
+        stream.write(report)
+        stream.flush()
+        return report
+
+    def _stop_cpu(self) -> str:
+        profile = self._profile
+        if profile is None:
+            return ""
+        profile.disable()
+        self._profile = None
+        profile.dump_stats(str(self.output))
+
+        text = io.StringIO()
+        stats = pstats.Stats(profile, stream=text)
+        stats.strip_dirs().sort_stats('cumulative').print_stats(self.top)
+        return f"\nCPU profile written to {self.output}\n{text.getvalue()}"
+
+    def _stop_mem(self) -> str:
+        if not tracemalloc.is_tracing():
+            return ""
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        if self._started_tracing:
+            tracemalloc.stop()
+
+        lines = [
+            "",
+            f"Memory profile: peak {_format_size(peak)}, still allocated {_format_size(current)}",
+            f"Top {self.top} allocation sites still holding memory:",
+        ]
+        for i, stat in enumerate(snapshot.statistics('lineno')[:self.top], 1):
+            frame = stat.traceback[0]
+            lines.append(f"  {i:>2}. {frame.filename}:{frame.lineno}: "
+                         f"{_format_size(stat.size)} in {stat.count} blocks")
+        return "\n".join(lines) + "\n"
+
+
+def _format_size(size: int) -> str:
+    """Format a byte count for humans."""
+    value = float(size)
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+def is_active() -> bool:
+    """Check whether a profiler is running.
+
+    Returns:
+        True if profiling was started and not yet stopped.
+    """
+    return _active is not None
+
+
+@contextmanager
+def profile(mode: str = 'cpu', output: Optional[Path] = None, top: int = DEFAULT_TOP,
+            stream: Optional[TextIO] = None) -> Iterator[Profiler]:
+    """Profile the enclosed block and print a report when it exits.
+
+    Args:
+        mode: 'cpu' or 'mem'.
+        output: pstats file written in CPU mode.
+        top: Number of report lines.
+        stream: Where to print the report (default: stderr).
+
+    Yields:
+        The running Profiler.
+    """
+    profiler = Profiler(mode, output, top, stream)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+
+
+def install_from_env() -> Optional[Profiler]:
+    """Start profiling for the rest of the process if ``RP_PROFILE`` is set.
+
+    The report is printed at interpreter exit. Invalid settings only warn.
+
+    Returns:
+        The started Profiler, or None if profiling is not requested.
+    """
+    mode = os.environ.get(PROFILE_ENV_VAR, '').strip().lower()
+    if not mode or is_active():
+        return None
+    try:
+        top = int(os.environ.get(TOP_ENV_VAR, DEFAULT_TOP))
+        profiler = Profiler(mode, os.environ.get(OUTPUT_ENV_VAR) or None, top)
+    except ValueError as e:
+        warnings.warn(f"Ignoring {PROFILE_ENV_VAR}: {e}")
+        return None
+    profiler.start()
+    atexit.register(profiler.stop)
+    return profiler
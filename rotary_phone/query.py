@@ -0,0 +1,225 @@
+"""Indexed queries over call history.
+
+A secondary index maps each normalized number to the positions of its
+calls, and a timestamp index keeps all positions sorted by time. Queries
+select candidate positions from the most selective index and only look at
+the matching rows.
+
+The index is kept in memory only; it holds positions into the history
+list it was built from, never a second copy of the entries on disk. It is
+built from one consistent read of the history and the change-feed
+sequence, and after that each query applies just the history appends
+recorded in the feed since that sequence, so a process does not reload
+the history after every call. A ``replace`` record (import, clear,
+repair, feed compaction) makes the next query rebuild it. With the change
+feed disabled, and inside a snapshot, it is rebuilt whenever the stored
+history changes.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from rotary_phone import metrics
+
+TimeBound = Union[str, date, datetime, None]
+
+_cache: Optional[Tuple[Any, 'HistoryIndex']] = None
+
+
+class HistoryIndex:
+    """Number and timestamp indexes over a list of history entries."""
+
+    def __init__(self, entries: List[Dict[str, str]]) -> None:
+        """Build the indexes.
+
+        Args:
+            entries: History entries in stored order.
+        """
+        from rotary_phone.utils import normalize_number
+        self.seq = 0
+        self.entries = entries
+        self.timestamps = [entry.get('timestamp', '') for entry in entries]
+        self.by_number: Dict[str, List[int]] = {}
+        for position, entry in enumerate(entries):
+            self.by_number.setdefault(normalize_number(entry.get('number', '')), []).append(position)
+        self.time_order = sorted(range(len(entries)), key=self.timestamps.__getitem__)
+        self.sorted_timestamps = [self.timestamps[i] for i in self.time_order]
+
+    def append(self, entries: Iterable[Dict[str, str]]) -> None:
+        """Index entries appended to the stored history."""
+        from rotary_phone.utils import normalize_number
+        for entry in entries:
+            timestamp = entry.get('timestamp', '')
+            position = len(self.entries)
+            self.entries.append(entry)
+            self.timestamps.append(timestamp)
+            self.by_number.setdefault(normalize_number(entry.get('number', '')), []).append(position)
+            # Calls are mostly appended in time order, so this inserts at the end
+            at = bisect_right(self.sorted_timestamps, timestamp)
+            self.time_order.insert(at, position)
+            self.sorted_timestamps.insert(at, timestamp)
+
+    def trim(self, limit: int) -> bool:
+        """Drop the oldest stored entries beyond a history limit.
+
+        Returns:
+            True if entries were dropped.
+        """
+        drop = len(self.entries) - max(limit, 0)
+        if drop <= 0:
+            return False
+        del self.entries[:drop]
+        del self.timestamps[:drop]
+        by_number = {}
+        for number, positions in self.by_number.items():
+            kept = [p - drop for p in positions if p >= drop]
+            if kept:
+                by_number[number] = kept
+        self.by_number = by_number
+        self.time_order = [p - drop for p in self.time_order if p >= drop]
+        self.sorted_timestamps = [self.timestamps[i] for i in self.time_order]
+        return True
+
+    def positions_for_numbers(self, numbers: Iterable[str]) -> List[int]:
+        """Get positions of calls to any of the given normalized numbers."""
+        positions: List[int] = []
+        for number in set(numbers):
+            positions.extend(self.by_number.get(number, ()))
+        return positions
+
+    def positions_in_range(self, since: Optional[str], until: Optional[str]) -> List[int]:
+        """Get positions with since <= timestamp <= until, in time order."""
+        low = bisect_left(self.sorted_timestamps, since) if since is not None else 0
+        high = bisect_right(self.sorted_timestamps, until) if until is not None else len(self.time_order)
+        return self.time_order[low:high]
+
+
+def _build_index(backend: Any) -> HistoryIndex:
+    from rotary_phone.changefeed import last_seq
+    from rotary_phone.snapshot import consistent_read
+    with metrics.timed('query.build_index'):
+        # History appends and their feed records are written in one
+        # transaction, so this sequence covers exactly the entries read
+        _, (seq, entries) = consistent_read(lambda: (last_seq(), backend.load_history()))
+        index = HistoryIndex(entries)
+    index.seq = seq
+    return index
+
+
+def _catch_up(index: HistoryIndex, history_limit: int) -> bool:
+    """Apply the history changes recorded in the feed after the index's sequence.
+
+    Returns:
+        False if history was rewritten and the index must be rebuilt.
+    """
+    from rotary_phone.changefeed import changes_since
+    records = changes_since(index.seq)
+    for record in records:
+        if record['kind'] != 'history':
+            continue
+        if record['op'] == 'replace':
+            return False
+        index.append([record['entry']])
+    if records:
+        index.seq = records[-1]['seq']
+        index.trim(history_limit)
+    return True
+
+
+def get_history_index() -> HistoryIndex:
+    """Get the index over the stored history, brought up to date.
+
+    Returns:
+        HistoryIndex for the current history.
+    """
+    global _cache
+    from rotary_phone.changefeed import _enabled as feed_enabled
+    from rotary_phone.config import get_config_value
+    from rotary_phone.history import flush_history
+    from rotary_phone.snapshot import Snapshot
+    from rotary_phone.storage import get_backend
+
+    flush_history()
+    backend = get_backend()
+    if isinstance(backend, Snapshot) or not feed_enabled():
+        # Nothing to catch up from: index the history as read here
+        signature = backend.signature('history')
+        if _cache is not None and _cache[0] == signature:
+            return _cache[1]
+        with metrics.timed('query.build_index'):
+            index = HistoryIndex(backend.load_history())
+        _cache = (signature, index)
+        return index
+
+    if _cache is not None and _cache[0] is backend:
+        index = _cache[1]
+        if _catch_up(index, get_config_value('history_limit', 100)):
+            return index
+    index = _build_index(backend)
+    _cache = (backend, index)
+    return index
+
+
+@metrics.instrument('query.query_history')
+def query_history(number: Optional[str] = None, since: TimeBound = None, until: TimeBound = None,
+                  contact: Union[str, Iterable[str], None] = None, limit: Optional[int] = None,
+                  order: str = 'desc') -> List[Dict[str, str]]:
+    """Find history entries by number, contact and time range.
+
+    All given filters must match. Numbers are compared in normalized form.
+
+    Args:
+        number: Only calls to this number.
+        since: Only calls at or after this time (ISO string, date or datetime).
+        until: Only calls at or before this time; a bare date includes that whole day.
+        contact: Only calls to the number(s) of this contact name or these names.
+        limit: Maximum number of entries to return.
+        order: 'desc' for newest first or 'asc' for oldest first.
+
+    Returns:
+        Matching history entries.
+
+    Raises:
+        ValueError: If a time bound is not a valid ISO date/time or order is invalid.
+    """
+    from rotary_phone.utils import normalize_number, normalize_time_bound
+
+    if order not in ('asc', 'desc'):
+        raise ValueError(f"Invalid order: {order}")
+    since_key = normalize_time_bound(since)
+    until_key = normalize_time_bound(until, end_of_day=True)
+
+    numbers: Optional[set] = None
+    if number is not None:
+        numbers = {normalize_number(number)}
+    if contact is not None:
+        names = [contact] if isinstance(contact, str) else list(contact)
+        contact_numbers = _contact_numbers(names)
+        numbers = contact_numbers if numbers is None else numbers & contact_numbers
+
+    index = get_history_index()
+    if numbers is not None:
+        positions = index.positions_for_numbers(numbers)
+        timestamps = index.timestamps
+        if since_key is not None:
+            positions = [p for p in positions if timestamps[p] >= since_key]
+        if until_key is not None:
+            positions = [p for p in positions if timestamps[p] <= until_key]
+        positions.sort(key=timestamps.__getitem__)
+    else:
+        positions = index.positions_in_range(since_key, until_key)
+
+    if order == 'desc':
+        positions = positions[::-1]
+    if limit is not None:
+        positions = positions[:max(limit, 0)]
+    return [index.entries[p] for p in positions]
+
+
+def _contact_numbers(names: List[str]) -> set:
+    """Get the normalized numbers of the named contacts."""
+    from rotary_phone.contacts import load_contacts
+    from rotary_phone.utils import normalize_number
+    contacts = load_contacts()
+    return {normalize_number(contacts[name]) for name in names if name in contacts}
@@ -0,0 +1,322 @@
+"""Replication of contacts and history between hosts.
+
+Every data directory is a replica with its own host ID. Hosts exchange
+deltas through a shared directory (a network share or synced folder):
+:func:`sync` publishes the local changes since the previous sync, read
+from the change feed, as a file of operations under ``<shared>/<host>/``,
+and applies the operations other hosts published since it last saw them.
+
+Each operation carries the publishing host's operation number ``n`` and a
+Lamport timestamp. A replica remembers the highest ``n`` applied from each
+host (its version vector), so a sync reads only new delta files, and
+applies operations with CRDT semantics so that all replicas converge on
+identical data whatever order they sync in:
+
+- Contacts are last-writer-wins registers per name, ordered by
+  ``(lamport, host)``. Deletions are kept as tombstones, so a delete
+  wins over older updates that arrive later.
+- History is a grow-only set of entries, kept in timestamp order. Clearing
+  history is local and is not replicated.
+
+Changes applied from other hosts are recorded in the change feed with an
+``origin`` key and are never published again. Replication needs the
+change feed (the ``enable_change_feed`` config option).
+"""
+
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from rotary_phone import metrics
+
+REPLICA_DOCUMENT = 'replication'
+_HOST_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*$')
+_DELTA_PATTERN = re.compile(r'^(\d{12})-(\d{12})\.jsonl$')
+
+
+def _backend():
+    from rotary_phone.storage import get_backend
+    return get_backend()
+
+
+def _validate_host(host_id: str) -> str:
+    from rotary_phone.exceptions import ReplicationError
+    if not _HOST_PATTERN.match(host_id):
+        raise ReplicationError(f"Invalid host ID: {host_id!r} (use letters, digits, '.', '_' and '-')")
+    return host_id
+
+
+def get_replica_state() -> Optional[Dict[str, Any]]:
+    """Get the replication state of the data directory.
+
+    Returns:
+        Dictionary with host (the host ID), clock (Lamport clock), ops
+        (operations published), published_seq (last change-feed sequence
+        published), vector (operations applied per host) and contacts
+        (``[lamport, host, number]`` per contact name; number is None for a
+        deleted contact), or None if this store has never replicated.
+    """
+    return _backend().load_document(REPLICA_DOCUMENT)
+
+
+def init_replica(host_id: Optional[str] = None) -> str:
+    """Make the data directory a replica.
+
+    Args:
+        host_id: Host ID to use (default: a random ID).
+
+    Returns:
+        The host ID of the replica.
+
+    Raises:
+        ReplicationError: If the ID is invalid, or the store is already a
+            replica with another ID.
+    """
+    from rotary_phone.exceptions import ReplicationError
+    state = get_replica_state()
+    if state is not None:
+        if host_id is not None and host_id != state['host']:
+            raise ReplicationError(f"This store already replicates as {state['host']}")
+        return state['host']
+    host_id = _validate_host(host_id) if host_id is not None else uuid.uuid4().hex[:12]
+    _backend().save_document(REPLICA_DOCUMENT, {
+        'host': host_id, 'clock': 0, 'ops': 0, 'published_seq': None, 'vector': {}, 'contacts': {},
+    })
+    return host_id
+
+
+def _entry_key(entry: Dict[str, Any]) -> str:
+    return json.dumps(entry, sort_keys=True, separators=(',', ':'))
+
+
+def _entry_order(entry: Dict[str, Any]) -> Tuple[str, str]:
+    return entry.get('timestamp', ''), _entry_key(entry)
+
+
+def _local_ops(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Collect the local changes not yet published, from the change feed."""
+    from rotary_phone.changefeed import changes_since, last_seq
+    from rotary_phone.contacts import load_contacts
+    from rotary_phone.history import load_history
+
+    if state['published_seq'] is None:
+        # First sync: publish everything there is
+        records: List[Dict[str, Any]] = []
+        published_seq = last_seq()
+        contacts_replace = history_replace = True
+    else:
+        records = changes_since(state['published_seq'])
+        # Advance only past what was read: a change recorded after this read
+        # is published by the next sync
+        published_seq = records[-1]['seq'] if records else state['published_seq']
+        records = [r for r in records if 'origin' not in r]
+        contacts_replace = any(r['kind'] == 'contacts' and r['op'] == 'replace' for r in records)
+        history_replace = any(r['kind'] == 'history' and r['op'] == 'replace' for r in records)
+
+    ops: List[Dict[str, Any]] = []
+    if contacts_replace:
+        # Rewritten wholesale: publish the difference to the replicated state
+        contacts = load_contacts()
+        registers = state['contacts']
+        for name, number in contacts.items():
+            if name not in registers or registers[name][2] != number:
+                ops.append({'kind': 'contact', 'name': name, 'number': number})
+        for name, register in registers.items():
+            if register[2] is not None and name not in contacts:
+                ops.append({'kind': 'contact', 'name': name, 'number': None})
+    if history_replace:
+        ops.extend({'kind': 'history', 'entry': entry} for entry in load_history())
+
+    for record in records:
+        if record['kind'] == 'contacts' and record['op'] != 'replace' and not contacts_replace:
+            ops.append({'kind': 'contact', 'name': record['name'], 'number': record.get('number')})
+        elif record['kind'] == 'history' and record['op'] == 'append' and not history_replace:
+            ops.append({'kind': 'history', 'entry': record['entry']})
+    state['published_seq'] = published_seq
+    return ops
+
+
+def _publish(shared_dir: Path, state: Dict[str, Any], ops: List[Dict[str, Any]]) -> None:
+    """Stamp local operations and write them as one delta file."""
+    host = state['host']
+    first = state['ops'] + 1
+    lines = []
+    for op in ops:
+        state['ops'] += 1
+        state['clock'] += 1
+        op['n'] = state['ops']
+        op['lamport'] = state['clock']
+        if op['kind'] == 'contact':
+            state['contacts'][op['name']] = [state['clock'], host, op['number']]
+        lines.append(json.dumps(op) + "\n")
+    directory = shared_dir / host
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{first:012d}-{state['ops']:012d}.jsonl"
+    tmp_path = directory / f".{path.name}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write("".join(lines))
+    os.replace(tmp_path, path)
+    state['vector'][host] = state['ops']
+
+
+def _remote_ops(shared_dir: Path, state: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield the operations of other hosts not applied yet, advancing the vector."""
+    for host_dir in sorted(shared_dir.iterdir()):
+        host = host_dir.name
+        if host == state['host'] or not host_dir.is_dir() or not _HOST_PATTERN.match(host):
+            continue
+        seen = state['vector'].get(host, 0)
+        deltas = []
+        for path in host_dir.iterdir():
+            match = _DELTA_PATTERN.match(path.name)
+            if match:
+                deltas.append((int(match.group(1)), int(match.group(2)), path))
+        for first, last, path in sorted(deltas):
+            if last <= seen:
+                continue
+            if first > seen + 1:
+                # A delta is missing (still being copied); resume here next time
+                break
+            with open(path, 'r') as f:
+                for line in f:
+                    op = json.loads(line)
+                    if op['n'] > seen:
+                        yield host, op
+                        seen = op['n']
+        state['vector'][host] = seen
+
+
+def _apply_contacts(changes: Dict[str, Tuple[str, Optional[str]]]) -> int:
+    """Apply winning contact registers to the store."""
+    from rotary_phone.changefeed import record_contact
+    from rotary_phone.digitindex import index_contact, updating_digit_index
+    backend = _backend()
+    changed = 0
+    for name, (host, number) in changes.items():
+        current = backend.get_contact(name)
+        with updating_digit_index('contacts') as index:
+            if number is None:
+                if current is None or not backend.delete_contact(name):
+                    continue
+            elif current == number:
+                continue
+            else:
+                backend.put_contact(name, number)
+            record_contact(name, number, origin=host)
+            index_contact(index, name, number)
+        changed += 1
+    return changed
+
+
+def _apply_history(host: str, entries: List[Dict[str, Any]]) -> int:
+    """Add entries from one host to the history set, keeping timestamp order."""
+    from rotary_phone.changefeed import record_replace
+    from rotary_phone.config import load_config
+    from rotary_phone.history import _write_entries, _write_lock, flush_history, load_history
+
+    flush_history()
+    history = load_history()
+    entries = sorted(entries, key=_entry_order)
+    # Only local entries at or after the oldest incoming one can be duplicates
+    oldest = entries[0].get('timestamp', '')
+    known = set()
+    for entry in reversed(history):
+        if entry.get('timestamp', '') < oldest:
+            break
+        known.add(_entry_key(entry))
+    new = []
+    for entry in entries:
+        key = _entry_key(entry)
+        if key not in known:
+            known.add(key)
+            new.append(entry)
+    if not new:
+        return 0
+
+    if not history or _entry_order(new[0]) > _entry_order(history[-1]):
+        _write_entries(new, origin=host)
+        return len(new)
+
+    config = load_config()
+    limit = config.get('history_limit', 100)
+    merged = sorted(history + new, key=_entry_order)
+    merged = merged[-limit:] if limit > 0 else []
+    with _write_lock:
+        with metrics.timed('history.save'):
+            _backend().save_history(merged)
+        record_replace('history', origin=host)
+        if config.get('enable_rollups', False):
+            from rotary_phone.rollups import record_calls
+            record_calls(new)
+    return len(new)
+
+
+def sync(shared_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """Exchange changes with the other hosts using a shared directory.
+
+    The store becomes a replica with a random host ID on its first sync
+    (see init_replica()).
+
+    Args:
+        shared_dir: Directory shared by all hosts (default: the
+            ``replication_dir`` config option).
+
+    Returns:
+        Dictionary with host, published (operations published),
+        received (operations applied from other hosts), contacts_changed
+        and history_added.
+
+    Raises:
+        ReplicationError: If no shared directory is configured or the change
+            feed is disabled.
+    """
+    from rotary_phone.config import get_config_value
+    from rotary_phone.exceptions import ReplicationError
+    from rotary_phone.snapshot import write_transaction
+
+    if shared_dir is None:
+        shared_dir = get_config_value('replication_dir')
+        if not shared_dir:
+            raise ReplicationError("No shared directory given and replication_dir is not set")
+    if not get_config_value('enable_change_feed', False):
+        raise ReplicationError("Replication needs the change feed (enable_change_feed)")
+    shared_dir = Path(shared_dir).expanduser()
+    shared_dir.mkdir(parents=True, exist_ok=True)
+
+    with metrics.timed('replication.sync'), write_transaction():
+        init_replica()
+        state = get_replica_state()
+        ops = _local_ops(state)
+        if ops:
+            _publish(shared_dir, state, ops)
+
+        received = 0
+        contacts: Dict[str, Tuple[str, Optional[str]]] = {}
+        history: Dict[str, List[Dict[str, Any]]] = {}
+        for host, op in _remote_ops(shared_dir, state):
+            received += 1
+            state['clock'] = max(state['clock'], op['lamport'])
+            if op['kind'] == 'contact':
+                register = state['contacts'].get(op['name'])
+                if register is None or (op['lamport'], host) > (register[0], register[1]):
+                    state['contacts'][op['name']] = [op['lamport'], host, op['number']]
+                    contacts[op['name']] = (host, op['number'])
+            elif op['kind'] == 'history':
+                history.setdefault(host, []).append(op['entry'])
+
+        contacts_changed = _apply_contacts(contacts)
+        history_added = sum(_apply_history(host, entries) for host, entries in sorted(history.items()))
+        _backend().save_document(REPLICA_DOCUMENT, state)
+
+    metrics.incr('replication.published', len(ops))
+    metrics.incr('replication.received', received)
+    return {
+        'host': state['host'],
+        'published': len(ops),
+        'received': received,
+        'contacts_changed': contacts_changed,
+        'history_added': history_added,
+    }
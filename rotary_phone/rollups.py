@@ -0,0 +1,296 @@
+"""Materialized per-minute, per-hour and per-day call counts.
+
+Every call written to history is also counted in a rollup table keyed by
+time bucket and number. New calls land in the minute tier; compaction folds
+minute buckets older than ``rollup_raw_days`` into the hour tier and hour
+buckets older than ``rollup_hourly_days`` into the day tier, which is kept
+forever. The tiers never overlap, so a query sums all three. Rollups
+survive history truncation and clear_history, so long-term trends remain
+available after the raw entries are gone.
+
+New calls are first collected in a small pending document, which is
+folded into the tables (and compaction run) once ``rollup_flush_batch``
+calls have built up, so recording a call rewrites only the pending calls.
+Readers see the tables and the pending calls combined.
+"""
+
+import itertools
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from rotary_phone import metrics
+from rotary_phone.config import ensure_config_dir
+
+TIERS = ('minute', 'hour', 'day')
+# Length of a bucket key ('YYYY-MM-DDTHH:MM', 'YYYY-MM-DDTHH', 'YYYY-MM-DD')
+KEY_LENGTHS = {'minute': 16, 'hour': 13, 'day': 10}
+PENDING_DOCUMENT = 'rollups_pending'
+
+_cache: Optional[Tuple[Hashable, Dict[str, Any]]] = None
+
+
+def get_rollups_file() -> Path:
+    """Get the path to the rollups file of the file storage backends."""
+    config_dir = ensure_config_dir()
+    return config_dir / "rollups.json"
+
+
+def _empty_rollups() -> Dict[str, Any]:
+    return {'minute': {}, 'hour': {}, 'day': {}, 'compacted_through': ''}
+
+
+def _load_pending(backend: Any) -> Dict[str, Any]:
+    pending = backend.load_document(PENDING_DOCUMENT)
+    if not isinstance(pending, dict):
+        return {'minute': {}, 'calls': 0}
+    return pending
+
+
+def _built(backend: Any) -> bool:
+    return backend.has_document('rollups') or backend.has_document(PENDING_DOCUMENT)
+
+
+def _load_tables(backend: Any) -> Dict[str, Any]:
+    """Load the stored tables without the pending calls (cached; do not modify)."""
+    global _cache
+    signature = backend.signature('rollups')
+    if _cache is not None and _cache[0] == signature:
+        return _cache[1]
+
+    with metrics.timed('rollups.load'):
+        data = backend.load_document('rollups')
+    if not isinstance(data, dict):
+        data = _empty_rollups()
+    for tier in TIERS:
+        data.setdefault(tier, {})
+    data.setdefault('compacted_through', '')
+    _cache = (signature, data)
+    return data
+
+
+def load_rollups() -> Dict[str, Any]:
+    """Load the rollup tables, with the pending calls counted in.
+
+    The parsed tables are cached in-process until the stored rollups
+    change; the result is a copy the caller may modify.
+
+    Returns:
+        Dictionary with 'minute', 'hour' and 'day' tiers mapping bucket keys
+        to {number: count}, plus the 'compacted_through' watermark.
+    """
+    from rotary_phone.storage import get_backend
+    backend = get_backend()
+    tables = _load_tables(backend)
+    data = {tier: {key: dict(numbers) for key, numbers in tables[tier].items()} for tier in TIERS}
+    data['compacted_through'] = tables['compacted_through']
+    minute = data['minute']
+    for key, numbers in _load_pending(backend)['minute'].items():
+        bucket = minute.setdefault(key, {})
+        for number, count in numbers.items():
+            bucket[number] = bucket.get(number, 0) + count
+    return data
+
+
+def save_rollups(rollups: Dict[str, Any]) -> None:
+    """Save the rollup tables.
+
+    Args:
+        rollups: Rollup tables as returned by load_rollups().
+
+    Raises:
+        IOError: If the rollups cannot be written.
+    """
+    global _cache
+    from rotary_phone.storage import get_backend
+    backend = get_backend()
+    with metrics.timed('rollups.save'):
+        backend.save_document('rollups', rollups)
+        # The saved tables include the pending calls
+        if backend.has_document(PENDING_DOCUMENT):
+            backend.delete_document(PENDING_DOCUMENT)
+    # The caller keeps the tables it passed in; reload rather than share them
+    _cache = None
+
+
+def record_calls(entries: Iterable[Dict[str, str]]) -> None:
+    """Count history entries into the minute tier.
+
+    The entries are added to the pending calls; once ``rollup_flush_batch``
+    calls are pending they are folded into the tables and compaction runs
+    if due.
+
+    Args:
+        entries: History entries with 'number' and 'timestamp'.
+    """
+    from rotary_phone.config import get_config_value
+    from rotary_phone.storage import get_backend
+    entries = list(entries)
+    backend = get_backend()
+    pending = _load_pending(backend)
+    if pending['calls'] + len(entries) < get_config_value('rollup_flush_batch', 100):
+        _add_entries(pending, entries)
+        pending['calls'] += len(entries)
+        with metrics.timed('rollups.save'):
+            backend.save_document(PENDING_DOCUMENT, pending)
+        return
+    rollups = load_rollups()
+    _add_entries(rollups, entries)
+    compact(rollups)
+    save_rollups(rollups)
+
+
+def _add_entries(rollups: Dict[str, Any], entries: Iterable[Dict[str, str]]) -> None:
+    minute = rollups['minute']
+    length = KEY_LENGTHS['minute']
+    for entry in entries:
+        timestamp = entry.get('timestamp', '')
+        if len(timestamp) < length:
+            continue
+        bucket = minute.setdefault(timestamp[:length], {})
+        number = entry.get('number', '')
+        bucket[number] = bucket.get(number, 0) + 1
+
+
+def compact(rollups: Dict[str, Any], now: Optional[datetime] = None) -> bool:
+    """Fold expired minute buckets into hours and expired hours into days.
+
+    Compaction runs at most once per hour of (clock) time.
+
+    Args:
+        rollups: Rollup tables to compact in place.
+        now: Reference time (default: the active clock).
+
+    Returns:
+        True if compaction ran.
+    """
+    from rotary_phone.config import load_config
+    if now is None:
+        from rotary_phone.clock import get_clock
+        now = get_clock().now()
+
+    watermark = now.isoformat()[:KEY_LENGTHS['hour']]
+    if rollups.get('compacted_through', '') >= watermark:
+        return False
+
+    config = load_config()
+    raw_cutoff = (now - timedelta(days=config.get('rollup_raw_days', 7))).isoformat()
+    hourly_cutoff = (now - timedelta(days=config.get('rollup_hourly_days', 180))).isoformat()
+    _fold(rollups, 'minute', 'hour', raw_cutoff[:KEY_LENGTHS['minute']])
+    _fold(rollups, 'hour', 'day', hourly_cutoff[:KEY_LENGTHS['hour']])
+    rollups['compacted_through'] = watermark
+    return True
+
+
+def _fold(rollups: Dict[str, Any], source: str, target: str, cutoff: str) -> None:
+    source_tier = rollups[source]
+    target_tier = rollups[target]
+    length = KEY_LENGTHS[target]
+    for key in [key for key in source_tier if key < cutoff]:
+        bucket = target_tier.setdefault(key[:length], {})
+        for number, count in source_tier.pop(key).items():
+            bucket[number] = bucket.get(number, 0) + count
+
+
+def rebuild_rollups() -> int:
+    """Recreate the rollup tables from the current raw history.
+
+    Returns:
+        Number of history entries counted.
+    """
+    from rotary_phone.history import iter_history
+    rollups = _empty_rollups()
+    count = 0
+
+    def counted():
+        nonlocal count
+        for entry in iter_history():
+            count += 1
+            yield entry
+
+    _add_entries(rollups, counted())
+    compact(rollups)
+    save_rollups(rollups)
+    return count
+
+
+def _buckets(since: Optional[str], until: Optional[str], number: Optional[str], tiers: Iterable[str]):
+    """Yield (bucket_key, count) for buckets in range across tiers.
+
+    Pending calls are yielded as extra minute buckets, so a key may repeat.
+    """
+    from rotary_phone.storage import get_backend
+    from rotary_phone.utils import normalize_number, normalize_time_bound
+    backend = get_backend()
+    tables = _load_tables(backend)
+    pending = _load_pending(backend)['minute']
+    if number is not None:
+        number = normalize_number(number)
+    since = normalize_time_bound(since)
+    until = normalize_time_bound(until, end_of_day=True)
+    for tier in tiers:
+        length = KEY_LENGTHS[tier]
+        low = since[:length] if since else None
+        high = until[:length] if until else None
+        buckets = tables[tier].items()
+        if tier == 'minute':
+            buckets = itertools.chain(buckets, pending.items())
+        for key, numbers in buckets:
+            if (low is not None and key < low) or (high is not None and key > high):
+                continue
+            if number is not None:
+                count = numbers.get(number, 0)
+                if count:
+                    yield key, count
+            else:
+                yield key, sum(numbers.values())
+
+
+@metrics.instrument('rollups.get_daily_counts')
+def get_daily_counts(since: Optional[str] = None, until: Optional[str] = None,
+                     number: Optional[str] = None) -> Dict[str, int]:
+    """Get call counts per day from the rollup tables.
+
+    Args:
+        since: First date or timestamp to include (ISO format).
+        until: Last date or timestamp to include (ISO format).
+        number: Only count calls to this number.
+
+    Returns:
+        Dictionary mapping date strings (YYYY-MM-DD) to call counts.
+    """
+    counts: Dict[str, int] = {}
+    for key, count in _buckets(since, until, number, TIERS):
+        day = key[:10]
+        counts[day] = counts.get(day, 0) + count
+    return counts
+
+
+@metrics.instrument('rollups.get_hourly_counts')
+def get_hourly_counts(since: Optional[str] = None, until: Optional[str] = None,
+                      number: Optional[str] = None) -> Dict[int, int]:
+    """Get call counts per hour of day from the rollup tables.
+
+    Only the minute and hour tiers carry hour information, so calls older
+    than ``rollup_hourly_days`` are not included.
+
+    Args:
+        since: First date or timestamp to include (ISO format).
+        until: Last date or timestamp to include (ISO format).
+        number: Only count calls to this number.
+
+    Returns:
+        Dictionary mapping hour (0-23) to call counts.
+    """
+    counts: Dict[int, int] = {}
+    for key, count in _buckets(since, until, number, ('minute', 'hour')):
+        hour = int(key[11:13])
+        counts[hour] = counts.get(hour, 0) + count
+    return counts
+
+
+def ensure_rollups() -> None:
+    """Build the rollup tables from history if they have never been built."""
+    from rotary_phone.storage import get_backend
+    if not _built(get_backend()):
+        rebuild_rollups()
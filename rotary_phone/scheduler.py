@@ -0,0 +1,357 @@
+"""Multi-line dial scheduling with rate limiting.
+
+A :class:`DialScheduler` simulates a switch with a fixed number of trunk
+lines. Pending calls wait in a priority queue, a token bucket caps the rate at
+which calls are started, and one worker thread per line dials them through
+:func:`rotary_phone.dialer.dial`.
+
+With a :class:`~rotary_phone.clock.VirtualClock` the lines run as a
+discrete-event simulation instead: each line keeps its own simulated time,
+and every queued call goes to the line that frees up first, so runs are
+deterministic and several lines really overlap in simulated time.
+"""
+
+import heapq
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from rotary_phone.clock import VirtualClock, get_clock
+from rotary_phone.exceptions import QueueFullError, RotaryPhoneError
+
+
+class TokenBucket:
+    """Token-bucket rate limiter.
+
+    Tokens refill at ``rate`` per second up to ``capacity``. A rate of 0
+    disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock: Any = None) -> None:
+        """Create a token bucket.
+
+        Args:
+            rate: Tokens added per second (0 for unlimited).
+            capacity: Maximum burst size (default: max(rate, 1)).
+            clock: Clock providing monotonic() and sleep() (default: the active clock).
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(self.rate, 1.0)
+        self._clock = clock or get_clock()
+        self._tokens = self.capacity
+        self._last = self._clock.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token, borrowing from the future if none is available.
+
+        Returns:
+            Clock time at which the caller may proceed.
+        """
+        now = self._clock.monotonic()
+        if self.rate <= 0:
+            return now
+        with self._lock:
+            # Refill based on elapsed time, never beyond capacity
+            elapsed = max(now - self._last, 0.0)
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last = max(now, self._last)
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return now
+            return self._last + (-self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Block until a token is available.
+
+        Returns:
+            Clock time at which the token became available.
+        """
+        start_at = self.reserve()
+        self._clock.sleep(start_at - self._clock.monotonic())
+        return start_at
+
+
+class DialScheduler:
+    """Dial queued numbers over several lines at a capped call rate."""
+
+    def __init__(self, lines: int = 1, rate: float = 0.0, max_queue: int = 0,
+                 burst: Optional[float] = None, clock: Any = None,
+                 dial_func: Optional[Callable[..., Any]] = None, **dial_kwargs: Any) -> None:
+        """Create a scheduler.
+
+        Args:
+            lines: Number of concurrent lines (trunks).
+            rate: Maximum calls started per second (0 for unlimited).
+            max_queue: Maximum pending calls before submit() applies
+                backpressure (0 for unbounded).
+            burst: Token-bucket capacity (default: max(rate, 1)).
+            clock: Clock providing monotonic() and sleep() (default: the active clock).
+            dial_func: Function called as dial_func(number, **dial_kwargs)
+                (default: rotary_phone.dialer.dial).
+            **dial_kwargs: Extra keyword arguments for dial_func.
+        """
+        if lines < 1:
+            raise ValueError("Number of lines must be at least 1")
+        if rate < 0:
+            raise ValueError("Rate must be non-negative")
+        if dial_func is None:
+            from rotary_phone.dialer import dial
+            dial_func = dial
+            dial_kwargs.setdefault('quiet', True)
+
+        self.lines = lines
+        self.max_queue = max_queue
+        self._clock = clock or get_clock()
+        self._bucket = TokenBucket(rate, burst, self._clock)
+        self._dial_func = dial_func
+        self._dial_kwargs = dial_kwargs
+        self._queue: List[tuple] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._workers: List[threading.Thread] = []
+        self._results: List[Dict[str, Any]] = []
+        self._line_stats = [{'line': i, 'calls': 0, 'busy': 0.0} for i in range(lines)]
+        self._simulated = isinstance(self._clock, VirtualClock)
+        # Simulated time at which each line is free again
+        self._line_free = [0.0] * lines
+        self._started = False
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    def submit(self, number: str, priority: int = 0, block: bool = True,
+               timeout: Optional[float] = None) -> None:
+        """Queue a number for dialing.
+
+        Lower priority values are dialed first; equal priorities are FIFO.
+
+        Args:
+            number: Number to dial.
+            priority: Call priority.
+            block: If the queue is full, wait for room instead of failing.
+            timeout: Maximum seconds to wait for room when blocking.
+
+        Raises:
+            QueueFullError: If the queue is full and the call could not be queued.
+        """
+        with self._cond:
+            if self._closing:
+                raise QueueFullError("Scheduler is closed")
+            if self.max_queue > 0 and len(self._queue) >= self.max_queue:
+                if not block:
+                    raise QueueFullError(f"Dial queue is full ({self.max_queue} pending calls)")
+                if self._simulated and self._started:
+                    # Wait for the next line to take a call
+                    self._dispatch_next()
+            if self.max_queue > 0 and len(self._queue) >= self.max_queue:
+                has_room = self._cond.wait_for(
+                    lambda: len(self._queue) < self.max_queue or self._closing, timeout
+                )
+                if not has_room or self._closing:
+                    raise QueueFullError(f"Dial queue is full ({self.max_queue} pending calls)")
+            call = {
+                'number': number,
+                'priority': priority,
+                'enqueued': self._clock.monotonic(),
+            }
+            heapq.heappush(self._queue, (priority, next(self._counter), call))
+            self._cond.notify_all()
+
+    def pending(self) -> int:
+        """Get the number of calls waiting in the queue."""
+        with self._cond:
+            return len(self._queue)
+
+    def start(self) -> None:
+        """Start one worker thread per line (with a virtual clock, start the simulation)."""
+        if self._started:
+            return
+        self._started = True
+        self._started_at = self._clock.monotonic()
+        self._line_free = [self._started_at] * self.lines
+        if self._simulated:
+            return
+        for line in range(self.lines):
+            worker = threading.Thread(
+                target=self._run_line, args=(line,), name=f"rotary-phone-line-{line}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting calls and let the lines drain the queue.
+
+        Args:
+            wait: Block until every queued call has been dialed.
+        """
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            if self._simulated and self._started:
+                while self._queue:
+                    self._dispatch_next()
+                self._clock.seek(max(self._line_free))
+                self._finished_at = self._clock.monotonic()
+                return
+        if wait:
+            for worker in self._workers:
+                worker.join()
+            self._finished_at = self._clock.monotonic()
+
+    def run(self, numbers: List[Any]) -> Dict[str, Any]:
+        """Dial a batch of numbers and wait for completion.
+
+        Args:
+            numbers: Numbers to dial, either strings or (number, priority) tuples.
+
+        Returns:
+            Statistics as returned by stats().
+        """
+        self.start()
+        for item in numbers:
+            if isinstance(item, tuple):
+                self.submit(item[0], priority=item[1])
+            else:
+                self.submit(item)
+        self.close()
+        return self.stats()
+
+    def results(self) -> List[Dict[str, Any]]:
+        """Get per-call results in completion order.
+
+        Returns:
+            List of dictionaries with 'number', 'priority', 'line', 'enqueued',
+            'started', 'finished', 'queue_latency' and 'error' (None on success).
+        """
+        with self._cond:
+            return list(self._results)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get line utilization and queue latency statistics.
+
+        Returns:
+            Dictionary with 'calls', 'failed', 'elapsed', 'lines' (per-line
+            'calls', 'busy' and 'utilization') and 'queue_latency'
+            ('avg', 'max', 'p95' in seconds).
+        """
+        with self._cond:
+            results = list(self._results)
+            line_stats = [dict(line) for line in self._line_stats]
+
+        start = self._started_at if self._started_at is not None else 0.0
+        end = self._finished_at
+        if end is None:
+            end = max((r['finished'] for r in results), default=start)
+        elapsed = max(end - start, 0.0)
+        for line in line_stats:
+            line['utilization'] = line['busy'] / elapsed if elapsed > 0 else 0.0
+
+        latencies = sorted(r['queue_latency'] for r in results)
+        if latencies:
+            p95_index = min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))
+            queue_latency = {
+                'avg': sum(latencies) / len(latencies),
+                'max': latencies[-1],
+                'p95': latencies[p95_index],
+            }
+        else:
+            queue_latency = {'avg': 0.0, 'max': 0.0, 'p95': 0.0}
+
+        return {
+            'calls': len(results),
+            'failed': sum(1 for r in results if r['error'] is not None),
+            'elapsed': elapsed,
+            'lines': line_stats,
+            'queue_latency': queue_latency,
+        }
+
+    def _run_line(self, line: int) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closing:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                _, _, call = heapq.heappop(self._queue)
+                # Wake submitters waiting on backpressure
+                self._cond.notify_all()
+                # Reserve the token while holding the queue lock so calls are
+                # started in priority order
+                start_at = self._bucket.reserve()
+
+            self._clock.sleep(start_at - self._clock.monotonic())
+            self._dial(line, call, start_at)
+
+    def _dispatch_next(self) -> None:
+        """Dial the next queued call in simulated time (called holding the queue lock).
+
+        The call goes to the line that is free first (the lowest-numbered
+        one on ties) and starts when both the line and a rate token are
+        available. The clock is then moved back to when the line took the
+        call, the simulated present for submitters.
+        """
+        line = min(range(self.lines), key=lambda i: (self._line_free[i], i))
+        _, _, call = heapq.heappop(self._queue)
+        now = max(self._line_free[line], call['enqueued'])
+        self._clock.seek(now)
+        start_at = max(self._bucket.reserve(), now)
+        self._clock.seek(start_at)
+        self._dial(line, call, start_at)
+        self._line_free[line] = self._clock.monotonic()
+        self._clock.seek(now)
+
+    def _dial(self, line: int, call: Dict[str, Any], start_at: float) -> None:
+        """Dial one call on a line and record its result."""
+        started = max(start_at, self._clock.monotonic())
+        error = None
+        try:
+            self._dial_func(call['number'], **self._dial_kwargs)
+        except (ValueError, RotaryPhoneError) as e:
+            error = str(e)
+        except Exception as e:
+            # Anything else (e.g. an OSError writing history) fails this
+            # call only; the line keeps dialing its queue
+            error = f"{type(e).__name__}: {e}"
+        finished = self._clock.monotonic()
+
+        call.update({
+            'line': line,
+            'started': started,
+            'finished': finished,
+            'queue_latency': started - call['enqueued'],
+            'error': error,
+        })
+        with self._cond:
+            self._results.append(call)
+            self._line_stats[line]['calls'] += 1
+            self._line_stats[line]['busy'] += finished - started
+
+
+def load_batch_file(batch_file: Any) -> List[tuple]:
+    """Read a batch of calls from a text file.
+
+    Each non-empty line holds a number, optionally followed by a comma and an
+    integer priority. Lines starting with '#' are ignored.
+
+    Args:
+        batch_file: Path to the batch file.
+
+    Returns:
+        List of (number, priority) tuples.
+
+    Raises:
+        ValueError: If a priority is not an integer.
+    """
+    calls = []
+    with open(batch_file, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            number, _, priority = line.partition(',')
+            try:
+                calls.append((number.strip(), int(priority) if priority.strip() else 0))
+            except ValueError:
+                raise ValueError(f"Invalid priority on line {line_number}: {priority.strip()}")
+    return calls
@@ -0,0 +1,349 @@
+"""Consistent point-in-time views of contacts, history and config.
+
+A snapshot loads contacts, history, config and the rollup tables once, at
+a moment when no multi-file write is in progress, and then serves every
+read from that pinned copy. Reports such as ``stats`` and ``export`` run
+against one consistent version for as long as they need, without blocking
+writers and without re-reading files.
+
+Consistency uses a generation counter in the style of a seqlock:
+:func:`write_transaction` makes the generation odd while a multi-file write
+(such as an import) is in progress and even again when it is done. A
+snapshot is accepted only if the generation was even and unchanged while it
+was loaded. Single-file writes are atomic on their own (files are replaced
+by rename, logs are appended by whole lines). History appends also count
+the calls into the rollup tables, so they run as transactions too.
+
+Writes made through a snapshot go to the live backend; the snapshot itself
+never changes.
+"""
+
+import itertools
+import struct
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from rotary_phone import metrics
+
+_COUNTER = struct.Struct('<Q')
+DEFAULT_TIMEOUT = 5.0
+# Documents pinned by default along with contacts, history and config
+DEFAULT_DOCUMENTS = ('rollups', 'rollups_pending')
+
+_snapshot_ids = itertools.count(1)
+
+T = TypeVar('T')
+
+
+class Snapshot:
+    """Read-only pinned copy of the stored data.
+
+    Implements the StorageBackend interface, so it can be installed with
+    :func:`read_snapshot` and used by any module.
+    """
+
+    name = 'snapshot'
+
+    def __init__(self, base: Any, generation: int, contacts: Dict[str, str],
+                 history: List[Dict[str, str]], config: Optional[Dict[str, Any]],
+                 documents: Dict[str, Any], change_seq: int = 0) -> None:
+        """Create a snapshot from loaded data.
+
+        Args:
+            base: Live backend the data was loaded from; writes go here.
+            generation: Generation counter value the data belongs to.
+            contacts: Pinned contacts.
+            history: Pinned history entries.
+            config: Pinned stored configuration.
+            documents: Pinned documents by name (None for missing ones).
+            change_seq: Change feed sequence the data includes at least.
+        """
+        from rotary_phone.clock import get_clock
+        self.base = base
+        self.generation = generation
+        self.change_seq = change_seq
+        self.taken_at = get_clock().now()
+        self._id = next(_snapshot_ids)
+        self._contacts = contacts
+        self._history = history
+        self._config = config
+        self._documents = documents
+
+    def signature(self, name: str) -> Hashable:
+        if self._pins(name):
+            return ('snapshot', self._id, name)
+        return self.base.signature(name)
+
+    def _pins(self, name: str) -> bool:
+        return name in ('contacts', 'history', 'config') or name in self._documents
+
+    def load_contacts(self) -> Dict[str, str]:
+        return dict(self._contacts)
+
+    def scan_contacts(self, after: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+        from rotary_phone.storage import _contacts_after
+        return _contacts_after(self._contacts, after)
+
+    def get_contact(self, name: str) -> Optional[str]:
+        return self._contacts.get(name)
+
+    def load_history(self) -> List[Dict[str, str]]:
+        return list(self._history)
+
+    def scan_history(self, start: Optional[str] = None) -> Iterator[Dict[str, str]]:
+        from rotary_phone.storage import _history_position
+        return iter(self._history[_history_position(self._history, start):])
+
+    def tail_history(self, count: int) -> List[Dict[str, str]]:
+        return self._history[-count:] if count > 0 else []
+
+    def load_config(self) -> Optional[Dict[str, Any]]:
+        return dict(self._config) if self._config is not None else None
+
+    def load_document(self, name: str) -> Optional[Any]:
+        if name in self._documents:
+            import copy
+            return copy.deepcopy(self._documents[name])
+        return self.base.load_document(name)
+
+    def has_document(self, name: str) -> bool:
+        if name in self._documents:
+            return self._documents[name] is not None
+        return self.base.has_document(name)
+
+    # Writes pass through to the live backend and do not change the snapshot
+
+    def save_contacts(self, contacts: Dict[str, str]) -> None:
+        self.base.save_contacts(contacts)
+
+    def put_contact(self, name: str, number: str) -> None:
+        self.base.put_contact(name, number)
+
+    def delete_contact(self, name: str) -> bool:
+        return self.base.delete_contact(name)
+
+    def save_history(self, history: List[Dict[str, str]]) -> None:
+        self.base.save_history(history)
+
+    def append_history(self, entries: List[Dict[str, str]], limit: Optional[int] = None) -> None:
+        self.base.append_history(entries, limit)
+
+    def save_config(self, config: Dict[str, Any]) -> None:
+        self.base.save_config(config)
+
+    def save_document(self, name: str, data: Any) -> None:
+        self.base.save_document(name, data)
+
+    def delete_document(self, name: str) -> None:
+        self.base.delete_document(name)
+
+
+class _FileGeneration:
+    """Generation counter stored in the data directory, shared by processes."""
+
+    def __init__(self, directory: Path) -> None:
+        self.path = directory / "generation"
+        self.lock_path = directory / "generation.lock"
+        self._lock = threading.RLock()
+        self._depth = 0
+
+    def read(self) -> int:
+        try:
+            data = self.path.read_bytes()
+        except OSError:
+            return 0
+        return _COUNTER.unpack(data)[0] if len(data) == _COUNTER.size else 0
+
+    def write(self, value: int) -> None:
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_bytes(_COUNTER.pack(value))
+        tmp_path.replace(self.path)
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Exclude other writers across threads and processes (re-entrant)."""
+        with self._lock:
+            if self._depth or fcntl is None:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class _MemoryGeneration:
+    """Generation counter for the in-process memory backend."""
+
+    def __init__(self) -> None:
+        self.value = 0
+        self._lock = threading.RLock()
+
+    def read(self) -> int:
+        return self.value
+
+    def write(self, value: int) -> None:
+        self.value = value
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        with self._lock:
+            yield
+
+
+_file_generations: Dict[Path, _FileGeneration] = {}
+_memory_generations: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+def _live_backend() -> Any:
+    """Get the active backend, looking through any pinned snapshot."""
+    from rotary_phone.storage import get_backend
+    backend = get_backend()
+    while isinstance(backend, Snapshot):
+        backend = backend.base
+    return backend
+
+
+def _generation_for(backend: Any):
+    directory = getattr(backend, 'directory', None)
+    if directory is None:
+        generation = _memory_generations.get(backend)
+        if generation is None:
+            generation = _memory_generations[backend] = _MemoryGeneration()
+        return generation
+    generation = _file_generations.get(directory)
+    if generation is None:
+        generation = _file_generations[directory] = _FileGeneration(directory)
+    return generation
+
+
+def get_generation() -> int:
+    """Get the current generation counter of the live backend.
+
+    Returns:
+        The generation; odd while a write transaction is in progress.
+    """
+    return _generation_for(_live_backend()).read()
+
+
+@contextmanager
+def write_transaction() -> Iterator[None]:
+    """Group writes to several collections so snapshots see all or none.
+
+    Transactions are serialized across threads and processes, and may be
+    nested. Snapshots taken while one is open wait for it to finish.
+    """
+    generation = _generation_for(_live_backend())
+    with generation.locked():
+        start = generation.read()
+        outermost = start % 2 == 0
+        if outermost:
+            generation.write(start + 1)
+        try:
+            yield
+        finally:
+            if outermost:
+                generation.write(start + 2)
+
+
+def _load(backend: Any, documents: Iterable[str]) -> Tuple:
+    from rotary_phone.changefeed import last_seq
+    # Read the feed position first: the data loaded next includes at least
+    # every change up to it
+    change_seq = last_seq()
+    return change_seq, (
+        backend.load_contacts(),
+        backend.load_history(),
+        backend.load_config(),
+        {name: backend.load_document(name) for name in documents},
+    )
+
+
+def consistent_read(load: Callable[[], T], timeout: float = DEFAULT_TIMEOUT) -> Tuple[int, T]:
+    """Run a read of several collections while no write transaction interferes.
+
+    The read is retried until it ran with the generation even and
+    unchanged. If writers keep interfering for ``timeout`` seconds, it runs
+    while holding the transaction lock, which only delays other
+    transactions.
+
+    Args:
+        load: Function doing the reads from the live backend.
+        timeout: Seconds to keep retrying before locking out transactions.
+
+    Returns:
+        Tuple of the generation the read saw and the result of load.
+    """
+    generation = _generation_for(_live_backend())
+    deadline = time.monotonic() + timeout
+    delay = 0.001
+    while time.monotonic() < deadline:
+        before = generation.read()
+        if before % 2 == 0:
+            result = load()
+            if generation.read() == before:
+                return before, result
+        metrics.incr('snapshot.retries')
+        time.sleep(delay)
+        delay = min(delay * 2, 0.05)
+
+    with generation.locked():
+        return generation.read(), load()
+
+
+@metrics.instrument('snapshot.take')
+def take_snapshot(documents: Iterable[str] = DEFAULT_DOCUMENTS,
+                  timeout: float = DEFAULT_TIMEOUT) -> Snapshot:
+    """Load a consistent snapshot of the stored data.
+
+    Buffered history entries are flushed first. The data is loaded with
+    consistent_read().
+
+    Args:
+        documents: Names of documents to pin along with contacts, history
+            and config.
+        timeout: Seconds to keep retrying before locking out transactions.
+
+    Returns:
+        The snapshot.
+    """
+    from rotary_phone.history import flush_history
+    flush_history()
+    backend = _live_backend()
+    documents = tuple(documents)
+    generation, (change_seq, data) = consistent_read(lambda: _load(backend, documents), timeout)
+    return Snapshot(backend, generation, *data, change_seq=change_seq)
+
+
+@contextmanager
+def read_snapshot(snapshot: Optional[Snapshot] = None) -> Iterator[Snapshot]:
+    """Serve all reads in this thread from a snapshot.
+
+    Args:
+        snapshot: Snapshot to use (default: take a new one).
+
+    Yields:
+        The snapshot in use.
+    """
+    from rotary_phone.storage import use_context_backend
+    if snapshot is None:
+        snapshot = take_snapshot()
+    with use_context_backend(snapshot):
+        yield snapshot
@@ -0,0 +1,127 @@
+"""Speed-dial slots 0-9.
+
+Slots are stored in speed_dial.bin in the data directory as ten fixed
+32-byte records, each holding a normalized number padded with NUL bytes
+(all NUL for an empty slot). Reading or writing a slot touches only its
+own record, so resolving a slot costs the same no matter how many
+contacts or calls are stored.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+SPEED_DIAL_FILE = "speed_dial.bin"
+SLOTS = 10
+SLOT_SIZE = 32
+
+
+def get_speed_dial_file() -> Path:
+    """Get the path to the speed-dial file."""
+    from rotary_phone.config import get_config_dir
+    return get_config_dir() / SPEED_DIAL_FILE
+
+
+def _check_slot(slot: int) -> None:
+    if not 0 <= slot < SLOTS:
+        raise ValueError(f"Speed-dial slot must be between 0 and {SLOTS - 1}: {slot}")
+
+
+def _decode(record: bytes) -> Optional[str]:
+    number = record.rstrip(b'\0')
+    return number.decode('ascii') if number else None
+
+
+def get_speed_dial(slot: int) -> Optional[str]:
+    """Get the number in a speed-dial slot.
+
+    Args:
+        slot: Slot number, 0-9.
+
+    Returns:
+        The stored number, or None if the slot is empty.
+
+    Raises:
+        ValueError: If the slot is out of range.
+    """
+    _check_slot(slot)
+    try:
+        with open(get_speed_dial_file(), 'rb') as f:
+            f.seek(slot * SLOT_SIZE)
+            return _decode(f.read(SLOT_SIZE))
+    except FileNotFoundError:
+        return None
+
+
+def _write_slot(slot: int, record: bytes) -> None:
+    from rotary_phone.config import ensure_config_dir
+    ensure_config_dir()
+    path = get_speed_dial_file()
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size < SLOTS * SLOT_SIZE:
+            os.ftruncate(fd, SLOTS * SLOT_SIZE)
+        os.lseek(fd, slot * SLOT_SIZE, os.SEEK_SET)
+        os.write(fd, record)
+    finally:
+        os.close(fd)
+
+
+def set_speed_dial(slot: int, number: str) -> str:
+    """Store a number in a speed-dial slot, replacing what was there.
+
+    Args:
+        slot: Slot number, 0-9.
+        number: Phone number in any supported format.
+
+    Returns:
+        The normalized number that was stored.
+
+    Raises:
+        ValueError: If the slot is out of range.
+        InvalidNumberError: If the number is invalid.
+    """
+    from rotary_phone.exceptions import InvalidNumberError
+    from rotary_phone.utils import normalize_number, validate_number
+    _check_slot(slot)
+    if not validate_number(number):
+        raise InvalidNumberError(f"Invalid phone number: {number}")
+    cleaned = normalize_number(number)
+    record = cleaned.encode('ascii')
+    if len(record) > SLOT_SIZE:
+        raise InvalidNumberError(f"Number too long for speed dial: {number}")
+    _write_slot(slot, record.ljust(SLOT_SIZE, b'\0'))
+    return cleaned
+
+
+def clear_speed_dial(slot: int) -> None:
+    """Empty a speed-dial slot.
+
+    Args:
+        slot: Slot number, 0-9.
+
+    Raises:
+        ValueError: If the slot is out of range.
+    """
+    _check_slot(slot)
+    if get_speed_dial_file().exists():
+        _write_slot(slot, b'\0' * SLOT_SIZE)
+
+
+def list_speed_dials() -> Dict[int, str]:
+    """Get all filled speed-dial slots.
+
+    Returns:
+        Dictionary mapping slot numbers to stored numbers.
+    """
+    try:
+        with open(get_speed_dial_file(), 'rb') as f:
+            data = f.read(SLOTS * SLOT_SIZE)
+    except FileNotFoundError:
+        return {}
+    slots = {}
+    for slot in range(SLOTS):
+        number = _decode(data[slot * SLOT_SIZE:(slot + 1) * SLOT_SIZE])
+        if number is not None:
+            slots[slot] = number
+    return slots
@@ -1,12 +1,28 @@
-"""Statistics and analytics for rotary phone."""
+"""Statistics and analytics for rotary phone.
+
+When NumPy is installed, each function is computed by the vectorized backend
+in rotary_phone.analytics instead. Set the ``analytics_backend`` config value
+to 'python' to force the pure-Python implementations.
+"""
 
 from collections import Counter
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from rotary_phone.history import load_history
 from rotary_phone.contacts import load_contacts
+from rotary_phone.metrics import instrument
+
+
+def _use_numpy() -> bool:
+    """Check whether the NumPy analytics backend should be used."""
+    from rotary_phone import analytics
+    from rotary_phone.config import get_config_value
+    if get_config_value('analytics_backend', 'auto') == 'python':
+        return False
+    return analytics.is_available()
 
 
+@instrument('stats.get_dial_stats')
 def get_dial_stats() -> Dict[str, int]:
     """Get statistics about dialed numbers.
     
@@ -18,6 +34,10 @@ def get_dial_stats() -> Dict[str, int]:
         - most_dialed_count: Count of most dialed number
         - total_contacts: Number of saved contacts
     """
+    if _use_numpy():
+        from rotary_phone import analytics
+        return analytics.get_dial_stats(len(load_contacts()))
+    
     history = load_history()
     contacts = load_contacts()
     
@@ -49,6 +69,7 @@ def get_dial_stats() -> Dict[str, int]:
     return stats
 
 
+@instrument('stats.get_top_dialed')
 def get_top_dialed(limit: int = 5) -> List[tuple]:
     """Get the most frequently dialed numbers.
     
@@ -58,6 +79,10 @@ def get_top_dialed(limit: int = 5) -> List[tuple]:
     Returns:
         List of tuples (number, count) sorted by frequency (descending).
     """
+    if _use_numpy():
+        from rotary_phone import analytics
+        return analytics.get_top_dialed(limit)
+    
     history = load_history()
     if not history:
         return []
@@ -66,12 +91,67 @@ def get_top_dialed(limit: int = 5) -> List[tuple]:
     return number_counts.most_common(limit)
 
 
+def _number_counts() -> Dict[str, int]:
+    """Count calls per stored number, in first-dialed order."""
+    if _use_numpy():
+        from rotary_phone import analytics
+        arrays = analytics.load_history_arrays()
+        if arrays is None:
+            return {}
+        return {str(number): int(count) for number, count in zip(arrays['numbers'], arrays['counts'])}
+    return dict(Counter(entry['number'] for entry in load_history()))
+
+
+@instrument('stats.get_top_contacts')
+def get_top_contacts(limit: int = 5) -> List[Tuple[Optional[str], str, int]]:
+    """Get the most frequently called contacts.
+    
+    Calls are grouped by contact rather than by number: all formattings of
+    a contact's number count together. Numbers shared by several contacts
+    are grouped under all of their names, and numbers that are not saved
+    as a contact are grouped by normalized number.
+    
+    Args:
+        limit: Maximum number of results to return.
+    
+    Returns:
+        List of (names, number, count) tuples sorted by count (descending),
+        where names is the contact names joined by ", " or None for unknown
+        numbers, and number is the first dialed number of the group.
+    """
+    from rotary_phone.contacts import get_number_index
+    from rotary_phone.utils import normalize_number
+    
+    index = get_number_index()
+    groups: Dict[str, List] = {}
+    for number, count in _number_counts().items():
+        normalized = normalize_number(number)
+        names = index.get(normalized)
+        key = ", ".join(names) if names else normalized
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [key if names else None, number, count]
+        else:
+            group[2] += count
+    
+    # Stable sort keeps first-dialed order among ties
+    ranked = sorted(groups.values(), key=lambda group: group[2], reverse=True)
+    return [tuple(group) for group in ranked[:max(limit, 0)]]
+
+
+@instrument('stats.get_average_calls_per_day')
 def get_average_calls_per_day() -> float:
     """Calculate average number of calls per day.
     
     Returns:
         Average calls per day, or 0.0 if no history exists.
     """
+    if _use_numpy():
+        from rotary_phone import analytics
+        average = analytics.get_average_calls_per_day()
+        if average is not None:
+            return average
+    
     history = load_history()
     if not history:
         return 0.0
@@ -90,12 +170,17 @@ def get_average_calls_per_day() -> float:
     return len(history) / days if days > 0 else float(len(history))
 
 
+@instrument('stats.get_calls_by_day')
 def get_calls_by_day() -> Dict[str, int]:
     """Get call count grouped by day.
     
     Returns:
         Dictionary mapping date strings (YYYY-MM-DD) to call counts.
     """
+    if _use_numpy():
+        from rotary_phone import analytics
+        return analytics.get_calls_by_day()
+    
     history = load_history()
     if not history:
         return {}
@@ -116,12 +201,17 @@ def get_calls_by_day() -> Dict[str, int]:
     return dict(Counter(dates))
 
 
+@instrument('stats.get_calls_by_hour')
 def get_calls_by_hour() -> Dict[int, int]:
     """Get call count grouped by hour of day.
     
     Returns:
         Dictionary mapping hour (0-23) to call counts.
     """
+    if _use_numpy():
+        from rotary_phone import analytics
+        return analytics.get_calls_by_hour()
+    
     history = load_history()
     if not history:
         return {}
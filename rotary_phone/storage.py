@@ -0,0 +1,797 @@
+"""Pluggable storage engines for contacts, history, config and documents.
+
+Every module reads and writes its data through :func:`get_backend`. Three
+engines are available:
+
+- ``json``: the classic layout of pretty-printed JSON files in the data
+  directory (contacts.json, history.json, config.json, ...).
+- ``memory``: keeps everything in process memory; useful for tests and
+  benchmarks that should not touch the disk.
+- ``log``: contacts and history are append-only JSON-lines logs
+  (contacts.log, history.log) that are replayed on load and compacted when
+  mostly dead, so adding a call or contact costs one small append instead
+  of rewriting the whole file. Config and documents are JSON files.
+
+The engine is chosen by the ``ROTARY_PHONE_BACKEND`` environment variable,
+or else by the ``storage_backend`` value in config.json.
+"""
+
+import contextvars
+import itertools
+import json
+import os
+from bisect import bisect_right
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+from rotary_phone import metrics
+
+BACKEND_ENV_VAR = 'ROTARY_PHONE_BACKEND'
+# Bytes read per step when reading a file from the end
+TAIL_CHUNK_SIZE = 64 * 1024
+
+# Distinguishes backend instances in cache signatures (ids can be reused)
+_instance_ids = itertools.count(1)
+
+
+class StorageBackend(Protocol):
+    """Interface implemented by every storage engine.
+
+    Stored data is returned as fresh containers, so callers may modify
+    what they load and pass it back to the matching save method.
+    """
+
+    name: str
+
+    def load_contacts(self) -> Dict[str, str]:
+        """Get all contacts as a name-ordered dictionary of name -> number."""
+        ...
+
+    def save_contacts(self, contacts: Dict[str, str]) -> None:
+        """Replace all contacts."""
+        ...
+
+    def scan_contacts(self, after: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+        """Iterate over (name, number) pairs in name order.
+
+        With ``after``, start past the names that sort at or before it.
+        """
+        ...
+
+    def get_contact(self, name: str) -> Optional[str]:
+        """Get one contact's number, or None."""
+        ...
+
+    def put_contact(self, name: str, number: str) -> None:
+        """Add or replace one contact."""
+        ...
+
+    def delete_contact(self, name: str) -> bool:
+        """Delete one contact; False if it did not exist."""
+        ...
+
+    def load_history(self) -> List[Dict[str, str]]:
+        """Get all history entries in stored order."""
+        ...
+
+    def save_history(self, history: List[Dict[str, str]]) -> None:
+        """Replace all history entries."""
+        ...
+
+    def append_history(self, entries: List[Dict[str, str]], limit: Optional[int] = None) -> None:
+        """Append entries, then keep only the newest ``limit`` entries."""
+        ...
+
+    def scan_history(self, start: Optional[str] = None) -> Iterator[Dict[str, str]]:
+        """Iterate over history entries in stored order.
+
+        Stored order is timestamp order. With ``start``, begin at the first
+        entry whose timestamp is not before it. Engines that cannot seek
+        may begin earlier, so callers filter as well.
+        """
+        ...
+
+    def tail_history(self, count: int) -> List[Dict[str, str]]:
+        """Get the last ``count`` history entries in stored order."""
+        ...
+
+    def load_config(self) -> Optional[Dict[str, Any]]:
+        """Get the stored configuration, or None if there is none."""
+        ...
+
+    def save_config(self, config: Dict[str, Any]) -> None:
+        """Replace the stored configuration."""
+        ...
+
+    def load_document(self, name: str) -> Optional[Any]:
+        """Get a named JSON document (e.g. 'rollups'), or None."""
+        ...
+
+    def save_document(self, name: str, data: Any) -> None:
+        """Store a named JSON document."""
+        ...
+
+    def has_document(self, name: str) -> bool:
+        """Check whether a named document exists."""
+        ...
+
+    def delete_document(self, name: str) -> None:
+        """Remove a named document if it exists."""
+        ...
+
+    def signature(self, name: str) -> Hashable:
+        """Get a value that changes whenever the named data changes.
+
+        ``name`` is 'contacts', 'history', 'config' or a document name.
+        Caches of derived data compare signatures to detect staleness.
+        """
+        ...
+
+
+class _FileBackend:
+    """Shared directory handling, config and document storage for file engines."""
+
+    CONTACTS_FILE = "contacts.json"
+    HISTORY_FILE = "history.json"
+    CONFIG_FILE = "config.json"
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        """Create a file backend.
+
+        Args:
+            directory: Directory holding the data files (default: the
+                configuration directory).
+        """
+        self._directory = Path(directory) if directory is not None else None
+        if self._directory is not None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+        self._id = next(_instance_ids)
+        self._generations: Dict[str, int] = {}
+
+    @property
+    def directory(self) -> Path:
+        """Directory holding the data files."""
+        if self._directory is not None:
+            return self._directory
+        from rotary_phone.config import ensure_config_dir
+        return ensure_config_dir()
+
+    def path(self, name: str) -> Path:
+        """Get the file storing the named data."""
+        if name == 'contacts':
+            return self.directory / self.CONTACTS_FILE
+        if name == 'history':
+            return self.directory / self.HISTORY_FILE
+        if name == 'config':
+            return self.directory / self.CONFIG_FILE
+        return self.directory / f"{name}.json"
+
+    def _changed(self, name: str) -> None:
+        # In-process writes may land in the same mtime tick with the same size
+        self._generations[name] = self._generations.get(name, 0) + 1
+
+    def signature(self, name: str) -> Hashable:
+        path = self.path(name)
+        try:
+            stat = path.stat()
+            file_signature: Tuple = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            file_signature = (None, None, None)
+        return (self._id, str(path), self._generations.get(name, 0)) + file_signature
+
+    def _read_json(self, path: Path, default: Any) -> Any:
+        if not path.exists():
+            return default
+        try:
+            with open(path, 'r') as f:
+                text = f.read()
+                inode = os.fstat(f.fileno()).st_ino
+            with metrics.timed('json.parse'):
+                return json.loads(text)
+        except json.JSONDecodeError:
+            # Keep the damaged file for fsck instead of letting the next
+            # save overwrite it, unless it was replaced meanwhile
+            from rotary_phone.integrity import quarantine
+            try:
+                if path.stat().st_ino == inode:
+                    quarantine(path)
+            except OSError:
+                pass
+            return default
+        except IOError:
+            return default
+
+    def _write_text(self, path: Path, text: str, atomic: bool = False) -> None:
+        from rotary_phone.integrity import write_manifest
+        data = text.encode('utf-8')
+        target = path.with_suffix(path.suffix + '.tmp') if atomic else path
+        with open(target, 'wb') as f:
+            f.write(data)
+        if atomic:
+            os.replace(target, path)
+        write_manifest(path, data)
+
+    def load_config(self) -> Optional[Dict[str, Any]]:
+        return self._read_json(self.path('config'), None)
+
+    def save_config(self, config: Dict[str, Any]) -> None:
+        self._write_text(self.path('config'), json.dumps(config, indent=2), atomic=True)
+        self._changed('config')
+
+    def load_document(self, name: str) -> Optional[Any]:
+        return self._read_json(self.path(name), None)
+
+    def save_document(self, name: str, data: Any) -> None:
+        with metrics.timed('json.serialize'):
+            text = json.dumps(data, sort_keys=True)
+        self._write_text(self.path(name), text, atomic=True)
+        self._changed(name)
+
+    def has_document(self, name: str) -> bool:
+        return self.path(name).exists()
+
+    def delete_document(self, name: str) -> None:
+        from rotary_phone.integrity import remove_manifest
+        path = self.path(name)
+        if path.exists():
+            path.unlink()
+        remove_manifest(path)
+        self._changed(name)
+
+
+class JsonFileBackend(_FileBackend):
+    """Pretty-printed JSON files, rewritten on every change.
+
+    Files are written to a temporary name and renamed into place, so a
+    reader always sees either the old or the new version of a file.
+    """
+
+    name = 'json'
+
+    def load_contacts(self) -> Dict[str, str]:
+        return self._read_json(self.path('contacts'), {})
+
+    def save_contacts(self, contacts: Dict[str, str]) -> None:
+        with metrics.timed('json.serialize'):
+            text = json.dumps(contacts, indent=2, sort_keys=True)
+        self._write_text(self.path('contacts'), text, atomic=True)
+        self._changed('contacts')
+
+    def scan_contacts(self, after: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+        from rotary_phone.jsonstream import iter_json_object, seek_sorted
+        path = self.path('contacts')
+        if not path.exists():
+            return
+        # Contacts are saved sorted by name, so file order is name order
+        try:
+            offset = seek_sorted(path, lambda name: name <= after) if after is not None else None
+            for name, number in iter_json_object(path, offset=offset):
+                if after is None or name > after:
+                    yield name, number
+        except (json.JSONDecodeError, IOError):
+            return
+
+    def get_contact(self, name: str) -> Optional[str]:
+        return self.load_contacts().get(name)
+
+    def put_contact(self, name: str, number: str) -> None:
+        contacts = self.load_contacts()
+        contacts[name] = number
+        self.save_contacts(contacts)
+
+    def delete_contact(self, name: str) -> bool:
+        contacts = self.load_contacts()
+        if name not in contacts:
+            return False
+        del contacts[name]
+        self.save_contacts(contacts)
+        return True
+
+    def load_history(self) -> List[Dict[str, str]]:
+        return self._read_json(self.path('history'), [])
+
+    def save_history(self, history: List[Dict[str, str]]) -> None:
+        with metrics.timed('json.serialize'):
+            text = json.dumps(history, indent=2)
+        self._write_text(self.path('history'), text, atomic=True)
+        self._changed('history')
+
+    def append_history(self, entries: List[Dict[str, str]], limit: Optional[int] = None) -> None:
+        history = self.load_history()
+        history.extend(entries)
+        if limit is not None:
+            history = history[-limit:] if limit > 0 else []
+        self.save_history(history)
+
+    def scan_history(self, start: Optional[str] = None) -> Iterator[Dict[str, str]]:
+        from rotary_phone.jsonstream import iter_json_array, seek_sorted
+        path = self.path('history')
+        if not path.exists():
+            return
+        try:
+            offset = None
+            if start is not None:
+                offset = seek_sorted(path, lambda entry: entry.get('timestamp', '') < start)
+            yield from iter_json_array(path, offset=offset)
+        except (json.JSONDecodeError, IOError):
+            return
+
+    def tail_history(self, count: int) -> List[Dict[str, str]]:
+        # Read backwards until the last ``count`` entries are in the buffer.
+        # In the indented layout written by save_history every entry starts
+        # with "\n  {", which cannot occur inside a JSON string.
+        if count <= 0:
+            return []
+        try:
+            with open(self.path('history'), 'rb') as f:
+                position = f.seek(0, os.SEEK_END)
+                data = b''
+                while position > 0:
+                    size = min(TAIL_CHUNK_SIZE, position)
+                    position -= size
+                    f.seek(position)
+                    data = f.read(size) + data
+                    starts = _entry_starts(data)
+                    if len(starts) >= count:
+                        return [json.loads(segment) for segment in _entry_segments(data, starts[-count:])]
+            # The whole file was read without finding enough entries
+            return json.loads(data)[-count:] if data.strip() else []
+        except FileNotFoundError:
+            return []
+        except (ValueError, IOError):
+            return self.load_history()[-count:]
+
+
+def _entry_starts(data: bytes) -> List[int]:
+    """Find where top-level array entries start in indented JSON."""
+    starts = []
+    position = data.find(b'\n  {')
+    while position != -1:
+        starts.append(position + 1)
+        position = data.find(b'\n  {', position + 1)
+    return starts
+
+
+def _entry_segments(data: bytes, starts: List[int]) -> Iterator[bytes]:
+    """Cut indented JSON into entry texts, dropping separators."""
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(data)
+        segment = data[start:end].rstrip()
+        if i + 1 == len(starts) and segment.endswith(b']'):
+            segment = segment[:-1].rstrip()
+        yield segment.rstrip(b',')
+
+
+def _history_position(history: List[Dict[str, str]], start: Optional[str]) -> int:
+    """Find the first entry of timestamp-ordered history not before ``start``."""
+    if start is None:
+        return 0
+    low, high = 0, len(history)
+    while low < high:
+        middle = (low + high) // 2
+        if history[middle].get('timestamp', '') < start:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _contacts_after(contacts: Dict[str, str], after: Optional[str]) -> Iterator[Tuple[str, str]]:
+    """Iterate over contacts in name order, past the names at or before ``after``."""
+    names = sorted(contacts)
+    if after is not None:
+        names = names[bisect_right(names, after):]
+    return iter([(name, contacts[name]) for name in names])
+
+
+def _lines_backwards(path: Path) -> Iterator[bytes]:
+    """Yield the complete lines of a file, last line first.
+
+    A last line without a trailing newline is still being written and is
+    skipped.
+    """
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b''
+        first = True
+        while position > 0:
+            size = min(TAIL_CHUNK_SIZE, position)
+            position -= size
+            f.seek(position)
+            data = f.read(size) + data
+            if first:
+                data = data[:data.rfind(b'\n') + 1]
+                first = False
+            lines = data.split(b'\n')
+            # The first piece may continue in the previous chunk
+            data = lines[0]
+            for line in reversed(lines[1:]):
+                if line:
+                    yield line
+        if data:
+            yield data
+
+
+class MemoryBackend:
+    """Keeps all data in process memory; nothing is persisted."""
+
+    name = 'memory'
+
+    def __init__(self) -> None:
+        self._id = next(_instance_ids)
+        self._contacts: Dict[str, str] = {}
+        self._history: List[Dict[str, str]] = []
+        self._config: Optional[Dict[str, Any]] = None
+        self._documents: Dict[str, str] = {}
+        self._generations: Dict[str, int] = {}
+
+    def _changed(self, name: str) -> None:
+        self._generations[name] = self._generations.get(name, 0) + 1
+
+    def signature(self, name: str) -> Hashable:
+        return (self._id, name, self._generations.get(name, 0))
+
+    def load_contacts(self) -> Dict[str, str]:
+        return dict(sorted(self._contacts.items()))
+
+    def save_contacts(self, contacts: Dict[str, str]) -> None:
+        self._contacts = dict(contacts)
+        self._changed('contacts')
+
+    def scan_contacts(self, after: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+        return _contacts_after(self._contacts, after)
+
+    def get_contact(self, name: str) -> Optional[str]:
+        return self._contacts.get(name)
+
+    def put_contact(self, name: str, number: str) -> None:
+        self._contacts[name] = number
+        self._changed('contacts')
+
+    def delete_contact(self, name: str) -> bool:
+        if name not in self._contacts:
+            return False
+        del self._contacts[name]
+        self._changed('contacts')
+        return True
+
+    def load_history(self) -> List[Dict[str, str]]:
+        return list(self._history)
+
+    def save_history(self, history: List[Dict[str, str]]) -> None:
+        self._history = list(history)
+        self._changed('history')
+
+    def append_history(self, entries: List[Dict[str, str]], limit: Optional[int] = None) -> None:
+        self._history.extend(entries)
+        if limit is not None and len(self._history) > limit:
+            del self._history[:len(self._history) - limit]
+        self._changed('history')
+
+    def scan_history(self, start: Optional[str] = None) -> Iterator[Dict[str, str]]:
+        return iter(self._history[_history_position(self._history, start):])
+
+    def tail_history(self, count: int) -> List[Dict[str, str]]:
+        return self._history[-count:] if count > 0 else []
+
+    def load_config(self) -> Optional[Dict[str, Any]]:
+        return dict(self._config) if self._config is not None else None
+
+    def save_config(self, config: Dict[str, Any]) -> None:
+        self._config = dict(config)
+        self._changed('config')
+
+    def load_document(self, name: str) -> Optional[Any]:
+        # Stored serialized so callers never share state with the store
+        text = self._documents.get(name)
+        return json.loads(text) if text is not None else None
+
+    def save_document(self, name: str, data: Any) -> None:
+        self._documents[name] = json.dumps(data)
+        self._changed(name)
+
+    def has_document(self, name: str) -> bool:
+        return name in self._documents
+
+    def delete_document(self, name: str) -> None:
+        self._documents.pop(name, None)
+        self._changed(name)
+
+
+class _LogState:
+    """Replayed contents of one log file and how much of it was read."""
+
+    def __init__(self) -> None:
+        self.inode: Optional[int] = None
+        self.offset = 0
+        self.lines = 0
+        self.value: Any = None
+
+
+class AppendLogBackend(_FileBackend):
+    """Append-only JSON-lines logs for contacts and history.
+
+    contacts.log holds ``{"put": name, "number": number}`` and
+    ``{"delete": name}`` records; history.log holds one entry per line plus
+    ``{"$trim": N}`` records meaning "keep only the last N entries". Logs are
+    replayed into memory once per process and then followed incrementally;
+    a log is rewritten as a snapshot when fewer than half its lines are live.
+    """
+
+    name = 'log'
+    CONTACTS_FILE = "contacts.log"
+    HISTORY_FILE = "history.log"
+    # Logs shorter than this are never compacted
+    COMPACT_MIN_LINES = 1000
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        super().__init__(directory)
+        self._states: Dict[str, _LogState] = {}
+
+    def _replay(self, name: str) -> _LogState:
+        """Bring the in-memory state of a log up to date with the file."""
+        path = self.path(name)
+        state = self._states.get(name)
+        try:
+            stat = path.stat()
+        except OSError:
+            stat = None
+
+        if stat is None or state is None or state.inode != stat.st_ino or stat.st_size < state.offset:
+            # Missing, new, rewritten or truncated: start from scratch
+            state = _LogState()
+            state.value = {} if name == 'contacts' else []
+            self._states[name] = state
+            if stat is None:
+                return state
+            state.inode = stat.st_ino
+
+        if stat.st_size > state.offset:
+            with open(path, 'rb') as f:
+                f.seek(state.offset)
+                data = f.read()
+            # Ignore a partially written last line until it is complete
+            end = data.rfind(b'\n') + 1
+            for line in data[:end].splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self._apply(name, state, record)
+                state.lines += 1
+            state.offset += end
+        return state
+
+    @staticmethod
+    def _apply(name: str, state: _LogState, record: Dict[str, Any]) -> None:
+        if name == 'contacts':
+            if 'put' in record:
+                state.value[record['put']] = record.get('number', '')
+            elif 'delete' in record:
+                state.value.pop(record['delete'], None)
+        elif '$trim' in record:
+            keep = record['$trim']
+            del state.value[:max(len(state.value) - keep, 0)]
+        else:
+            state.value.append(record)
+
+    def _append(self, name: str, records: Iterable[Dict[str, Any]]) -> None:
+        """Append records to a log and apply them to the in-memory state."""
+        state = self._replay(name)
+        records = list(records)
+        if not records:
+            return
+        from rotary_phone.integrity import append_file
+        data = "".join(json.dumps(record) + "\n" for record in records).encode('utf-8')
+        path = self.path(name)
+        offset = append_file(path, data)
+        for record in records:
+            self._apply(name, state, record)
+        state.lines += len(records)
+        stat = path.stat()
+        if state.inode is None:
+            state.inode = stat.st_ino
+        if offset == state.offset and offset + len(data) == stat.st_size:
+            state.offset = stat.st_size
+        else:
+            # Another process appended too; replay what we have not seen
+            self._states.pop(name, None)
+            state = self._replay(name)
+        self._changed(name)
+        if state.lines >= self.COMPACT_MIN_LINES and state.lines > 2 * len(state.value):
+            self._rewrite(name, state.value)
+
+    def _rewrite(self, name: str, value: Any) -> None:
+        """Replace a log with a snapshot of the given state."""
+        if name == 'contacts':
+            records = [{'put': key, 'number': number} for key, number in sorted(value.items())]
+        else:
+            records = list(value)
+        with metrics.timed('json.serialize'):
+            text = "".join(json.dumps(record) + "\n" for record in records)
+        self._write_text(self.path(name), text, atomic=True)
+        self._states.pop(name, None)
+        self._changed(name)
+
+    def load_contacts(self) -> Dict[str, str]:
+        return dict(sorted(self._replay('contacts').value.items()))
+
+    def save_contacts(self, contacts: Dict[str, str]) -> None:
+        self._rewrite('contacts', contacts)
+
+    def scan_contacts(self, after: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+        return _contacts_after(self._replay('contacts').value, after)
+
+    def get_contact(self, name: str) -> Optional[str]:
+        return self._replay('contacts').value.get(name)
+
+    def put_contact(self, name: str, number: str) -> None:
+        self._append('contacts', [{'put': name, 'number': number}])
+
+    def delete_contact(self, name: str) -> bool:
+        if name not in self._replay('contacts').value:
+            return False
+        self._append('contacts', [{'delete': name}])
+        return True
+
+    def load_history(self) -> List[Dict[str, str]]:
+        return list(self._replay('history').value)
+
+    def save_history(self, history: List[Dict[str, str]]) -> None:
+        self._rewrite('history', history)
+
+    def append_history(self, entries: List[Dict[str, str]], limit: Optional[int] = None) -> None:
+        records: List[Dict[str, Any]] = list(entries)
+        if limit is not None and len(self._replay('history').value) + len(records) > limit:
+            records.append({'$trim': max(limit, 0)})
+        self._append('history', records)
+
+    def scan_history(self, start: Optional[str] = None) -> Iterator[Dict[str, str]]:
+        history = self._replay('history').value
+        return iter(history[_history_position(history, start):])
+
+    def tail_history(self, count: int) -> List[Dict[str, str]]:
+        if count <= 0:
+            return []
+        if 'history' in self._states:
+            return self._replay('history').value[-count:]
+        # Not replayed yet in this process: read only the end of the log.
+        # Going backwards, a {"$trim": N} record means at most N of the
+        # entries before it survive.
+        entries: List[Dict[str, str]] = []
+        remaining = count
+        try:
+            for line in _lines_backwards(self.path('history')):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if '$trim' in record:
+                    remaining = min(remaining, max(record['$trim'], 0))
+                else:
+                    entries.append(record)
+                    remaining -= 1
+                if remaining <= 0:
+                    break
+        except FileNotFoundError:
+            return []
+        entries.reverse()
+        return entries
+
+
+BACKENDS = {
+    'json': JsonFileBackend,
+    'memory': MemoryBackend,
+    'log': AppendLogBackend,
+}
+
+_backend: Optional[StorageBackend] = None
+# Backend pinned for the current thread/task only (used by snapshots)
+_context_backend: contextvars.ContextVar = contextvars.ContextVar('rotary_phone_backend', default=None)
+
+
+def create_backend(name: str, directory: Optional[Path] = None) -> StorageBackend:
+    """Create a storage backend by name.
+
+    Args:
+        name: Backend name: 'json', 'memory' or 'log'.
+        directory: Data directory for file backends (default: the
+            configuration directory).
+
+    Returns:
+        New backend instance.
+
+    Raises:
+        ConfigError: If the backend name is unknown.
+    """
+    from rotary_phone.exceptions import ConfigError
+    if name not in BACKENDS:
+        raise ConfigError(f"Unknown storage backend: {name} (choose from {', '.join(BACKENDS)})")
+    if name == 'memory':
+        return MemoryBackend()
+    return BACKENDS[name](directory)
+
+
+def get_backend_name() -> str:
+    """Get the name of the configured storage backend.
+
+    Returns:
+        The ``ROTARY_PHONE_BACKEND`` environment variable if set, else the
+        ``storage_backend`` value in config.json, else 'json'.
+    """
+    name = os.environ.get(BACKEND_ENV_VAR)
+    if name:
+        return name
+    # Config lives in the backend, so bootstrap from the JSON config file
+    config = JsonFileBackend().load_config() or {}
+    return config.get('storage_backend', 'json')
+
+
+def get_backend() -> StorageBackend:
+    """Get the active storage backend, creating the configured one on first use.
+
+    Returns:
+        The backend pinned for the current context with use_context_backend(),
+        else the process-wide storage backend.
+    """
+    global _backend
+    pinned = _context_backend.get()
+    if pinned is not None:
+        return pinned
+    if _backend is None:
+        _backend = create_backend(get_backend_name())
+    return _backend
+
+
+def set_backend(backend: Optional[StorageBackend]) -> Optional[StorageBackend]:
+    """Install a storage backend for the whole process.
+
+    Args:
+        backend: Backend to install, or None to select the configured
+            backend again on next use.
+
+    Returns:
+        The previously installed backend (None if none was created yet).
+    """
+    global _backend
+    previous = _backend
+    _backend = backend
+    return previous
+
+
+@contextmanager
+def use_backend(backend: StorageBackend) -> Iterator[StorageBackend]:
+    """Temporarily install a storage backend.
+
+    Args:
+        backend: Backend to use inside the block.
+
+    Yields:
+        The installed backend.
+    """
+    previous = set_backend(backend)
+    try:
+        yield backend
+    finally:
+        set_backend(previous)
+
+
+@contextmanager
+def use_context_backend(backend: StorageBackend) -> Iterator[StorageBackend]:
+    """Use a storage backend in the current thread or task only.
+
+    Other threads, such as the history flush thread, keep using the
+    process-wide backend.
+
+    Args:
+        backend: Backend to use inside the block.
+
+    Yields:
+        The installed backend.
+    """
+    token = _context_backend.set(backend)
+    try:
+        yield backend
+    finally:
+        _context_backend.reset(token)
@@ -0,0 +1,118 @@
+"""Dial timing against absolute deadlines.
+
+Every wait while dialing targets a deadline measured from the start of the
+call on the clock's ``monotonic_ns()`` scale, so the overshoot of one sleep
+shortens the next wait instead of adding up over the number. The measured
+lateness of each deadline is kept and summarized for the call history.
+
+Two timing models are available (the ``dial_timing`` config option):
+
+- ``fixed``: every digit takes ``delay`` seconds.
+- ``pulse``: a digit is sent as loop interruptions at 10 pulses per
+  second, 60 ms break and 40 ms make per pulse, one pulse for '1' up to
+  ten for '0', followed by a ``delay``-second inter-digit pause. Each
+  break and make edge is a deadline.
+"""
+
+from typing import Any, Dict, List, Optional
+
+MODELS = ('fixed', 'pulse')
+PULSES_PER_SECOND = 10
+BREAK_RATIO = 0.6
+PULSE_NS = 1_000_000_000 // PULSES_PER_SECOND
+BREAK_NS = int(PULSE_NS * BREAK_RATIO)
+
+
+def pulse_count(digit: str) -> int:
+    """Get the number of pulses a digit is dialed with ('0' is ten)."""
+    return int(digit) or 10
+
+
+def get_timing_model() -> str:
+    """Get the configured timing model."""
+    from rotary_phone.config import get_config_value
+    return get_config_value('dial_timing', 'fixed')
+
+
+def dial_schedule(digits: str, delay: float, model: Optional[str] = None) -> List[List[int]]:
+    """Compute the deadlines of dialing a number.
+
+    Args:
+        digits: Normalized number.
+        delay: Seconds per digit (fixed model) or between digits (pulse model).
+        model: 'fixed' or 'pulse' (default: the ``dial_timing`` config option).
+
+    Returns:
+        For each character of digits, its deadlines in nanoseconds from the
+        start of the call; the last deadline is where the character ends.
+        Characters other than digits take no time in the pulse model.
+
+    Raises:
+        ValueError: If the model is unknown.
+    """
+    if model is None:
+        model = get_timing_model()
+    if model not in MODELS:
+        raise ValueError(f"Unknown timing model: {model} (expected one of {', '.join(MODELS)})")
+    delay_ns = round(delay * 1e9)
+    schedule = []
+    offset = 0
+    for digit in digits:
+        deadlines = []
+        if model == 'fixed':
+            offset += delay_ns
+            deadlines.append(offset)
+        elif digit.isdigit():
+            for _ in range(pulse_count(digit)):
+                deadlines.extend((offset + BREAK_NS, offset + PULSE_NS))
+                offset += PULSE_NS
+            offset += delay_ns
+            deadlines.append(offset)
+        schedule.append(deadlines)
+    return schedule
+
+
+class DialTimer:
+    """Waits for deadlines relative to a start time and measures lateness."""
+
+    def __init__(self, clock: Any = None) -> None:
+        """Create a timer.
+
+        Args:
+            clock: Clock providing monotonic_ns() and sleep_until()
+                (default: the active clock).
+        """
+        if clock is None:
+            from rotary_phone.clock import get_clock
+            clock = get_clock()
+        self._clock = clock
+        self._start_ns = clock.monotonic_ns()
+        self._target_ns = 0
+        self._max_late_ns = 0
+
+    def wait_until(self, offset_ns: int) -> None:
+        """Wait until offset_ns nanoseconds after the start.
+
+        Args:
+            offset_ns: Deadline relative to the start of the timer.
+        """
+        deadline = self._start_ns + offset_ns
+        self._clock.sleep_until(deadline)
+        late = self._clock.monotonic_ns() - deadline
+        self._target_ns = max(self._target_ns, offset_ns)
+        self._max_late_ns = max(self._max_late_ns, late)
+
+    def summary(self) -> Dict[str, float]:
+        """Summarize the measured timing.
+
+        Returns:
+            Dictionary with duration_ms (measured since the start),
+            target_ms (the last deadline) and jitter_ms (the largest lateness
+            of any deadline), rounded to microseconds.
+        """
+        elapsed = self._clock.monotonic_ns() - self._start_ns
+        return {
+            'duration_ms': round(elapsed / 1e6, 3),
+            'target_ms': round(self._target_ns / 1e6, 3),
+            'jitter_ms': round(self._max_late_ns / 1e6, 3),
+        }
@@ -1,8 +1,12 @@
 """Utility functions for rotary phone."""
 
-from typing import Optional
+from datetime import date, datetime
+from typing import Optional, Union
 
+from rotary_phone.metrics import instrument
 
+
+@instrument('utils.validate_number')
 def validate_number(number: str) -> bool:
     """Validate a phone number format.
     
@@ -12,11 +16,15 @@ def validate_number(number: str) -> bool:
     
     Returns:
         True if the number contains only digits (after removing formatting)
-        and has valid length, False otherwise.
+        and has valid length, False otherwise. Numbers starting with '+' are
+        checked against the international numbering plans instead.
     """
     if not number or not isinstance(number, str):
         return False
     cleaned = normalize_number(number)
+    if cleaned.startswith('+'):
+        from rotary_phone.numbering import get_numbering_plan
+        return get_numbering_plan().parse(cleaned)['valid']
     return cleaned.isdigit() and is_valid_length(cleaned)
 
 
@@ -28,12 +36,16 @@ def format_number(number: str, international: bool = False) -> str:
         international: If True, format with international prefix (+1).
     
     Returns:
-        Formatted phone number in (XXX) XXX-XXXX format if 10 digits,
-        XXX-XXXX format if 7 digits, otherwise returns the cleaned number
-        without formatting characters.
+        Numbers starting with '+' in the international format of their
+        numbering plan (e.g. +44 20 7946 0958). Otherwise (XXX) XXX-XXXX
+        format if 10 digits, XXX-XXXX format if 7 digits, or else the
+        cleaned number without formatting characters.
     """
     # Use normalize_number for consistency
     cleaned = normalize_number(number)
+    if cleaned.startswith('+'):
+        from rotary_phone.numbering import get_numbering_plan
+        return get_numbering_plan().parse(cleaned)['international'] or cleaned
     if len(cleaned) == 10:
         formatted = f"({cleaned[:3]}) {cleaned[3:6]}-{cleaned[6:]}"
         if international:
@@ -68,11 +80,14 @@ def extract_country_code(number: str) -> tuple[str, str]:
     """
     cleaned = normalize_number(number)
     
-    # Check for common country codes
-    if cleaned.startswith("1") and len(cleaned) == 11:
+    # International numbers: any country code in the numbering plans
+    if cleaned.startswith("+"):
+        from rotary_phone.numbering import get_numbering_plan
+        info = get_numbering_plan().parse(cleaned)
+        if info['country_code'] is not None:
+            return (info['country_code'], info['national_number'])
+    elif cleaned.startswith("1") and len(cleaned) == 11:
         return ("1", cleaned[1:])
-    elif cleaned.startswith("+1") and len(cleaned) == 12:
-        return ("1", cleaned[2:])
     
     return ("", cleaned)
 
@@ -111,6 +126,33 @@ def format_timestamp(timestamp: str) -> str:
         return timestamp[:19].replace('T', ' ')
 
 
+def normalize_time_bound(value: Union[str, date, datetime, None], end_of_day: bool = False) -> Optional[str]:
+    """Convert a time bound to an ISO string comparable with stored timestamps.
+    
+    Args:
+        value: ISO date/timestamp string, date, datetime or None.
+        end_of_day: Whether this is an upper bound; a bare date then
+            includes that whole day.
+    
+    Returns:
+        The bound in the caller's precision, or None if value is None.
+    
+    Raises:
+        ValueError: If value is not a valid ISO date/time.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        value = value.isoformat()
+    # Validate, but keep the caller's precision
+    datetime.fromisoformat(value)
+    if len(value) == 10 and end_of_day:
+        return value + "T23:59:59.999999"
+    return value
+
+
 def format_duration(seconds: float) -> str:
     """Format a duration in seconds to a human-readable string.
     
@@ -13,6 +13,9 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     packages=find_packages(),
+    package_data={
+        "rotary_phone": ["data/*.json"],
+    },
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
@@ -27,6 +30,9 @@ setup(
     install_requires=[
         "click>=8.0.0",
     ],
+    extras_require={
+        "fast": ["numpy>=1.20"],
+    },
     entry_points={
         "console_scripts": [
             "rotary-phone=rotary_phone.cli:main",
@@ -0,0 +1,17 @@
+"""Shared test setup.
+
+Run the suite against another storage engine with, e.g.,
+``ROTARY_PHONE_BACKEND=memory pytest``.
+"""
+
+import pytest
+
+from rotary_phone import storage
+
+
+@pytest.fixture(autouse=True)
+def fresh_storage_backend():
+    """Give every test a newly created storage backend."""
+    storage.set_backend(None)
+    yield
+    storage.set_backend(None)
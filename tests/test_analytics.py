@@ -0,0 +1,88 @@
+"""Tests for the NumPy analytics backend against the pure-Python stats."""
+
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from rotary_phone import stats
+from rotary_phone.config import set_config_value
+from rotary_phone.contacts import add_contact
+from rotary_phone.history import save_history
+from rotary_phone.loadgen import generate_history
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    return config_dir
+
+
+def _all_stats():
+    return {
+        'dial_stats': stats.get_dial_stats(),
+        'top': stats.get_top_dialed(10),
+        'average': stats.get_average_calls_per_day(),
+        'by_day': stats.get_calls_by_day(),
+        'by_hour': stats.get_calls_by_hour(),
+    }
+
+
+def _compare_backends():
+    set_config_value('analytics_backend', 'python')
+    expected = _all_stats()
+    set_config_value('analytics_backend', 'auto')
+    assert _all_stats() == expected
+    return expected
+
+
+def test_backends_agree_on_generated_history(temp_config):
+    """Test both backends on a realistic skewed history."""
+    add_contact("Alice", "555-0100")
+    pool = [f"555{i:07d}" for i in range(40)]
+    save_history(generate_history(3000, pool, days=20, start=datetime(2023, 12, 20), seed=5))
+    expected = _compare_backends()
+    assert expected['dial_stats']['total_calls'] == 3000
+
+
+def test_backends_agree_on_ties_and_bad_timestamps(temp_config):
+    """Test tie ordering and rows the Python code skips."""
+    save_history([
+        {'number': '5552222', 'formatted': '', 'timestamp': '2024-01-01T23:59:59'},
+        {'number': '5551111', 'formatted': '', 'timestamp': 'not a date'},
+        {'number': '5551111', 'formatted': '', 'timestamp': '2024-01-02 00:00:00'},
+        {'number': '5552222', 'formatted': '', 'timestamp': ''},
+        {'number': '5553333', 'formatted': '', 'timestamp': '2024-01-02T05:00:00.250000'},
+    ])
+    set_config_value('analytics_backend', 'python')
+    expected = {name: func() for name, func in [
+        ('dial_stats', stats.get_dial_stats),
+        ('top', stats.get_top_dialed),
+        ('by_day', stats.get_calls_by_day),
+        ('by_hour', stats.get_calls_by_hour),
+    ]}
+    set_config_value('analytics_backend', 'auto')
+    assert stats.get_dial_stats() == expected['dial_stats']
+    assert stats.get_top_dialed() == expected['top']
+    assert stats.get_calls_by_day() == expected['by_day']
+    assert stats.get_calls_by_hour() == expected['by_hour']
+    assert expected['top'][0] == ('5552222', 2)
+
+
+def test_backends_agree_on_empty_and_single(temp_config):
+    """Test empty and single-entry histories."""
+    _compare_backends()
+    save_history([{'number': '5551234', 'formatted': '', 'timestamp': '2024-01-01T10:00:00'}])
+    assert _compare_backends()['average'] == 1.0
@@ -0,0 +1,82 @@
+"""Tests for pulse-dial audio rendering."""
+
+import wave
+
+import pytest
+
+from rotary_phone.audio import (INTERDIGIT_GAP, PULSES_PER_SECOND, pulse_count, render_many,
+                                render_pulses, write_wav)
+from rotary_phone.exceptions import InvalidNumberError
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    return config_dir
+
+
+def _expected_samples(digits, rate):
+    pulses = sum(pulse_count(d) for d in digits)
+    return pulses * (rate // PULSES_PER_SECOND) + (len(digits) - 1) * int(rate * INTERDIGIT_GAP)
+
+
+def test_pulse_count():
+    """Test that '0' is dialed as ten pulses."""
+    assert [pulse_count(d) for d in "1590"] == [1, 5, 9, 10]
+
+
+def test_render_pulses_length_and_clicks(temp_config):
+    """Test the rendered length and that each pulse starts with a click."""
+    pcm = render_pulses("555-1230", sample_rate=8000)
+    assert len(pcm) == 2 * _expected_samples("5551230", 8000)
+
+    samples = memoryview(pcm).cast('h')
+    period = 8000 // PULSES_PER_SECOND
+    assert any(samples[i] for i in range(1, 20))
+    # Loop is silent between the break and make clicks
+    assert not any(samples[100:period * 6 // 10])
+    assert not any(samples[5 * period:5 * period + int(8000 * INTERDIGIT_GAP)])
+
+
+def test_render_rejects_invalid_number(temp_config):
+    """Test that invalid numbers are rejected like in dial()."""
+    with pytest.raises(InvalidNumberError):
+        render_pulses("12ab")
+    with pytest.raises(ValueError):
+        render_pulses("555-1234", sample_rate=100)
+
+
+def test_write_wav_streams_file(temp_config, tmp_path):
+    """Test that a WAV file is written with the right header and frames."""
+    output = tmp_path / "call.wav"
+    duration = write_wav("(555) 123-4567", output, sample_rate=16000)
+
+    with wave.open(str(output), 'rb') as audio:
+        assert audio.getnchannels() == 1
+        assert audio.getsampwidth() == 2
+        assert audio.getframerate() == 16000
+        assert audio.getnframes() == _expected_samples("5551234567", 16000)
+        assert audio.readframes(audio.getnframes()) == render_pulses("5551234567", 16000)
+    assert duration == pytest.approx(audio.getnframes() / 16000)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_many(temp_config, tmp_path, workers):
+    """Test bulk rendering in process and across worker processes."""
+    numbers = ["555-1111", "555-2222", "5551111", "+44 20 7946 0958"]
+    paths = render_many(numbers, tmp_path / "out", workers=workers)
+
+    assert [p.name for p in paths] == ["5551111.wav", "5552222.wav", "442079460958.wav"]
+    with wave.open(str(paths[1]), 'rb') as audio:
+        assert audio.readframes(audio.getnframes()) == render_pulses("555-2222")
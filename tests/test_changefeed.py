@@ -0,0 +1,153 @@
+"""Tests for the change feed."""
+
+import struct
+import threading
+
+import pytest
+
+from rotary_phone import changefeed
+from rotary_phone.changefeed import ChangeFeed, MemoryChangeFeed, changes_since, follow, last_seq
+from rotary_phone.config import set_config_value
+from rotary_phone.contacts import add_contact, delete_contact, update_contact
+from rotary_phone.history import add_to_history, clear_history
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+    
+    from rotary_phone import config
+    
+    def mock_get_config_dir():
+        return config_dir
+    
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+    
+    set_config_value('enable_change_feed', True)
+    
+    return config_dir
+
+
+def test_mutations_are_recorded_in_order(temp_config):
+    """Test that history appends and contact changes get increasing sequences."""
+    add_contact("Alice", "555-1111")
+    add_to_history("5551111", "555-1111")
+    update_contact("Alice", "555-2222")
+    delete_contact("Alice")
+    delete_contact("Nobody")
+    clear_history()
+
+    records = changes_since(0)
+    assert [record['seq'] for record in records] == [1, 2, 3, 4, 5]
+    assert [(record['kind'], record['op']) for record in records] == [
+        ('contacts', 'put'), ('history', 'append'), ('contacts', 'put'),
+        ('contacts', 'delete'), ('history', 'replace'),
+    ]
+    assert records[1]['entry']['number'] == "5551111"
+    assert changes_since(3) == records[3:]
+    assert changes_since(1, limit=2) == records[1:3]
+    assert changes_since(5) == []
+    assert last_seq() == 5
+
+
+def test_change_feed_can_be_disabled(temp_config):
+    """Test the enable_change_feed option."""
+    set_config_value('enable_change_feed', False)
+    add_to_history("5551111", "555-1111")
+    add_contact("Alice", "555-1111")
+    assert last_seq() == 0
+
+
+def test_file_feed_survives_torn_writes(tmp_path):
+    """Test that unindexed log bytes and partial offsets are ignored."""
+    feed = ChangeFeed(tmp_path)
+    feed.append([{'kind': 'history', 'op': 'append', 'entry': {'number': '1'}}])
+    with open(feed.log_path, 'ab') as f:
+        f.write(b'{"seq": 2, "kind": "hist')
+    with open(feed.index_path, 'ab') as f:
+        f.write(b'\x01\x02')
+    assert feed.last_seq() == 1
+
+    assert feed.append([{'kind': 'contacts', 'op': 'delete', 'name': 'x'}]) == 2
+    assert [record['seq'] for record in ChangeFeed(tmp_path).changes_since(0)] == [1, 2]
+    assert feed.changes_since(1)[0]['name'] == 'x'
+
+
+@pytest.mark.parametrize("make_feed", [ChangeFeed, lambda path: MemoryChangeFeed()])
+def test_feed_is_compacted_to_the_retained_records(tmp_path, make_feed):
+    """Test that old records are dropped and readers behind them reload."""
+    feed = make_feed(tmp_path)
+    for i in range(1, 10):
+        feed.append([{'kind': 'contacts', 'op': 'delete', 'name': str(i)}], retain=4)
+    # Compacted once 9 > 2 * 4 records had built up
+    assert feed.last_seq() == 9
+    assert [record['seq'] for record in feed.changes_since(5)] == [6, 7, 8, 9]
+    assert feed.changes_since(7, limit=1)[0]['name'] == '8'
+
+    behind = feed.changes_since(2)
+    assert [(r['seq'], r['kind'], r['op']) for r in behind[:2]] == [
+        (5, 'contacts', 'replace'), (5, 'history', 'replace'),
+    ]
+    assert [record['seq'] for record in behind[2:]] == [6, 7, 8, 9]
+
+    assert feed.compact(retain=1) == 3
+    assert feed.append([{'kind': 'contacts', 'op': 'delete', 'name': '10'}]) == 10
+    assert [record['seq'] for record in feed.changes_since(8)] == [9, 10]
+    assert [record['seq'] for record in feed.changes_since(7)] == [8, 8, 9, 10]
+
+
+def test_interrupted_compaction_is_recovered(tmp_path):
+    """Test that a crash between the renames of a compaction is finished."""
+    feed = ChangeFeed(tmp_path)
+    feed.append([{'kind': 'contacts', 'op': 'delete', 'name': str(i)} for i in range(1, 7)])
+    old_log = feed.log_path.read_bytes()
+    feed.compact(retain=2)
+    # Put the old log back as if the crash came before its rename
+    feed.log_path.rename(feed.log_path.with_suffix('.log.tmp'))
+    feed.log_path.write_bytes(old_log)
+
+    assert [record['name'] for record in ChangeFeed(tmp_path).changes_since(4)] == ['5', '6']
+
+
+def test_index_without_header_is_upgraded(tmp_path):
+    """Test that an index written before compaction existed keeps working."""
+    feed = ChangeFeed(tmp_path)
+    lines = [b'{"seq": 1, "kind": "contacts", "op": "replace"}\n',
+             b'{"seq": 2, "kind": "history", "op": "replace"}\n']
+    feed.log_path.write_bytes(b"".join(lines))
+    feed.index_path.write_bytes(struct.pack('<QQ', 0, len(lines[0])))
+    assert feed.last_seq() == 2
+    assert feed.append([{'kind': 'contacts', 'op': 'delete', 'name': 'x'}]) == 3
+    assert [record['seq'] for record in feed.changes_since(0)] == [1, 2, 3]
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_wait_for_changes_wakes_on_append(tmp_path, monkeypatch, use_inotify):
+    """Test waiting with inotify and with the polling fallback."""
+    if not use_inotify:
+        monkeypatch.setattr(changefeed, "_load_libc", lambda: None)
+    feed = ChangeFeed(tmp_path)
+    assert feed.wait_for_changes(0, timeout=0.05, poll_interval=0.01) == []
+
+    writer = threading.Timer(0.1, lambda: ChangeFeed(tmp_path).append([{'kind': 'contacts', 'op': 'replace'}]))
+    writer.start()
+    records = feed.wait_for_changes(0, timeout=5, poll_interval=0.01)
+    writer.join()
+    feed.close()
+    assert [record['seq'] for record in records] == [1]
+
+
+def test_memory_feed_and_follow(temp_config):
+    """Test the in-memory feed used by the memory backend."""
+    from rotary_phone.storage import MemoryBackend, use_backend
+    with use_backend(MemoryBackend()):
+        set_config_value('enable_change_feed', True)
+        assert isinstance(changefeed.get_change_feed(), MemoryChangeFeed)
+        add_to_history("5551111", "555-1111")
+        threading.Timer(0.05, add_to_history, ("5552222", "555-2222")).start()
+        followed = list(follow(seq=0, timeout=0.3))
+        assert [record['entry']['number'] for record in followed] == ["5551111", "5552222"]
+    assert not (temp_config / "changes.log").exists()
@@ -0,0 +1,72 @@
+"""Tests for the pluggable clock."""
+
+import time
+from datetime import datetime
+
+import pytest
+
+from rotary_phone.clock import SystemClock, VirtualClock, get_clock, use_clock
+from rotary_phone.dialer import dial
+from rotary_phone.history import get_recent_calls, load_history
+from rotary_phone.stats import get_calls_by_hour
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    return config_dir
+
+
+def test_virtual_clock_advances_on_sleep():
+    """Test that sleeping moves virtual time without blocking."""
+    clock = VirtualClock(datetime(2024, 3, 1, 9, 0))
+    start = time.monotonic()
+    clock.sleep(3600)
+    assert time.monotonic() - start < 1
+    assert clock.now() == datetime(2024, 3, 1, 10, 0)
+    assert clock.monotonic() == 3600
+
+    with pytest.raises(ValueError):
+        clock.set(datetime(2024, 3, 1, 9, 30))
+
+
+def test_use_clock_restores_previous():
+    """Test that use_clock only applies inside the block."""
+    clock = VirtualClock()
+    with use_clock(clock):
+        assert get_clock() is clock
+    assert isinstance(get_clock(), SystemClock)
+
+
+def test_dial_uses_virtual_time(temp_config):
+    """Test that dialing advances the virtual clock and stamps history with it."""
+    clock = VirtualClock(datetime(2024, 3, 1, 9, 0))
+    with use_clock(clock):
+        dial("555-1234", delay=10.0, quiet=True)
+        assert clock.now() == datetime(2024, 3, 1, 9, 1, 10)
+        assert len(get_recent_calls(1)) == 1
+
+    assert load_history()[0]['timestamp'] == "2024-03-01T09:01:10"
+
+
+def test_calls_by_hour_is_reproducible(temp_config):
+    """Test that a simulated day yields the same hourly counts every run."""
+    clock = VirtualClock(datetime(2024, 3, 1))
+    with use_clock(clock):
+        for hour in range(24):
+            clock.set(datetime(2024, 3, 1, hour, 30))
+            for _ in range(hour % 3):
+                dial("555-1234", delay=0.5, quiet=True)
+
+    assert get_calls_by_hour() == {hour: hour % 3 for hour in range(24) if hour % 3}
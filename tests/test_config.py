@@ -0,0 +1,77 @@
+"""Tests for configuration and data directory resolution."""
+
+from pathlib import Path
+
+import pytest
+
+from rotary_phone import config
+from rotary_phone.config import (
+    ensure_config_dir, get_config_dir, list_tenants, set_data_dir, shard_for_number
+)
+from rotary_phone.exceptions import ConfigError
+
+
+@pytest.fixture
+def data_home(tmp_path, monkeypatch):
+    """Point ROTARY_PHONE_HOME at a temporary directory, using JSON files."""
+    home = tmp_path / "home"
+    monkeypatch.setenv(config.DATA_DIR_ENV_VAR, str(home))
+    monkeypatch.delenv(config.TENANT_ENV_VAR, raising=False)
+    # These tests look at the files on disk
+    monkeypatch.setenv("ROTARY_PHONE_BACKEND", "json")
+    set_data_dir()
+    yield home
+    monkeypatch.undo()
+    set_data_dir()
+
+
+def test_data_dir_from_environment(data_home):
+    """Test that ROTARY_PHONE_HOME moves the data directory."""
+    assert get_config_dir() == data_home
+    assert ensure_config_dir().is_dir()
+
+
+def test_config_dir_resolved_once(data_home, monkeypatch, tmp_path):
+    """Test that the directory is resolved and created only once."""
+    ensure_config_dir()
+    calls = []
+    original_mkdir = Path.mkdir
+    monkeypatch.setattr(Path, "mkdir", lambda self, *a, **k: calls.append(self) or original_mkdir(self, *a, **k))
+    monkeypatch.setenv(config.DATA_DIR_ENV_VAR, str(tmp_path / "elsewhere"))
+    for _ in range(3):
+        assert ensure_config_dir() == data_home
+    assert calls == []
+
+
+def test_tenant_isolation(data_home, monkeypatch):
+    """Test that tenants get separate stores."""
+    from rotary_phone.contacts import add_contact, list_contacts
+    set_data_dir(tenant="acme")
+    add_contact("Alice", "555-1111")
+    assert get_config_dir() == data_home / "tenants" / "acme"
+
+    monkeypatch.setenv(config.TENANT_ENV_VAR, "globex")
+    set_data_dir()
+    assert list_contacts() == {}
+    add_contact("Bob", "555-2222")
+    assert list_tenants() == ["acme", "globex"]
+
+    set_data_dir(tenant="acme")
+    assert list_contacts() == {"Alice": "555-1111"}
+
+
+def test_invalid_tenant(data_home):
+    """Test that tenant names cannot escape the data directory."""
+    for name in ["../other", "a/b", ".hidden", ""]:
+        with pytest.raises(ConfigError):
+            set_data_dir(tenant=name)
+
+
+def test_shard_for_number():
+    """Test that sharding is stable and ignores formatting."""
+    assert shard_for_number("555-1234", 8) == shard_for_number("(555) 1234", 8)
+    shards = {shard_for_number(f"555{i:04d}", 16) for i in range(1000)}
+    assert len(shards) == 16
+    assert all(name.startswith("shard-") and len(name) == 8 for name in shards)
+    with pytest.raises(ValueError):
+        shard_for_number("555-1234", 0)
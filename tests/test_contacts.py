@@ -61,9 +61,25 @@ def test_get_nonexistent_contact(temp_config):
     assert get_contact("Nonexistent") is None
 
 
-
-
-
-
-
-
+def test_iter_contacts_pagination(temp_config):
+    """Test streaming contacts in name order with a cursor and filter."""
+    from rotary_phone.contacts import iter_contacts
+    for name in ["Dave", "alice", "Carol", "Bob"]:
+        add_contact(name, "555-1111")
+    assert [name for name, _ in iter_contacts()] == ["Bob", "Carol", "Dave", "alice"]
+    assert [name for name, _ in iter_contacts(offset=1, limit=2)] == ["Carol", "Dave"]
+    assert [name for name, _ in iter_contacts(after="Carol")] == ["Dave", "alice"]
+    assert [name for name, _ in iter_contacts(query="A")] == ["Carol", "Dave", "alice"]
+
+
+def test_get_contacts_by_number_uses_fresh_index(temp_config):
+    """Test reverse lookup across formats and after an in-place update."""
+    from rotary_phone.contacts import get_contacts_by_number, update_contact
+    add_contact("Bob", "555-1111")
+    add_contact("Alice", "(555) 1111")
+    assert get_contacts_by_number("5551111") == ["Alice", "Bob"]
+
+    # Same file size, possibly the same mtime tick
+    update_contact("Bob", "555-2222")
+    assert get_contacts_by_number("5551111") == ["Alice"]
+    assert get_contacts_by_number("555 2222") == ["Bob"]
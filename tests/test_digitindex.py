@@ -0,0 +1,178 @@
+"""Tests for digit-pattern search."""
+
+import pytest
+
+from rotary_phone.config import set_config_value
+from rotary_phone.contacts import add_contact, delete_contact, save_contacts, update_contact
+from rotary_phone.digitindex import compile_pattern, ensure_digit_index, search_digits
+from rotary_phone.history import add_to_history, clear_history
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    return config_dir
+
+
+def _numbers(results):
+    return [call['number'] for call in results['calls']]
+
+
+@pytest.mark.parametrize("pattern, text", [
+    ("555-***-12**", "555***12**"),
+    ("^555", "^555"),
+    ("+44 20", "^4420"),
+    ("(555) 12?4$", "55512?4$"),
+])
+def test_compile_pattern(pattern, text):
+    """Test that separators are dropped and anchors kept."""
+    assert compile_pattern(pattern)[0] == text
+
+
+@pytest.mark.parametrize("pattern", ["", "^$", "555-abc", "5*5%"])
+def test_invalid_patterns(pattern):
+    """Test that patterns without digit positions or with other characters are rejected."""
+    with pytest.raises(ValueError):
+        compile_pattern(pattern)
+
+
+def test_prefix_suffix_and_wildcards(temp_config):
+    """Test the match modes over contacts and history."""
+    add_contact("Alice", "555-123-1234")
+    add_contact("Bob", "(212) 555-0100")
+    add_to_history("5551231234", "(555) 123-1234")
+    add_to_history("5559991234", "(555) 999-1234")
+    add_to_history("5559991234", "(555) 999-1234")
+
+    results = search_digits("555-1**-12**")
+    assert results['contacts'] == {"Alice": "555-123-1234"}
+    assert _numbers(results) == ["5551231234"]
+
+    assert _numbers(search_digits("1234$")) == ["5551231234", "5559991234"]
+    assert search_digits("1234$")['calls'][1]['calls'] == 2
+    assert search_digits("^555")['contacts'] == {"Alice": "555-123-1234"}
+    assert search_digits("5550")['contacts'] == {"Bob": "(212) 555-0100"}
+    assert search_digits("^21")['contacts'] == {"Bob": "(212) 555-0100"}
+    assert search_digits("^1234") == {'contacts': {}, 'calls': []}
+
+
+def test_writes_update_the_index(temp_config):
+    """Test that contact and history changes reach a built index."""
+    add_contact("Alice", "555-123-1234")
+    ensure_digit_index()
+
+    update_contact("Alice", "555-777-0000")
+    add_contact("Carol", "555-123-9999")
+    add_to_history("5558881234", "(555) 888-1234")
+    assert search_digits("^555123")['contacts'] == {"Carol": "555-123-9999"}
+    assert _numbers(search_digits("1234$")) == ["5558881234"]
+
+    delete_contact("Carol")
+    assert search_digits("^555123")['contacts'] == {}
+    numbers = ensure_digit_index()['numbers']
+    assert "5551239999" not in numbers
+    assert "5551231234" not in numbers
+
+    save_contacts({"Dave": "555-123-4444"})
+    clear_history()
+    assert search_digits("^555") == {'contacts': {"Dave": "555-123-4444"}, 'calls': []}
+
+
+def test_trimmed_history_is_forgotten(temp_config):
+    """Test that calls dropped by the history limit no longer match."""
+    set_config_value('history_limit', 4)
+    add_to_history("5550000001", "(555) 000-0001")
+    ensure_digit_index()
+    for i in range(2, 12):
+        add_to_history(f"55500000{i:02d}", f"(555) 000-00{i:02d}")
+
+    assert len(ensure_digit_index()['numbers']) <= 5
+    results = search_digits("^555")
+    assert _numbers(results) == ["5550000008", "5550000009", "5550000010", "5550000011"]
+
+
+def test_writes_update_the_index_in_place(temp_config):
+    """Test that writes reach the built index without a rebuild."""
+    add_contact("Alice", "555-123-1234")
+    index = ensure_digit_index()
+
+    add_contact("Bob", "555-123-5678")
+    add_to_history("5551235678", "(555) 123-5678")
+    assert ensure_digit_index() is index
+    results = search_digits("^555123")
+    assert results['contacts'] == {"Alice": "555-123-1234", "Bob": "555-123-5678"}
+    assert _numbers(results) == ["5551235678"]
+
+
+def test_outside_writes_rebuild_the_index(temp_config):
+    """Test that data changed behind the index's back is picked up."""
+    from rotary_phone.storage import get_backend
+    add_contact("Alice", "555-123-1234")
+    index = ensure_digit_index()
+
+    get_backend().put_contact("Bob", "555-123-5678")
+    assert search_digits("^555123")['contacts'] == {"Alice": "555-123-1234", "Bob": "555-123-5678"}
+    assert ensure_digit_index() is not index
+
+
+def test_repeat_calls_and_exact_trim(temp_config):
+    """Test that calls with equal timestamps are all counted and trimmed one by one."""
+    from rotary_phone.clock import VirtualClock, use_clock
+    set_config_value('history_limit', 3)
+    with use_clock(VirtualClock()):
+        add_to_history("5550000001", "(555) 000-0001")
+        ensure_digit_index()
+        add_to_history("5550000001", "(555) 000-0001")
+        add_to_history("5550000002", "(555) 000-0002")
+        assert search_digits("^555")['calls'][0]['calls'] == 2
+
+        add_to_history("5550000002", "(555) 000-0002")
+        calls = {c['number']: c['calls'] for c in search_digits("^555")['calls']}
+        assert calls == {"5550000001": 1, "5550000002": 2}
+
+
+def test_index_disabled_scans(temp_config):
+    """Test that searches scan the data with the index disabled."""
+    add_contact("Alice", "555-123-1234")
+    add_to_history("5551231234", "(555) 123-1234")
+    set_config_value('enable_digit_index', False)
+    results = search_digits("^555123")
+    assert results == {
+        'contacts': {"Alice": "555-123-1234"},
+        'calls': [{'number': "5551231234", 'calls': 1, 'last_call': results['calls'][0]['last_call']}],
+    }
+
+
+def test_index_without_change_feed(temp_config):
+    """Test that searches still see every write with the change feed disabled."""
+    add_contact("Alice", "555-123-1234")
+    ensure_digit_index()
+    set_config_value('enable_change_feed', False)
+    add_contact("Bob", "555-123-5678")
+    assert search_digits("^555123")['contacts'] == {"Alice": "555-123-1234", "Bob": "555-123-5678"}
+
+    set_config_value('enable_change_feed', True)
+    delete_contact("Alice")
+    assert search_digits("^555123")['contacts'] == {"Bob": "555-123-5678"}
+
+
+def test_search_inside_snapshot(temp_config):
+    """Test that a search in a snapshot sees the snapshot's data."""
+    from rotary_phone.snapshot import read_snapshot
+    add_contact("Alice", "555-123-1234")
+    ensure_digit_index()
+    with read_snapshot():
+        add_contact("Bob", "555-123-5678")
+        assert search_digits("^555123")['contacts'] == {"Alice": "555-123-1234"}
+    assert search_digits("^555123")['contacts'] == {"Alice": "555-123-1234", "Bob": "555-123-5678"}
@@ -0,0 +1,100 @@
+"""Tests for the do-not-call list."""
+
+import pytest
+
+from rotary_phone import dnc
+from rotary_phone.dialer import dial
+from rotary_phone.dnc import (DncList, build_dnc_list, clear_dnc_list, get_dnc_list,
+                              import_dnc_file, is_do_not_call, number_key)
+from rotary_phone.exceptions import DialError, DoNotCallError
+from rotary_phone.history import load_history
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    yield config_dir
+    clear_dnc_list()
+
+
+def test_listed_numbers_match_in_any_format(temp_config):
+    """Test that numbers match regardless of formatting or country code."""
+    assert build_dnc_list(["555-123-4567", "+44 20 7946 0958", "5551234567"]) == 2
+
+    assert is_do_not_call("(555) 123-4567")
+    assert is_do_not_call("+1 555 123 4567")
+    assert is_do_not_call("+442079460958")
+    assert not is_do_not_call("555-123-4568")
+    assert not is_do_not_call("02079460958")
+
+
+def test_no_list_allows_everything(temp_config):
+    """Test that dialing is unrestricted without a list."""
+    assert get_dnc_list() is None
+    assert not is_do_not_call("555-123-4567")
+
+
+def test_dial_refuses_listed_number(temp_config):
+    """Test that dial raises DoNotCallError and records nothing."""
+    build_dnc_list(["555-1234"])
+    with pytest.raises(DoNotCallError):
+        dial("555-1234", delay=0, quiet=True)
+    assert issubclass(DoNotCallError, DialError)
+    assert load_history() == []
+
+    dial("555-9999", delay=0, quiet=True)
+    assert len(load_history()) == 1
+
+
+def test_import_file_and_append(temp_config, tmp_path):
+    """Test importing from a file, appending and clearing."""
+    list_file = tmp_path / "dnc.txt"
+    list_file.write_text("# header\n555-0001\n\n555-0002\n")
+    assert import_dnc_file(list_file) == 2
+
+    list_file.write_text("555-0003\n")
+    assert import_dnc_file(list_file, append=True) == 3
+    assert is_do_not_call("555-0001") and is_do_not_call("555-0003")
+
+    assert import_dnc_file(list_file) == 1
+    assert not is_do_not_call("555-0001")
+
+    clear_dnc_list()
+    assert not is_do_not_call("555-0003")
+
+
+def test_bloom_false_positives_are_rejected(temp_config):
+    """Test that a Bloom hit for an unlisted key is rejected by the exact check."""
+    numbers = [f"+1555{i:07d}" for i in range(2000)]
+    build_dnc_list(numbers, false_positive_rate=0.2)
+    dnc_list = DncList(temp_config / dnc.DNC_FILE)
+    try:
+        assert all(number in dnc_list for number in numbers[:100])
+        region = dnc_list.region
+        unlisted = [number_key(f"+1666{i:07d}", region) for i in range(2000)]
+        false_positives = [key for key in unlisted if dnc_list.might_contain(key)]
+        assert false_positives
+        assert not any(dnc_list.contains_key(key) for key in false_positives)
+    finally:
+        dnc_list.close()
+
+
+def test_python_and_numpy_filters_agree(temp_config, monkeypatch):
+    """Test that the pure-Python Bloom builder sets the same bits as NumPy."""
+    if dnc.np is None:
+        pytest.skip("numpy not installed")
+    keys = sorted(number_key(f"+1555{i:07d}", "US") for i in range(300))
+    fast = dnc._set_bits(keys, 4099, 7)
+    monkeypatch.setattr(dnc, "np", None)
+    assert dnc._set_bits(keys, 4099, 7) == fast
@@ -0,0 +1,158 @@
+"""Tests for export and import."""
+
+import json
+
+import pytest
+
+from rotary_phone.config import set_config_value
+from rotary_phone.contacts import add_contact, delete_contact, load_contacts, update_contact
+from rotary_phone.exceptions import ExportError, ImportError
+from rotary_phone.export import export_data, export_incremental, import_chain, import_data
+from rotary_phone.history import add_to_history, clear_history, load_history
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    set_config_value('enable_change_feed', True)
+    set_config_value('enable_rollups', True)
+
+    return config_dir
+
+
+def _reset_store():
+    """Empty contacts and history, as on a freshly restored machine."""
+    from rotary_phone.contacts import save_contacts
+    save_contacts({})
+    clear_history()
+
+
+def test_full_export_round_trip(temp_config, tmp_path):
+    """Test that a full export records a watermark and imports back."""
+    add_contact("Alice", "555-1111")
+    add_to_history("5551111", "555-1111")
+    backup = tmp_path / "full.json"
+    export_data(backup)
+
+    data = json.loads(backup.read_text())
+    assert data['backup_type'] == 'full'
+    assert data['change_seq'] == 2
+    assert len(data['content_hash']) == 64
+
+    _reset_store()
+    stats = import_data(backup)
+    assert stats['contacts_added'] == 1
+    assert stats['history_entries_added'] == 1
+    assert load_contacts() == {"Alice": "555-1111"}
+
+
+def test_incremental_holds_only_changes(temp_config, tmp_path):
+    """Test that an incremental export contains only what changed."""
+    add_contact("Alice", "555-1111")
+    add_contact("Bob", "555-2222")
+    add_to_history("5551111", "555-1111")
+    full = tmp_path / "full.json"
+    export_data(full)
+
+    update_contact("Alice", "555-3333")
+    delete_contact("Bob")
+    add_contact("Carol", "555-4444")
+    add_to_history("5554444", "555-4444")
+    incremental = tmp_path / "inc1.json"
+    result = export_incremental(incremental, full)
+
+    assert result == {'contacts_changed': 2, 'contacts_deleted': 1, 'history_entries': 1}
+    data = json.loads(incremental.read_text())
+    assert data['contacts'] == {"Alice": "555-3333", "Carol": "555-4444"}
+    assert data['deleted_contacts'] == ["Bob"]
+    assert [entry['number'] for entry in data['history']] == ["5554444"]
+    assert data['base_hash'] == json.loads(full.read_text())['content_hash']
+
+
+def test_import_chain_restores_latest_state(temp_config, tmp_path):
+    """Test that a full backup plus two incrementals restore the final state."""
+    add_contact("Alice", "555-1111")
+    add_contact("Bob", "555-2222")
+    add_to_history("5551111", "555-1111")
+    full = tmp_path / "full.json"
+    export_data(full)
+
+    delete_contact("Bob")
+    add_to_history("5552222", "555-2222")
+    inc1 = tmp_path / "inc1.json"
+    export_incremental(inc1, full)
+
+    update_contact("Alice", "555-9999")
+    inc2 = tmp_path / "inc2.json"
+    export_incremental(inc2, inc1)
+
+    expected_contacts = load_contacts()
+    expected_numbers = [entry['number'] for entry in load_history()]
+    _reset_store()
+
+    stats = import_chain([full, inc1, inc2])
+    assert stats['contacts_deleted'] == 1
+    assert load_contacts() == expected_contacts
+    assert [entry['number'] for entry in load_history()] == expected_numbers
+
+
+def test_import_chain_rejects_broken_chain(temp_config, tmp_path):
+    """Test that out-of-order or edited files are rejected before importing."""
+    add_contact("Alice", "555-1111")
+    full = tmp_path / "full.json"
+    export_data(full)
+    add_contact("Bob", "555-2222")
+    inc1 = tmp_path / "inc1.json"
+    export_incremental(inc1, full)
+    add_contact("Carol", "555-3333")
+    inc2 = tmp_path / "inc2.json"
+    export_incremental(inc2, inc1)
+    _reset_store()
+
+    with pytest.raises(ImportError, match="does not extend"):
+        import_chain([full, inc2])
+    with pytest.raises(ImportError, match="incremental backup"):
+        import_chain([inc1])
+
+    data = json.loads(inc1.read_text())
+    data['contacts']['Mallory'] = "555-6666"
+    inc1.write_text(json.dumps(data))
+    with pytest.raises(ImportError, match="hash mismatch"):
+        import_chain([full, inc1])
+    assert load_contacts() == {}
+
+
+def test_incremental_after_clear_carries_full_history(temp_config, tmp_path):
+    """Test that a rewritten collection is exported in full."""
+    add_to_history("5551111", "555-1111")
+    full = tmp_path / "full.json"
+    export_data(full)
+    clear_history()
+    add_to_history("5552222", "555-2222")
+
+    incremental = tmp_path / "inc.json"
+    export_incremental(incremental, full)
+    data = json.loads(incremental.read_text())
+    assert data['history_replace'] is True
+
+    import_chain([full, incremental])
+    assert [entry['number'] for entry in load_history()] == ["5552222"]
+
+
+def test_incremental_needs_watermark(temp_config, tmp_path):
+    """Test that a backup without a watermark cannot be a base."""
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps({'contacts': {}, 'export_version': '1.0'}))
+    with pytest.raises(ExportError, match="watermark"):
+        export_incremental(tmp_path / "inc.json", legacy)
@@ -64,9 +64,70 @@ def test_history_max_entries(temp_config):
     assert len(history) == 100
 
 
-
-
-
-
-
-
+def test_iter_history_pagination(temp_config):
+    """Test offset, limit and timestamp cursor pagination."""
+    from rotary_phone.history import iter_history
+    save_history([
+        {'number': f"555000{i}", 'formatted': f"555-000{i}", 'timestamp': f"2024-01-0{i + 1}T12:00:00"}
+        for i in range(5)
+    ])
+    page = list(iter_history(offset=1, limit=2))
+    assert [entry['number'] for entry in page] == ["5550001", "5550002"]
+
+    next_page = list(iter_history(limit=2, after=page[-1]['timestamp']))
+    assert [entry['number'] for entry in next_page] == ["5550003", "5550004"]
+    assert list(iter_history(limit=0)) == []
+
+
+def test_iter_history_cursor_keeps_ties(temp_config):
+    """Test that paging by cursor neither repeats nor drops calls made at the same time."""
+    from rotary_phone.history import iter_history
+    timestamps = ["2024-01-01T12:00:00"] * 3 + ["2024-01-01T12:00:01"] * 4 + ["2024-01-02T08:00:00"]
+    save_history([
+        {'number': f"555000{i}", 'formatted': f"555-000{i}", 'timestamp': timestamp}
+        for i, timestamp in enumerate(timestamps)
+    ])
+    seen = []
+    after = None
+    while True:
+        page = list(iter_history(limit=2, after=after, cursors=True))
+        if not page:
+            break
+        seen.extend(entry['number'] for entry, _ in page)
+        after = page[-1][1]
+    assert seen == [f"555000{i}" for i in range(8)]
+
+    page = list(iter_history(offset=1, limit=2, after="2024-01-01T12:00:00#2", cursors=True))
+    assert [(entry['number'], cursor) for entry, cursor in page] == [
+        ("5550003", "2024-01-01T12:00:01#1"), ("5550004", "2024-01-01T12:00:01#2")]
+    assert [e['number'] for e in iter_history(after="2024-01-01T12:00:01")] == ["5550007"]
+    with pytest.raises(ValueError):
+        list(iter_history(after="2024-01-01T12:00:01#0"))
+
+
+def test_annotate_history_loads_contacts_once(temp_config, monkeypatch):
+    """Test that caller-ID annotation joins against one contacts load."""
+    from rotary_phone import contacts
+    from rotary_phone.history import annotate_history
+    contacts.save_contacts({"Alice": "555-1111", "Bob": "555-1111", "Carol": "555-2222"})
+
+    loads = []
+    original_load = contacts.load_contacts
+    monkeypatch.setattr(contacts, "load_contacts", lambda: loads.append(1) or original_load())
+
+    entries = [{'number': number, 'formatted': number, 'timestamp': '2024-01-01T00:00:00'}
+               for number in ["5551111", "555-2222", "555-9999"] * 100]
+    annotated = list(annotate_history(entries))
+    assert [entry['name'] for entry in annotated[:3]] == ["Alice, Bob", "Carol", ""]
+    assert len(loads) == 1
+    assert 'name' not in entries[0]
+
+
+def test_add_to_history_writes_only_history_by_default(temp_config):
+    """Test that a call writes no change feed, rollup or transaction files unless enabled."""
+    from rotary_phone.storage import get_backend
+    if get_backend().name == 'memory':
+        pytest.skip("the memory backend keeps no files")
+    add_to_history("5551234", "(555) 123-4567")
+    written = {path.name for path in temp_config.iterdir()}
+    assert not written & {"changes.log", "generation", "rollups_pending.json", "rollups.json"}
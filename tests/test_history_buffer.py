@@ -0,0 +1,98 @@
+"""Tests for write-behind history buffering."""
+
+import time
+
+import pytest
+
+from rotary_phone.config import set_config_value
+from rotary_phone.history import (
+    _read_history, add_to_history, clear_history, flush_history,
+    get_history, get_history_buffer
+)
+from rotary_phone.history_buffer import HistoryBuffer
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    yield config_dir
+    flush_history()
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_unbuffered_by_default(temp_config):
+    """Test that entries are written immediately with the default policy."""
+    add_to_history("5551234", "555-1234")
+    assert len(_read_history()) == 1
+
+
+def test_flush_on_batch_size(temp_config):
+    """Test that a full batch is flushed by the background thread."""
+    set_config_value('history_flush_batch', 3)
+    add_to_history("5551111", "555-1111")
+    add_to_history("5552222", "555-2222")
+    assert _read_history() == []
+    assert get_history_buffer().pending_count() == 2
+
+    add_to_history("5553333", "555-3333")
+    assert _wait_for(lambda: len(_read_history()) == 3)
+
+
+def test_flush_on_interval(temp_config):
+    """Test that pending entries are flushed after the interval elapses."""
+    set_config_value('history_flush_batch', 1000)
+    set_config_value('history_flush_interval', 20)
+    add_to_history("5551111", "555-1111")
+    assert _wait_for(lambda: len(_read_history()) == 1)
+
+
+def test_reads_flush_pending_entries(temp_config):
+    """Test that get_history and clear_history see buffered entries."""
+    set_config_value('history_flush_batch', 1000)
+    add_to_history("5551111", "555-1111")
+    history = get_history()
+    assert [entry['number'] for entry in history] == ["5551111"]
+
+    add_to_history("5552222", "555-2222")
+    clear_history()
+    assert get_history_buffer().pending_count() == 0
+    assert _read_history() == []
+
+
+def test_failed_flush_keeps_entries():
+    """Test that entries survive a writer error and are retried."""
+    written = []
+
+    def flaky_writer(entries):
+        if not written:
+            written.append(None)
+            raise IOError("disk full")
+        written.extend(entries)
+
+    buffer = HistoryBuffer(flaky_writer, flush_batch=100)
+    buffer.append({'number': '5551111'})
+    with pytest.raises(IOError):
+        buffer.flush()
+    assert buffer.pending_count() == 1
+    buffer.flush()
+    assert written[1:] == [{'number': '5551111'}]
+    buffer.close()
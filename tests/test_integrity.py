@@ -0,0 +1,138 @@
+"""Tests for checksums, verification and repair."""
+
+import json
+
+import pytest
+
+from rotary_phone import integrity
+from rotary_phone.config import set_config_value
+from rotary_phone.integrity import fsck, read_manifest, seal_file, verify
+from rotary_phone.storage import create_backend
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    return config_dir
+
+
+def entry(i):
+    return {'number': f"555{i:04d}", 'formatted': f"555-{i:04d}", 'timestamp': f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}"}
+
+
+def _statuses(directory):
+    return {report['file']: report['status'] for report in verify(directory)}
+
+
+@pytest.mark.parametrize("name", ["json", "log"])
+def test_saves_write_checksums(name, tmp_path, monkeypatch):
+    """Test that rewrites and appends keep the manifests in step with the files."""
+    monkeypatch.setattr(integrity, "SEGMENT_SIZE", 64)
+    backend = create_backend(name, tmp_path)
+    backend.save_contacts({"Alice": "555-1111"})
+    backend.put_contact("Bob", "555-2222")
+    for i in range(10):
+        backend.append_history([entry(i)], limit=8)
+    backend.save_config({'history_limit': 8})
+
+    assert set(_statuses(tmp_path).values()) == {'ok'}
+    history = backend.path('history')
+    appended = read_manifest(history)
+    seal_file(history)
+    assert appended == read_manifest(history)
+    assert appended[1] == history.stat().st_size
+
+
+def test_damaged_history_is_salvaged(temp_config, tmp_path, monkeypatch):
+    """Test that a flipped byte is found and the other entries are kept."""
+    monkeypatch.setattr(integrity, "SEGMENT_SIZE", 256)
+    backend = create_backend('json', tmp_path)
+    backend.save_history([entry(i) for i in range(20)])
+    path = backend.path('history')
+    data = bytearray(path.read_bytes())
+    position = data.index(b'"5550007"')
+    data[position] = ord('x')
+    path.write_bytes(bytes(data))
+
+    reports = verify(tmp_path, workers=4)
+    report = next(r for r in reports if r['file'] == 'history.json')
+    assert report['status'] == 'damaged'
+    assert report['bad_segments'] == [position // 256]
+
+    fsck(tmp_path, repair=True)
+    history = backend.load_history()
+    assert [e['number'] for e in history] == [entry(i)['number'] for i in range(20) if i != 7]
+    assert _statuses(tmp_path) == {'history.json': 'ok'}
+
+
+def test_undecodable_file_is_quarantined_and_merged(temp_config):
+    """Test that a corrupt contacts file is kept aside and merged back by repair."""
+    from rotary_phone.contacts import add_contact, load_contacts
+    from rotary_phone.storage import get_backend
+    if get_backend().name == 'memory':
+        pytest.skip("the memory backend keeps no files")
+    add_contact("Alice", "555-1111")
+    add_contact("Bob", "555-2222")
+    path = get_backend().path('contacts')
+    if path.suffix == '.log':
+        path.write_text(path.read_text() + '{"put": "Carol", "num\n')
+    else:
+        path.write_text(path.read_text().replace('}', ''))
+        assert load_contacts() == {}
+        assert (temp_config / "contacts.json.corrupt-1").exists()
+        add_contact("Dave", "555-4444")
+
+    statuses = _statuses(temp_config)
+    assert 'damaged' in statuses.values() or 'quarantined' in statuses.values()
+    fsck(repair=True)
+    contacts = load_contacts()
+    assert contacts["Alice"] == "555-1111" and contacts["Bob"] == "555-2222"
+    assert all(status == 'ok' for status in _statuses(temp_config).values())
+
+
+def test_unverified_files_get_checksums(tmp_path):
+    """Test that files written before checksums existed are sealed by repair."""
+    (tmp_path / "history.json").write_text(json.dumps([entry(1)], indent=2))
+    (tmp_path / "config.json").write_text("{broken")
+    assert _statuses(tmp_path) == {'config.json': 'damaged', 'history.json': 'unverified'}
+
+    reports = fsck(tmp_path, repair=True)
+    assert {r['file']: r['status'] for r in reports} == {'config.json': 'repaired', 'history.json': 'repaired'}
+    assert _statuses(tmp_path) == {'config.json': 'ok', 'history.json': 'ok'}
+
+
+def test_repair_refreshes_derived_data(temp_config, monkeypatch):
+    """Test that rollups and the digit index forget calls lost to damage."""
+    from rotary_phone.digitindex import search_digits
+    from rotary_phone.history import add_to_history
+    from rotary_phone.rollups import get_daily_counts
+    from rotary_phone.storage import get_backend
+    if get_backend().name == 'memory':
+        pytest.skip("the memory backend keeps no files")
+    monkeypatch.setattr(integrity, "SEGMENT_SIZE", 64)
+    set_config_value('enable_rollups', True)
+    for i in range(5):
+        add_to_history(f"555000{i}", f"555-000{i}")
+    assert len(search_digits("^555")['calls']) == 5
+    assert sum(get_daily_counts().values()) == 5
+
+    path = get_backend().path('history')
+    data = bytearray(path.read_bytes())
+    data[data.index(b'"5550002"')] = ord('x')
+    path.write_bytes(bytes(data))
+    fsck(repair=True)
+
+    assert [call['number'] for call in search_digits("^555")['calls']] == [
+        "5550000", "5550001", "5550003", "5550004"]
+    assert sum(get_daily_counts().values()) == 4
@@ -0,0 +1,65 @@
+"""Tests for incremental JSON readers."""
+
+import json
+
+import pytest
+
+from rotary_phone.jsonstream import iter_json_array, iter_json_object
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 65536])
+def test_iter_json_array(tmp_path, chunk_size):
+    """Test streaming array elements across chunk boundaries."""
+    data = [{'number': '5551234', 'n': 12345}, [1, 2.5, None], "x,]y", 1234567890, True, {}]
+    path = tmp_path / "array.json"
+    path.write_text(json.dumps(data, indent=2))
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == data
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 65536])
+def test_iter_json_object(tmp_path, chunk_size):
+    """Test streaming object members in file order."""
+    data = {'Alice': '555-0100', 'Bob': '555-0200', 'Carol "C"': '555-0300'}
+    path = tmp_path / "object.json"
+    path.write_text(json.dumps(data, indent=2, sort_keys=True))
+    assert list(iter_json_object(path, chunk_size=chunk_size)) == sorted(data.items())
+
+
+def test_empty_and_invalid(tmp_path):
+    """Test empty containers and malformed input."""
+    path = tmp_path / "data.json"
+    path.write_text("[ ]")
+    assert list(iter_json_array(path)) == []
+    path.write_text("{}")
+    assert list(iter_json_object(path)) == []
+    path.write_text('[{"a": 1}, {"b": ')
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(path))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 16, 4096])
+def test_seek_sorted(tmp_path, chunk_size):
+    """Test binary-searching indented, sorted arrays and objects."""
+    from rotary_phone.jsonstream import seek_sorted
+    entries = [{'timestamp': f"2024-01-01T00:00:{i // 3:02d}", 'n': i} for i in range(30)]
+    path = tmp_path / "array.json"
+    path.write_text(json.dumps(entries, indent=2))
+    for start in ["", "2024-01-01T00:00:04", "2024-01-01T00:00:04.5", "2024-01-01T00:00:10"]:
+        offset = seek_sorted(path, lambda entry: entry['timestamp'] < start, chunk_size=chunk_size)
+        assert list(iter_json_array(path, offset=offset)) == [e for e in entries if e['timestamp'] >= start]
+
+    contacts = {f"Name {i:02d}": "555-0100" for i in range(20)}
+    path.write_text(json.dumps(contacts, indent=2, sort_keys=True))
+    for after in ["", "Name 05", "Name 055", "Zed"]:
+        offset = seek_sorted(path, lambda name: name <= after, chunk_size=chunk_size)
+        assert list(iter_json_object(path, offset=offset)) == [(k, v) for k, v in contacts.items() if k > after]
+
+
+def test_seek_sorted_needs_indented_layout(tmp_path):
+    """Test that compact and empty files are left to a full read."""
+    from rotary_phone.jsonstream import seek_sorted
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps([{'a': 1}, {'a': 2}]))
+    assert seek_sorted(path, lambda entry: True) is None
+    path.write_text("[]")
+    assert seek_sorted(path, lambda entry: True) is None
@@ -0,0 +1,84 @@
+"""Tests for synthetic workload generation."""
+
+import json
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from rotary_phone.config import set_config_value
+from rotary_phone.contacts import load_contacts
+from rotary_phone.history import load_history
+from rotary_phone.loadgen import (
+    build_number_pool, generate_contacts, generate_history, generate_workload
+)
+from rotary_phone.utils import validate_number
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    return config_dir
+
+
+def test_contacts_are_valid_and_reproducible():
+    """Test that generated contacts are unique, valid and seed-stable."""
+    contacts = generate_contacts(300, seed=7)
+    assert len(contacts) == 300
+    assert all(validate_number(number) for number in contacts.values())
+    assert generate_contacts(300, seed=7) == contacts
+    assert generate_contacts(300, seed=8) != contacts
+
+
+def test_history_is_skewed_and_ordered():
+    """Test that calls are in time order and favour early numbers."""
+    pool = [f"555000{i:04d}" for i in range(50)]
+    history = generate_history(5000, pool, days=5, start=datetime(2024, 1, 1), seed=1)
+    assert len(history) == 5000
+    timestamps = [entry['timestamp'] for entry in history]
+    assert timestamps == sorted(timestamps)
+    assert timestamps[0] >= "2024-01-01" and timestamps[-1] < "2024-01-06"
+
+    counts = Counter(entry['number'] for entry in history)
+    assert counts[pool[0]] > counts[pool[-1]] * 5
+
+    hours = Counter(datetime.fromisoformat(t).hour for t in timestamps)
+    assert hours[11] > hours[3] * 5
+
+
+def test_direct_output_matches_save_history_format(tmp_path):
+    """Test that parallel direct output equals the in-memory result."""
+    pool = build_number_pool(generate_contacts(20, seed=2), extra=5, seed=2)
+    start = datetime(2024, 2, 1)
+    history = generate_history(400, pool, days=4, start=start, seed=3)
+    output = tmp_path / "history.json"
+    assert generate_history(400, pool, days=4, start=start, seed=3, workers=2, output_file=output) == []
+    assert output.read_text() == json.dumps(history, indent=2)
+
+
+def test_generate_workload_writes_store(temp_config):
+    """Test writing a workload through the regular save paths."""
+    set_config_value('enable_change_feed', True)
+    result = generate_workload(50, 200, days=2, seed=4)
+    assert result == {'contacts': 50, 'calls': 200}
+    assert len(load_contacts()) == 50
+    assert len(load_history()) == 200
+
+    from rotary_phone.changefeed import changes_since, last_seq
+    seq = last_seq()
+    generate_workload(10, 30, days=2, seed=4, direct=True)
+    assert len(load_history()) == 30
+    # Feed consumers learn that history was rewritten
+    assert {'kind': 'history', 'op': 'replace'} in [
+        {'kind': r['kind'], 'op': r['op']} for r in changes_since(seq)]
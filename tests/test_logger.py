@@ -0,0 +1,109 @@
+"""Tests for logging setup."""
+
+import json
+import logging
+
+import pytest
+
+from rotary_phone.config import set_config_value
+from rotary_phone.logger import SamplingFilter, setup_logger, shutdown_logging
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    # Start from a fresh writer thread that picks up this config
+    shutdown_logging()
+    yield config_dir
+    shutdown_logging()
+
+
+def _read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_async_logger_writes_json_lines(temp_config):
+    """Test that queued records reach the JSON-lines file on shutdown."""
+    log_file = temp_config / "rotary_phone.log"
+    set_config_value('log_file', str(log_file))
+    logger = setup_logger("rp_test_async", level=logging.DEBUG)
+
+    assert any(isinstance(h, logging.handlers.QueueHandler) for h in logger.handlers)
+    logger.info("Dialing %s...", "555-1234")
+    shutdown_logging()
+
+    records = _read_lines(log_file)
+    assert records[0]['message'] == "Dialing 555-1234..."
+    assert records[0]['level'] == "INFO"
+    assert records[0]['logger'] == "rp_test_async"
+
+
+def test_arguments_are_not_formatted_below_level(temp_config):
+    """Test that filtered records never format their arguments."""
+    formatted = []
+
+    class Tracked:
+        def __str__(self):
+            formatted.append(True)
+            return "tracked"
+
+    logger = setup_logger("rp_test_lazy", level=logging.INFO)
+    logger.debug("Value %s", Tracked())
+    shutdown_logging()
+    assert formatted == []
+
+
+def test_sync_logger_rotates_file(temp_config):
+    """Test size-based rotation of the JSON-lines file."""
+    log_file = temp_config / "rotary_phone.log"
+    set_config_value('log_async', False)
+    set_config_value('log_file', str(log_file))
+    set_config_value('log_file_max_bytes', 500)
+    set_config_value('log_file_backups', 2)
+    logger = setup_logger("rp_test_rotate")
+
+    assert not any(isinstance(h, logging.handlers.QueueHandler) for h in logger.handlers)
+    for i in range(50):
+        logger.info("Call %d", i)
+    shutdown_logging()
+
+    assert log_file.with_name("rotary_phone.log.1").exists()
+    assert not log_file.with_name("rotary_phone.log.3").exists()
+    assert _read_lines(log_file)[-1]['message'] == "Call 49"
+
+
+def test_debug_sampling(temp_config):
+    """Test that only the configured fraction of debug records is kept."""
+    log_file = temp_config / "rotary_phone.log"
+    set_config_value('log_file', str(log_file))
+    set_config_value('log_debug_sample_rate', 0.25)
+    logger = setup_logger("rp_test_sampling", level=logging.DEBUG)
+
+    for i in range(100):
+        logger.debug("Digit %d", i)
+    logger.warning("Kept")
+    shutdown_logging()
+
+    messages = [record['message'] for record in _read_lines(log_file)]
+    assert len(messages) == 26
+    assert messages[-1] == "Kept"
+
+
+def test_sampling_filter_passes_higher_levels():
+    """Test that the sampling filter only drops debug records."""
+    sampler = SamplingFilter(0.0)
+    debug = logging.LogRecord("x", logging.DEBUG, __file__, 1, "msg", None, None)
+    info = logging.LogRecord("x", logging.INFO, __file__, 1, "msg", None, None)
+    assert not sampler.filter(debug)
+    assert sampler.filter(info)
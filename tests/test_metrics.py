@@ -0,0 +1,86 @@
+"""Tests for instrumentation and metrics export."""
+
+import pytest
+
+from rotary_phone import metrics
+from rotary_phone.history import add_to_history, load_history
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    return config_dir
+
+
+@pytest.fixture
+def collecting():
+    """Enable metric collection for one test."""
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.enable(False)
+    metrics.reset()
+
+
+def test_disabled_records_nothing():
+    """Test that nothing is recorded while metrics are disabled."""
+    metrics.reset()
+    with metrics.timed('noop'):
+        pass
+    metrics.incr('noop')
+    assert metrics.snapshot() == {'counters': {}, 'timers': {}}
+
+
+def test_store_operations_are_timed(temp_config, collecting):
+    """Test that history loads and saves are recorded."""
+    from rotary_phone.storage import JsonFileBackend, use_backend
+    with use_backend(JsonFileBackend()):
+        add_to_history("5551234", "555-1234")
+        load_history()
+    timers = metrics.snapshot()['timers']
+    assert timers['history.save']['count'] == 1
+    assert timers['history.load']['count'] >= 1
+    assert timers['json.parse']['count'] >= 1
+
+
+def test_instrument_decorator(collecting):
+    """Test that decorated functions are timed and still return values."""
+    @metrics.instrument('test.func')
+    def func(x):
+        return x * 2
+
+    assert func(21) == 42
+    assert metrics.snapshot()['timers']['test.func']['count'] == 1
+
+
+def test_prometheus_format(collecting, tmp_path):
+    """Test Prometheus text export."""
+    metrics.incr('dial.calls', 3)
+    metrics.record('history.load', 0.5)
+    output = tmp_path / "metrics.prom"
+    metrics.export_prometheus(output)
+    text = output.read_text()
+    assert '# TYPE rotary_phone_operation_seconds_total counter' in text
+    assert 'rotary_phone_operation_seconds_total{operation="history.load"} 0.5' in text
+    assert 'rotary_phone_events_total{name="dial.calls"} 3' in text
+
+
+def test_save_metrics_accumulates(temp_config, collecting):
+    """Test that saved metrics are merged across runs."""
+    metrics.incr('dial.calls')
+    metrics.save_metrics()
+    metrics.save_metrics()
+    assert metrics.load_metrics()['counters']['dial.calls'] == 2
+    metrics.clear_metrics()
+    assert metrics.load_metrics()['counters'] == {}
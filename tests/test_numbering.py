@@ -0,0 +1,95 @@
+"""Tests for international numbering plans."""
+
+import pytest
+
+from rotary_phone.numbering import NumberingPlan, classify_numbers, get_numbering_plan, parse_number
+from rotary_phone.utils import extract_country_code, format_number, validate_number
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    return config_dir
+
+
+def test_parse_international_numbers(temp_config):
+    """Test E.164 parsing, types and formats across regions."""
+    info = parse_number("+44 20 7946 0958")
+    assert info['valid'] is True
+    assert info['region'] == "GB"
+    assert info['e164'] == "+442079460958"
+    assert info['international'] == "+44 20 7946 0958"
+    assert info['national'] == "020 7946 0958"
+
+    mobile = parse_number("+33612345678")
+    assert mobile['type'] == "mobile"
+    assert mobile['international'] == "+33 6 12 34 56 78"
+
+    assert parse_number("+1 800 555 0100")['type'] == "toll_free"
+    assert parse_number("+44 (0)20 7946 0958")['e164'] == "+442079460958"
+
+
+def test_parse_invalid_numbers(temp_config):
+    """Test unknown country codes and bad lengths."""
+    unknown = parse_number("+999 1234567")
+    assert unknown['valid'] is False
+    assert unknown['region'] is None
+
+    short = parse_number("+44 20 7946")
+    assert short['valid'] is False
+    assert short['region'] == "GB"
+    assert short['e164'] is None
+
+
+def test_national_numbers_use_region(temp_config):
+    """Test that numbers without + are parsed in the given or default region."""
+    assert parse_number("020 7946 0958", region="GB")['e164'] == "+442079460958"
+    assert parse_number("(555) 123-4567")['e164'] == "+15551234567"
+    assert parse_number("1-555-123-4567")['national'] == "(555) 123-4567"
+
+    from rotary_phone.config import set_config_value
+    set_config_value('default_region', 'FR')
+    assert parse_number("06 12 34 56 78")['e164'] == "+33612345678"
+
+
+def test_utils_use_numbering_plan(temp_config):
+    """Test validate_number, format_number and extract_country_code with + numbers."""
+    assert validate_number("+49 30 12345678") is True
+    assert validate_number("+49 30") is False
+    assert format_number("+4930 12345678") == "+49 30 12345678"
+    assert extract_country_code("+33 6 12 34 56 78") == ("33", "612345678")
+    # National numbers keep their existing behaviour
+    assert format_number("5551234567") == "(555) 123-4567"
+    assert validate_number("555-1234") is True
+
+
+def test_classify_numbers_in_bulk(temp_config):
+    """Test that bulk classification keeps order and matches single parsing."""
+    numbers = ["+447911123456", "5551234567", "+999", "+447911123456"]
+    results = classify_numbers(numbers)
+    assert [r['valid'] for r in results] == [True, True, False, True]
+    assert [r['region'] for r in results] == ["GB", "US", None, "GB"]
+    assert results[0] == parse_number("+447911123456")
+
+
+def test_longest_prefix_rule_wins():
+    """Test that deeper trie rules override shallower ones only when lengths fit."""
+    plan = NumberingPlan({'regions': {'XX': {
+        'country_code': '99', 'lengths': [6], 'groups': [3, 3],
+        'rules': [{'prefix': '12', 'type': 'special', 'lengths': [8], 'groups': [2, 6]}],
+    }}})
+    assert plan.parse("+9912345678")['type'] == "special"
+    assert plan.parse("+9912345678")['international'] == "+99 12 345678"
+    assert plan.parse("+99123456")['type'] == "unknown"
+    assert get_numbering_plan() is get_numbering_plan()
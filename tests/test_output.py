@@ -0,0 +1,45 @@
+"""Tests for buffered record output."""
+
+import io
+
+import pytest
+
+from rotary_phone.output import RecordWriter
+
+RECORDS = [
+    {'name': 'Alice', 'number': '555-0100'},
+    {'name': 'Bob, Jr.', 'number': '555-0200'},
+]
+
+
+def test_jsonl_output():
+    """Test JSON lines output."""
+    stream = io.StringIO()
+    assert RecordWriter(stream, 'jsonl', ['name', 'number']).write_records(RECORDS) == 2
+    assert stream.getvalue() == (
+        '{"name": "Alice", "number": "555-0100"}\n'
+        '{"name": "Bob, Jr.", "number": "555-0200"}\n'
+    )
+
+
+def test_csv_output():
+    """Test CSV output with header and quoting."""
+    stream = io.StringIO()
+    RecordWriter(stream, 'csv', ['name', 'number']).write_records(RECORDS)
+    assert stream.getvalue() == 'name,number\nAlice,555-0100\n"Bob, Jr.",555-0200\n'
+
+
+def test_table_output_is_buffered():
+    """Test that rows are written in blocks rather than one by one."""
+    stream = io.StringIO()
+    writer = RecordWriter(stream, 'table', ['name'], lambda r: f"  {r['name']}", buffer_size=1 << 20)
+    writer.write_record(RECORDS[0])
+    assert stream.getvalue() == ""
+    writer.flush()
+    assert stream.getvalue() == "  Alice\n"
+
+
+def test_unknown_format():
+    """Test that unknown formats are rejected."""
+    with pytest.raises(ValueError):
+        RecordWriter(io.StringIO(), 'xml', ['name'])
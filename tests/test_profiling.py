@@ -0,0 +1,60 @@
+"""Tests for the profiling hooks."""
+
+import io
+import pstats
+
+import pytest
+
+from rotary_phone import profiling
+from rotary_phone.profiling import Profiler, install_from_env, profile
+
+
+def busy_function():
+    return sum(i * i for i in range(20000))
+
+
+def test_cpu_profile_writes_pstats(tmp_path):
+    """Test that CPU mode writes a loadable pstats file and a summary."""
+    output = tmp_path / "run.pstats"
+    stream = io.StringIO()
+    with profile('cpu', output=output, top=10, stream=stream):
+        busy_function()
+    assert "busy_function" in stream.getvalue()
+    stats = pstats.Stats(str(output))
+    assert any(func[2] == "busy_function" for func in stats.stats)
+    assert not profiling.is_active()
+
+
+def test_mem_profile_reports_peak_and_sites():
+    """Test that memory mode reports the peak and allocation sites."""
+    stream = io.StringIO()
+    with profile('mem', top=3, stream=stream):
+        data = [bytearray(1024) for _ in range(2000)]
+    del data
+    report = stream.getvalue()
+    assert "peak" in report
+    assert "MiB" in report
+    assert "test_profiling.py" in report
+
+
+def test_invalid_mode():
+    """Test that unknown modes are rejected."""
+    with pytest.raises(ValueError):
+        Profiler('disk')
+
+
+def test_install_from_env(monkeypatch, tmp_path):
+    """Test that RP_PROFILE starts a process-wide profiler."""
+    monkeypatch.setattr(profiling.atexit, "register", lambda func: None)
+    monkeypatch.setenv(profiling.PROFILE_ENV_VAR, "cpu")
+    monkeypatch.setenv(profiling.OUTPUT_ENV_VAR, str(tmp_path / "env.pstats"))
+    profiler = install_from_env()
+    assert profiler is not None and profiling.is_active()
+    busy_function()
+    profiler.stream = io.StringIO()
+    profiler.stop()
+    assert (tmp_path / "env.pstats").exists()
+
+    monkeypatch.setenv(profiling.PROFILE_ENV_VAR, "bogus")
+    with pytest.warns(UserWarning):
+        assert install_from_env() is None
@@ -0,0 +1,127 @@
+"""Tests for indexed history queries."""
+
+import pytest
+
+from rotary_phone.config import set_config_value
+from rotary_phone.contacts import add_contact
+from rotary_phone.history import add_to_history, save_history
+from rotary_phone.query import HistoryIndex, query_history
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+    
+    from rotary_phone import config
+    
+    def mock_get_config_dir():
+        return config_dir
+    
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+    
+    return config_dir
+
+
+@pytest.fixture
+def sample_history(temp_config):
+    """Store a small history spanning three days."""
+    history = [
+        {'number': '555-1111', 'formatted': '(555) 111-1111', 'timestamp': '2024-01-01T09:00:00'},
+        {'number': '5552222', 'formatted': '(555) 222-2222', 'timestamp': '2024-01-01T10:00:00'},
+        {'number': '555 1111', 'formatted': '(555) 111-1111', 'timestamp': '2024-01-02T11:00:00'},
+        {'number': '555-3333', 'formatted': '(555) 333-3333', 'timestamp': '2024-01-03T12:00:00'},
+        {'number': '5551111', 'formatted': '(555) 111-1111', 'timestamp': '2024-01-03T13:00:00'},
+    ]
+    save_history(history)
+    return history
+
+
+def test_query_by_number_matches_normalized(sample_history):
+    """Test that number queries match any formatting of the number."""
+    results = query_history(number="555 11-11")
+    assert [entry['timestamp'] for entry in results] == [
+        '2024-01-03T13:00:00', '2024-01-02T11:00:00', '2024-01-01T09:00:00',
+    ]
+
+
+def test_query_time_range_and_order(sample_history):
+    """Test since/until bounds, whole-day until and ascending order."""
+    results = query_history(since="2024-01-01T10:00:00", until="2024-01-02", order='asc')
+    assert [entry['timestamp'] for entry in results] == [
+        '2024-01-01T10:00:00', '2024-01-02T11:00:00',
+    ]
+
+
+def test_query_combined_filters_and_limit(sample_history):
+    """Test number plus time range with a limit."""
+    results = query_history(number="5551111", since="2024-01-02", limit=1)
+    assert len(results) == 1
+    assert results[0]['timestamp'] == '2024-01-03T13:00:00'
+
+
+def test_query_by_contact(sample_history):
+    """Test querying by one or several contact names."""
+    add_contact("Alice", "555-1111")
+    add_contact("Bob", "555-3333")
+    assert len(query_history(contact="Alice")) == 3
+    assert len(query_history(contact=["Alice", "Bob"])) == 4
+    assert query_history(contact="Nobody") == []
+    assert query_history(contact="Bob", number="555-1111") == []
+
+
+def test_query_sees_new_history(sample_history):
+    """Test that the index is rebuilt when history changes."""
+    assert len(query_history(number="555-4444")) == 0
+    save_history(sample_history + [
+        {'number': '555-4444', 'formatted': '(555) 444-4444', 'timestamp': '2024-01-04T08:00:00'},
+    ])
+    assert len(query_history(number="555-4444")) == 1
+
+
+def test_index_catches_up_without_reloading_history(sample_history, monkeypatch):
+    """Test that calls made after the index was built are applied from the change feed."""
+    from rotary_phone.storage import get_backend
+    set_config_value('enable_change_feed', True)
+    set_config_value('history_limit', 5)
+    assert len(query_history()) == 5
+    add_to_history("5554444", "(555) 444-4444")
+
+    def load_history():
+        raise AssertionError("history was reloaded")
+
+    monkeypatch.setattr(get_backend(), "load_history", load_history)
+    results = query_history(order='asc')
+    assert [entry['number'] for entry in results] == ['5552222', '555 1111', '555-3333', '5551111', '5554444']
+    assert len(query_history(number="555-1111")) == 2
+
+
+def test_repeat_calls_are_all_counted(sample_history):
+    """Test that calls with the same number and timestamp are not merged."""
+    from datetime import datetime
+    from rotary_phone.clock import VirtualClock, use_clock
+    assert query_history(number="555-4444") == []
+    with use_clock(VirtualClock(datetime(2024, 1, 4, 8, 0))):
+        add_to_history("5554444", "(555) 444-4444")
+        add_to_history("5554444", "(555) 444-4444")
+    assert len(query_history(number="555-4444")) == 2
+
+
+def test_query_invalid_arguments(sample_history):
+    """Test that invalid bounds and order raise ValueError."""
+    with pytest.raises(ValueError):
+        query_history(since="yesterday")
+    with pytest.raises(ValueError):
+        query_history(order="sideways")
+
+
+def test_history_index_out_of_order_entries():
+    """Test that the timestamp index sorts entries stored out of order."""
+    index = HistoryIndex([
+        {'number': '1', 'timestamp': '2024-01-02T00:00:00'},
+        {'number': '2', 'timestamp': '2024-01-01T00:00:00'},
+    ])
+    assert index.positions_in_range(None, None) == [1, 0]
+    assert index.positions_in_range('2024-01-02', None) == [0]
@@ -0,0 +1,184 @@
+"""Tests for replication between hosts."""
+
+import os
+
+import pytest
+
+from rotary_phone.config import set_config_value
+from rotary_phone.contacts import add_contact, delete_contact, load_contacts, update_contact
+from rotary_phone.exceptions import ReplicationError
+from rotary_phone.history import add_to_history, load_history
+from rotary_phone.replication import get_replica_state, init_replica, sync
+from rotary_phone.storage import create_backend, use_backend
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    return config_dir
+
+
+@pytest.fixture
+def replicas(temp_config, tmp_path):
+    """Create three replicas, each with its own data directory."""
+    name = os.environ.get('ROTARY_PHONE_BACKEND', 'json')
+    backends = {}
+    for host in ('host-a', 'host-b', 'host-c'):
+        backends[host] = create_backend(name, tmp_path / host)
+        with use_backend(backends[host]):
+            set_config_value('enable_change_feed', True)
+            init_replica(host)
+    return backends
+
+
+def _sync(backend, shared):
+    with use_backend(backend):
+        return sync(shared)
+
+
+def _state(backend):
+    with use_backend(backend):
+        return load_contacts(), load_history()
+
+
+def test_replicas_converge(replicas, tmp_path):
+    """Test that contacts and history written on different hosts converge."""
+    shared = tmp_path / "shared"
+    a, b, c = replicas.values()
+    with use_backend(a):
+        add_contact("Alice", "555-1111")
+        add_to_history("5550001", "555-0001")
+    with use_backend(b):
+        add_contact("Bob", "555-2222")
+        add_to_history("5550002", "555-0002")
+    with use_backend(a):
+        add_to_history("5550003", "555-0003")
+
+    assert _sync(a, shared)['published'] == 3
+    _sync(b, shared)
+    _sync(c, shared)
+    _sync(a, shared)
+
+    contacts, history = _state(a)
+    assert contacts == {"Alice": "555-1111", "Bob": "555-2222"}
+    assert [e['number'] for e in history] == ["5550001", "5550002", "5550003"]
+    assert _state(b) == (contacts, history)
+    assert _state(c) == (contacts, history)
+
+
+def test_sync_exchanges_only_deltas(replicas, tmp_path):
+    """Test that a sync publishes and applies only what is new."""
+    shared = tmp_path / "shared"
+    a, b, _ = replicas.values()
+    with use_backend(a):
+        add_contact("Alice", "555-1111")
+    _sync(a, shared)
+    assert _sync(b, shared)['received'] == 1
+
+    # Applied changes are not published back, nor received again
+    assert _sync(b, shared)['published'] == 0
+    assert _sync(a, shared) == {'host': 'host-a', 'published': 0, 'received': 0,
+                                'contacts_changed': 0, 'history_added': 0}
+
+    with use_backend(a):
+        add_to_history("5550001", "555-0001")
+    assert _sync(a, shared)['published'] == 1
+    stats = _sync(b, shared)
+    assert stats['received'] == 1
+    assert stats['history_added'] == 1
+    with use_backend(b):
+        assert get_replica_state()['vector'] == {'host-a': 2}
+
+
+def test_concurrent_updates_last_writer_wins(replicas, tmp_path):
+    """Test that concurrent updates of one contact resolve the same everywhere."""
+    shared = tmp_path / "shared"
+    a, b, _ = replicas.values()
+    with use_backend(a):
+        add_contact("Carol", "555-1111")
+    _sync(a, shared)
+    _sync(b, shared)
+
+    with use_backend(a):
+        update_contact("Carol", "555-3333")
+    with use_backend(b):
+        update_contact("Carol", "555-4444")
+    _sync(a, shared)
+    _sync(b, shared)
+    _sync(a, shared)
+
+    # Same Lamport time: the higher host ID wins
+    assert _state(a)[0] == _state(b)[0] == {"Carol": "555-4444"}
+
+    # A write made after seeing the other host's change wins
+    with use_backend(a):
+        update_contact("Carol", "555-5555")
+    _sync(a, shared)
+    _sync(b, shared)
+    assert _state(b)[0] == {"Carol": "555-5555"}
+
+
+def test_deletes_replicate_as_tombstones(replicas, tmp_path):
+    """Test that a delete wins over an older update that arrives later."""
+    shared = tmp_path / "shared"
+    a, b, c = replicas.values()
+    with use_backend(c):
+        add_contact("Dave", "555-1111")
+    _sync(c, shared)
+    _sync(a, shared)
+    with use_backend(c):
+        update_contact("Dave", "555-2222")
+    with use_backend(a):
+        add_contact("Erin", "555-3333")
+        delete_contact("Dave")
+    _sync(a, shared)
+
+    # b sees a's delete first, then c's older update
+    _sync(b, shared)
+    _sync(c, shared)
+    _sync(b, shared)
+    _sync(a, shared)
+    assert _state(a)[0] == _state(b)[0] == _state(c)[0] == {"Erin": "555-3333"}
+
+
+def test_sync_requires_shared_directory(replicas):
+    """Test the errors for missing configuration."""
+    with use_backend(replicas['host-a']):
+        with pytest.raises(ReplicationError):
+            sync()
+        with pytest.raises(ReplicationError):
+            init_replica("host-z")
+
+
+def test_change_during_sync_is_published_later(replicas, tmp_path, monkeypatch):
+    """Test that a call recorded while a sync reads the feed is not skipped."""
+    from rotary_phone import changefeed
+    shared = tmp_path / "shared"
+    a, b, _ = replicas.values()
+    _sync(a, shared)
+
+    read_changes = changefeed.changes_since
+
+    def racing_changes_since(seq=0, limit=None):
+        records = read_changes(seq, limit)
+        monkeypatch.setattr(changefeed, "changes_since", read_changes)
+        add_to_history("5550001", "555-0001")
+        return records
+
+    monkeypatch.setattr(changefeed, "changes_since", racing_changes_since)
+    with use_backend(a):
+        assert sync(shared)['published'] == 0
+        assert sync(shared)['published'] == 1
+    _sync(b, shared)
+    assert [e['number'] for e in _state(b)[1]] == ["5550001"]
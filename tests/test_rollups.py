@@ -0,0 +1,121 @@
+"""Tests for materialized call-count rollups."""
+
+from datetime import datetime
+
+import pytest
+
+from rotary_phone.clock import VirtualClock, use_clock
+from rotary_phone.config import set_config_value
+from rotary_phone.history import add_to_history, clear_history, save_history
+from rotary_phone.rollups import (
+    compact, get_daily_counts, get_hourly_counts, load_rollups, rebuild_rollups
+)
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    set_config_value('enable_rollups', True)
+
+    return config_dir
+
+
+def _entry(number, timestamp):
+    return {'number': number, 'formatted': number, 'timestamp': timestamp}
+
+
+def test_add_to_history_updates_rollups(temp_config):
+    """Test that dialing counts calls and the counts survive clear_history."""
+    clock = VirtualClock(datetime(2024, 5, 1, 9, 15))
+    with use_clock(clock):
+        add_to_history("5551234", "555-1234")
+        add_to_history("5551234", "555-1234")
+        clock.set(datetime(2024, 5, 2, 14, 0))
+        add_to_history("5559999", "555-9999")
+    clear_history()
+
+    assert get_daily_counts() == {'2024-05-01': 2, '2024-05-02': 1}
+    assert get_hourly_counts() == {9: 2, 14: 1}
+    assert get_daily_counts(number="555-1234") == {'2024-05-01': 2}
+    assert get_daily_counts(since="2024-05-02") == {'2024-05-02': 1}
+
+
+def test_until_date_covers_the_whole_day(temp_config):
+    """Test that a bare date as the upper bound includes calls during that day."""
+    with use_clock(VirtualClock(datetime(2024, 5, 1, 9, 15))):
+        add_to_history("5551234", "555-1234")
+    with use_clock(VirtualClock(datetime(2024, 5, 2, 14, 0))):
+        add_to_history("5559999", "555-9999")
+
+    assert get_daily_counts(until="2024-05-01") == {'2024-05-01': 1}
+    assert get_hourly_counts(until="2024-05-01") == {9: 1}
+    assert get_daily_counts(until="2024-05-02") == {'2024-05-01': 1, '2024-05-02': 1}
+    assert get_hourly_counts(until="2024-05-02T13:59:59") == {9: 1}
+
+
+def test_loaded_rollups_are_a_copy(temp_config):
+    """Test that modifying loaded tables does not change later results."""
+    set_config_value('rollup_flush_batch', 2)
+    with use_clock(VirtualClock(datetime(2024, 5, 1, 9, 15))):
+        add_to_history("5551234", "555-1234")
+        add_to_history("5551234", "555-1234")
+        add_to_history("5559999", "555-9999")
+    rollups = load_rollups()
+    rollups['minute'].clear()
+    assert get_daily_counts() == {'2024-05-01': 3}
+    assert load_rollups()['minute'] == {'2024-05-01T09:15': {'5551234': 2, '5559999': 1}}
+
+
+def test_calls_are_folded_in_batches(temp_config):
+    """Test that recording calls leaves the tables alone until a batch builds up."""
+    from rotary_phone.storage import get_backend
+    set_config_value('rollup_flush_batch', 3)
+    with use_clock(VirtualClock(datetime(2024, 5, 1, 9, 15))):
+        add_to_history("5551234", "555-1234")
+        add_to_history("5551234", "555-1234")
+        assert not get_backend().has_document('rollups')
+        assert get_daily_counts() == {'2024-05-01': 2}
+
+        add_to_history("5559999", "555-9999")
+    assert get_backend().has_document('rollups')
+    assert not get_backend().has_document('rollups_pending')
+    assert get_daily_counts() == {'2024-05-01': 3}
+
+
+def test_compaction_folds_tiers(temp_config):
+    """Test that old buckets move to coarser tiers without losing counts."""
+    save_history([
+        _entry("5551111", "2024-01-01T10:05:00"),
+        _entry("5551111", "2024-01-01T10:45:00"),
+        _entry("5552222", "2024-06-01T08:30:00"),
+        _entry("5552222", "2024-06-30T23:59:00"),
+    ])
+    with use_clock(VirtualClock(datetime(2024, 7, 1))):
+        assert rebuild_rollups() == 4
+
+    rollups = load_rollups()
+    assert rollups['day'] == {'2024-01-01': {'5551111': 2}}
+    assert rollups['hour'] == {'2024-06-01T08': {'5552222': 1}}
+    assert rollups['minute'] == {'2024-06-30T23:59': {'5552222': 1}}
+    assert sum(get_daily_counts().values()) == 4
+    # Day-tier calls have no hour information
+    assert get_hourly_counts() == {8: 1, 23: 1}
+
+
+def test_compaction_runs_once_per_hour(temp_config):
+    """Test that compaction is skipped within the same hour."""
+    rollups = {'minute': {}, 'hour': {}, 'day': {}, 'compacted_through': ''}
+    now = datetime(2024, 7, 1, 12, 30)
+    assert compact(rollups, now) is True
+    assert compact(rollups, now) is False
@@ -0,0 +1,127 @@
+"""Tests for the multi-line dial scheduler."""
+
+import threading
+
+import pytest
+
+from rotary_phone.exceptions import QueueFullError
+from rotary_phone.clock import VirtualClock
+from rotary_phone.scheduler import DialScheduler, TokenBucket, load_batch_file
+
+
+def test_token_bucket_spaces_calls():
+    """Test that the bucket allows a burst and then one call per 1/rate."""
+    clock = VirtualClock()
+    bucket = TokenBucket(rate=2, capacity=1, clock=clock)
+    assert [bucket.acquire() for _ in range(4)] == [0.0, 0.5, 1.0, 1.5]
+    assert clock.monotonic() == 1.5
+
+
+def test_priority_order_and_latency():
+    """Test that a single line dials by priority at the capped rate."""
+    clock = VirtualClock()
+    dialed = []
+
+    def fake_dial(number):
+        dialed.append(number)
+        clock.advance(0.25)
+
+    scheduler = DialScheduler(lines=1, rate=1, burst=1, clock=clock, dial_func=fake_dial)
+    scheduler.submit("5550003", priority=3)
+    scheduler.submit("5550001", priority=1)
+    scheduler.submit("5550002", priority=1)
+    scheduler.start()
+    scheduler.close()
+
+    assert dialed == ["5550001", "5550002", "5550003"]
+    stats = scheduler.stats()
+    assert stats['calls'] == 3
+    assert stats['elapsed'] == pytest.approx(2.25)
+    assert stats['queue_latency']['max'] == pytest.approx(2.0)
+    assert stats['queue_latency']['avg'] == pytest.approx(1.0)
+    assert stats['lines'][0]['utilization'] == pytest.approx(0.75 / 2.25)
+
+
+def test_multiple_lines_dial_everything():
+    """Test that all calls are dialed and accounted to some line."""
+    calls = [f"555{i:04d}" for i in range(20)]
+    dialed = []
+    lock = threading.Lock()
+
+    def fake_dial(number):
+        with lock:
+            dialed.append(number)
+
+    scheduler = DialScheduler(lines=4, clock=VirtualClock(), dial_func=fake_dial)
+    stats = scheduler.run(calls)
+    assert sorted(dialed) == calls
+    assert stats['calls'] == 20
+    assert sum(line['calls'] for line in stats['lines']) == 20
+
+
+def test_lines_overlap_in_simulated_time():
+    """Test that each line keeps its own time under a virtual clock."""
+    clock = VirtualClock()
+
+    def fake_dial(number):
+        clock.sleep(1)
+
+    scheduler = DialScheduler(lines=4, clock=clock, dial_func=fake_dial)
+    stats = scheduler.run([f"555{i:04d}" for i in range(8)])
+    assert stats['elapsed'] == pytest.approx(2.0)
+    assert [line['calls'] for line in stats['lines']] == [2, 2, 2, 2]
+    assert [line['utilization'] for line in stats['lines']] == pytest.approx([1.0] * 4)
+    assert clock.monotonic() == pytest.approx(2.0)
+
+
+def test_simulated_backpressure_dispatches_calls():
+    """Test that a blocking submit on a full queue lets a line take a call."""
+    clock = VirtualClock()
+
+    def fake_dial(number):
+        clock.sleep(1)
+
+    scheduler = DialScheduler(lines=2, max_queue=2, clock=clock, dial_func=fake_dial)
+    stats = scheduler.run([f"555{i:04d}" for i in range(6)])
+    assert stats['calls'] == 6
+    assert stats['elapsed'] == pytest.approx(3.0)
+    assert [line['calls'] for line in stats['lines']] == [3, 3]
+
+
+def test_backpressure_when_queue_full():
+    """Test that a full queue rejects non-blocking submits."""
+    scheduler = DialScheduler(lines=1, max_queue=2, clock=VirtualClock(), dial_func=lambda n: None)
+    scheduler.submit("5550001")
+    scheduler.submit("5550002")
+    with pytest.raises(QueueFullError):
+        scheduler.submit("5550003", block=False)
+    with pytest.raises(QueueFullError):
+        scheduler.submit("5550003", timeout=0.01)
+
+
+def test_failed_calls_are_recorded():
+    """Test that invalid numbers are reported as failures."""
+    scheduler = DialScheduler(lines=2, clock=VirtualClock(), dial_func=lambda n: int(n))
+    stats = scheduler.run(["5551234", "bad"])
+    assert stats['failed'] == 1
+
+
+def test_unexpected_errors_keep_the_line_running():
+    """Test that an unexpected exception fails only its own call."""
+    def flaky_dial(number):
+        if number == "5550001":
+            raise OSError("disk full")
+
+    scheduler = DialScheduler(lines=1, clock=VirtualClock(), dial_func=flaky_dial)
+    stats = scheduler.run(["5550001", "5550002", "5550003"])
+    assert stats['calls'] == 3
+    assert stats['failed'] == 1
+    errors = {r['number']: r['error'] for r in scheduler.results()}
+    assert errors == {"5550001": "OSError: disk full", "5550002": None, "5550003": None}
+
+
+def test_load_batch_file(tmp_path):
+    """Test parsing a batch file with priorities and comments."""
+    batch = tmp_path / "calls.txt"
+    batch.write_text("555-1234\n# skip\n\n555-9876, 2\n")
+    assert load_batch_file(batch) == [("555-1234", 0), ("555-9876", 2)]
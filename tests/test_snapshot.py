@@ -0,0 +1,135 @@
+"""Tests for snapshot-consistent reads."""
+
+import json
+import threading
+
+import pytest
+
+from rotary_phone.config import set_config_value
+from rotary_phone.contacts import add_contact, load_contacts
+from rotary_phone.export import export_data
+from rotary_phone.history import add_to_history, load_history
+from rotary_phone.snapshot import get_generation, read_snapshot, take_snapshot, write_transaction
+from rotary_phone.stats import get_dial_stats
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    return config_dir
+
+
+def test_snapshot_ignores_later_writes(temp_config):
+    """Test that reads inside a snapshot do not see writes made after it."""
+    add_contact("Alice", "555-1111")
+    add_to_history("5551111", "555-1111")
+
+    with read_snapshot():
+        add_contact("Bob", "555-2222")
+        add_to_history("5552222", "555-2222")
+        assert list(load_contacts()) == ["Alice"]
+        assert len(load_history()) == 1
+        assert get_dial_stats()['total_calls'] == 1
+
+    # The writes went to the live store
+    assert set(load_contacts()) == {"Alice", "Bob"}
+    assert len(load_history()) == 2
+
+
+def test_snapshot_is_per_thread(temp_config):
+    """Test that other threads keep reading live data."""
+    add_contact("Alice", "555-1111")
+    seen = []
+
+    with read_snapshot():
+        add_contact("Bob", "555-2222")
+        thread = threading.Thread(target=lambda: seen.append(load_contacts()))
+        thread.start()
+        thread.join()
+
+    assert set(seen[0]) == {"Alice", "Bob"}
+
+
+def test_write_transaction_bumps_generation(temp_config):
+    """Test that the generation is odd during a transaction and even after it."""
+    start = get_generation()
+    assert start % 2 == 0
+    with write_transaction():
+        assert get_generation() == start + 1
+        with write_transaction():
+            assert get_generation() == start + 1
+    assert get_generation() == start + 2
+
+
+def test_snapshot_waits_for_transaction(temp_config):
+    """Test that a snapshot never sees a half-finished transaction."""
+    add_contact("Alice", "555-1111")
+    started = threading.Event()
+    release = threading.Event()
+
+    def writer():
+        with write_transaction():
+            add_contact("Bob", "555-2222")
+            started.set()
+            release.wait(5)
+            add_to_history("5552222", "555-2222")
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    started.wait(5)
+    threading.Timer(0.05, release.set).start()
+    snapshot = take_snapshot()
+    thread.join()
+
+    assert snapshot.load_contacts() == {"Alice": "555-1111", "Bob": "555-2222"}
+    assert len(snapshot.load_history()) == 1
+    assert snapshot.generation % 2 == 0
+
+
+def test_snapshot_sees_calls_in_history_and_rollups(temp_config, monkeypatch):
+    """Test that a history append and its rollup counts land in one transaction."""
+    from rotary_phone import rollups
+    from rotary_phone.rollups import get_daily_counts
+    set_config_value('enable_rollups', True)
+    started = threading.Event()
+    release = threading.Event()
+    record_calls = rollups.record_calls
+
+    def slow_record_calls(entries):
+        started.set()
+        release.wait(5)
+        record_calls(entries)
+
+    monkeypatch.setattr(rollups, "record_calls", slow_record_calls)
+    thread = threading.Thread(target=add_to_history, args=("5552222", "555-2222"))
+    thread.start()
+    started.wait(5)
+    threading.Timer(0.05, release.set).start()
+    snapshot = take_snapshot()
+    thread.join()
+
+    with read_snapshot(snapshot):
+        assert len(load_history()) == sum(get_daily_counts().values()) == 1
+
+
+def test_export_uses_given_snapshot(temp_config, tmp_path):
+    """Test that export_data writes the data of the snapshot it is given."""
+    add_contact("Alice", "555-1111")
+    snapshot = take_snapshot()
+    add_contact("Bob", "555-2222")
+
+    output = tmp_path / "export.json"
+    export_data(output, snapshot=snapshot)
+    data = json.loads(output.read_text())
+    assert data['contacts'] == {"Alice": "555-1111"}
@@ -0,0 +1,63 @@
+"""Tests for redial and speed-dial."""
+
+import pytest
+
+from rotary_phone.exceptions import InvalidNumberError
+from rotary_phone.history import add_to_history, get_last_call
+from rotary_phone.speeddial import (SLOT_SIZE, SLOTS, clear_speed_dial, get_speed_dial,
+                                    get_speed_dial_file, list_speed_dials, set_speed_dial)
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    return config_dir
+
+
+def test_get_last_call(temp_config):
+    """Test reading the Nth most recent call."""
+    assert get_last_call() is None
+    for number in ("5551111", "5552222", "5553333"):
+        add_to_history(number, number)
+    assert get_last_call()['number'] == "5553333"
+    assert get_last_call(3)['number'] == "5551111"
+    assert get_last_call(4) is None
+    with pytest.raises(ValueError):
+        get_last_call(0)
+
+
+def test_speed_dial_slots(temp_config):
+    """Test setting, reading, listing and clearing slots."""
+    assert get_speed_dial(0) is None
+    assert set_speed_dial(3, "(555) 123-4567") == "5551234567"
+    set_speed_dial(9, "+44 20 7946 0958")
+    assert get_speed_dial(3) == "5551234567"
+    assert list_speed_dials() == {3: "5551234567", 9: "+442079460958"}
+    assert get_speed_dial_file().stat().st_size == SLOTS * SLOT_SIZE
+
+    set_speed_dial(3, "555-0000")
+    clear_speed_dial(9)
+    assert list_speed_dials() == {3: "5550000"}
+
+
+def test_speed_dial_rejects_bad_input(temp_config):
+    """Test slot range and number validation."""
+    with pytest.raises(ValueError):
+        set_speed_dial(10, "555-1234")
+    with pytest.raises(ValueError):
+        get_speed_dial(-1)
+    with pytest.raises(InvalidNumberError):
+        set_speed_dial(1, "not a number")
+    clear_speed_dial(1)
+    assert not get_speed_dial_file().exists()
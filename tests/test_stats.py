@@ -0,0 +1,48 @@
+"""Tests for statistics."""
+
+import pytest
+
+from rotary_phone.config import set_config_value
+from rotary_phone.contacts import save_contacts
+from rotary_phone.history import save_history
+from rotary_phone.stats import get_top_contacts
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+    
+    from rotary_phone import config
+    
+    def mock_get_config_dir():
+        return config_dir
+    
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+    
+    return config_dir
+
+
+@pytest.mark.parametrize("backend", ["python", "auto"])
+def test_get_top_contacts_groups_by_name(temp_config, backend):
+    """Test that calls are counted per contact across number formats."""
+    set_config_value("analytics_backend", backend)
+    save_contacts({"Alice": "555-1111", "Bob": "555-2222"})
+    numbers = ["555-2222", "5551111", "555 1111", "(555)1111", "555-9999", "5559999", "5552222"]
+    save_history([
+        {'number': number, 'formatted': number, 'timestamp': f"2024-01-01T0{i}:00:00"}
+        for i, number in enumerate(numbers)
+    ])
+    assert get_top_contacts(5) == [
+        ("Alice", "5551111", 3),
+        ("Bob", "555-2222", 2),
+        (None, "555-9999", 2),
+    ]
+    assert get_top_contacts(1) == [("Alice", "5551111", 3)]
+
+
+def test_get_top_contacts_empty(temp_config):
+    """Test that no history gives no top contacts."""
+    assert get_top_contacts() == []
@@ -0,0 +1,163 @@
+"""Tests for the storage backends."""
+
+import pytest
+
+from rotary_phone import storage
+from rotary_phone.exceptions import ConfigError
+from rotary_phone.storage import AppendLogBackend, create_backend, get_backend, use_backend
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+    
+    from rotary_phone import config
+    
+    def mock_get_config_dir():
+        return config_dir
+    
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+    
+    return config_dir
+
+
+@pytest.fixture(params=sorted(storage.BACKENDS))
+def backend(request, tmp_path):
+    """Create each kind of backend in a fresh directory."""
+    return create_backend(request.param, tmp_path / request.param)
+
+
+def entry(i):
+    return {'number': f"555{i:04d}", 'formatted': f"555-{i:04d}", 'timestamp': f"2024-01-01T00:00:{i % 60:02d}"}
+
+
+def test_contacts_crud(backend):
+    """Test contact CRUD and name-ordered scans."""
+    assert backend.load_contacts() == {}
+    backend.put_contact("Bob", "555-2222")
+    backend.put_contact("Alice", "555-1111")
+    assert backend.get_contact("Bob") == "555-2222"
+    assert list(backend.scan_contacts()) == [("Alice", "555-1111"), ("Bob", "555-2222")]
+    assert backend.delete_contact("Bob") is True
+    assert backend.delete_contact("Bob") is False
+    backend.save_contacts({"Carol": "555-3333"})
+    assert backend.load_contacts() == {"Carol": "555-3333"}
+
+
+def test_history_append_scan_tail(backend):
+    """Test appending with a limit, scanning and reading the tail."""
+    for i in range(10):
+        backend.append_history([entry(i)], limit=4)
+    assert backend.load_history() == [entry(i) for i in range(6, 10)]
+    assert list(backend.scan_history()) == backend.load_history()
+    assert backend.tail_history(2) == [entry(8), entry(9)]
+    assert backend.tail_history(0) == []
+    backend.save_history([entry(1)])
+    assert backend.load_history() == [entry(1)]
+
+
+def test_config_and_documents(backend):
+    """Test config storage and named documents."""
+    assert backend.load_config() is None
+    backend.save_config({'history_limit': 5})
+    assert backend.load_config() == {'history_limit': 5}
+    assert not backend.has_document('rollups')
+    backend.save_document('rollups', {'day': {'2024-01-01': {'5551234': 2}}})
+    assert backend.load_document('rollups') == {'day': {'2024-01-01': {'5551234': 2}}}
+    backend.delete_document('rollups')
+    assert backend.load_document('rollups') is None
+
+
+def test_signature_changes_on_write(backend):
+    """Test that signatures change with every write, even of the same size."""
+    backend.put_contact("Alice", "555-1111")
+    before = backend.signature('contacts')
+    assert backend.signature('contacts') == before
+    backend.put_contact("Alice", "555-2222")
+    assert backend.signature('contacts') != before
+
+
+def test_loaded_data_is_not_shared(backend):
+    """Test that modifying loaded data does not change the store."""
+    backend.save_contacts({"Alice": "555-1111"})
+    backend.load_contacts()["Bob"] = "555-2222"
+    backend.append_history([entry(1)])
+    backend.load_history().append(entry(2))
+    assert backend.load_contacts() == {"Alice": "555-1111"}
+    assert backend.load_history() == [entry(1)]
+
+
+def test_log_backend_follows_other_writers(tmp_path):
+    """Test that a log reader sees appends and rewrites by another instance."""
+    writer = AppendLogBackend(tmp_path)
+    reader = AppendLogBackend(tmp_path)
+    writer.append_history([entry(1)])
+    assert reader.load_history() == [entry(1)]
+    writer.append_history([entry(2)], limit=1)
+    assert reader.load_history() == [entry(2)]
+    writer.save_history([entry(3)])
+    assert reader.load_history() == [entry(3)]
+
+    # A partially written line is ignored until it is complete
+    with open(tmp_path / "history.log", 'a') as f:
+        f.write('{"number": "55')
+    assert reader.load_history() == [entry(3)]
+
+
+def test_log_backend_compacts(tmp_path, monkeypatch):
+    """Test that a mostly dead log is rewritten as a snapshot."""
+    monkeypatch.setattr(AppendLogBackend, "COMPACT_MIN_LINES", 10)
+    backend = AppendLogBackend(tmp_path)
+    for i in range(30):
+        backend.append_history([entry(i)], limit=3)
+    lines = (tmp_path / "history.log").read_text().splitlines()
+    assert len(lines) < 10
+    assert backend.load_history() == [entry(27), entry(28), entry(29)]
+    assert AppendLogBackend(tmp_path).load_history() == backend.load_history()
+
+
+@pytest.mark.parametrize("name", ["json", "log"])
+def test_tail_reads_end_of_file(name, tmp_path, monkeypatch):
+    """Test tail reads from a fresh instance across chunk boundaries and trims."""
+    monkeypatch.setattr(storage, "TAIL_CHUNK_SIZE", 50)
+    writer = create_backend(name, tmp_path)
+    for i in range(20):
+        writer.append_history([entry(i)], limit=12)
+
+    expected = [entry(i) for i in range(8, 20)]
+    assert create_backend(name, tmp_path).tail_history(3) == expected[-3:]
+    assert create_backend(name, tmp_path).tail_history(12) == expected
+    assert create_backend(name, tmp_path).tail_history(50) == expected
+    assert create_backend(name, tmp_path / "missing").tail_history(1) == []
+
+
+def test_backend_selection(temp_config, monkeypatch):
+    """Test choosing the backend by environment variable or config."""
+    from rotary_phone.config import set_config_value
+    monkeypatch.delenv(storage.BACKEND_ENV_VAR, raising=False)
+    set_config_value('storage_backend', 'log')
+    storage.set_backend(None)
+    assert get_backend().name == 'log'
+
+    monkeypatch.setenv(storage.BACKEND_ENV_VAR, 'memory')
+    storage.set_backend(None)
+    assert get_backend().name == 'memory'
+
+    with pytest.raises(ConfigError):
+        create_backend('floppy')
+
+
+def test_modules_use_active_backend(temp_config):
+    """Test that contacts and history go through the installed backend."""
+    from rotary_phone.contacts import add_contact, get_contacts_by_number
+    from rotary_phone.history import add_to_history, get_history
+    with use_backend(create_backend('memory')):
+        add_contact("Alice", "555-1111")
+        add_to_history("555-1111", "555-1111")
+        assert get_contacts_by_number("5551111") == ["Alice"]
+        assert len(get_history()) == 1
+    assert not (temp_config / "contacts.json").exists()
+    assert not (temp_config / "history.json").exists()
@@ -0,0 +1,81 @@
+"""Tests for deadline-based dial timing."""
+
+import threading
+
+import pytest
+
+from rotary_phone.clock import SystemClock, VirtualClock, use_clock
+from rotary_phone.config import set_config_value
+from rotary_phone.dialer import dial
+from rotary_phone.history import load_history
+from rotary_phone.timing import BREAK_NS, PULSE_NS, DialTimer, dial_schedule
+
+
+@pytest.fixture
+def temp_config(tmp_path, monkeypatch):
+    """Create a temporary config directory for testing."""
+    config_dir = tmp_path / ".rotary_phone"
+    config_dir.mkdir()
+
+    from rotary_phone import config
+
+    def mock_get_config_dir():
+        return config_dir
+
+    monkeypatch.setattr(config, "get_config_dir", mock_get_config_dir)
+    monkeypatch.setattr(config, "ensure_config_dir", lambda: config_dir)
+
+    return config_dir
+
+
+def test_fixed_schedule_is_absolute():
+    """Test that fixed-model deadlines are multiples of the delay from the start."""
+    assert dial_schedule("555", 0.1, model='fixed') == [[100_000_000], [200_000_000], [300_000_000]]
+
+
+def test_pulse_schedule_models_make_and_break():
+    """Test pulse-model deadlines: break and make edges plus the inter-digit delay."""
+    schedule = dial_schedule("20", 0.5, model='pulse')
+    assert schedule[0] == [BREAK_NS, PULSE_NS, PULSE_NS + BREAK_NS, 2 * PULSE_NS, 2 * PULSE_NS + 500_000_000]
+    assert len(schedule[1]) == 21
+    assert schedule[1][-1] == 12 * PULSE_NS + 1_000_000_000
+    assert dial_schedule("+1", 0, model='pulse')[0] == []
+
+    with pytest.raises(ValueError):
+        dial_schedule("1", 0.1, model='dtmf')
+
+
+def test_dial_records_timing_in_history(temp_config):
+    """Test that measured and target timing are stored with the call."""
+    set_config_value('dial_timing', 'pulse')
+    with use_clock(VirtualClock()) as clock:
+        dial("555-1234", delay=0.7, quiet=True)
+        assert clock.monotonic() == pytest.approx(2.5 + 7 * 0.7)
+
+    entry = load_history()[-1]
+    assert entry['target_ms'] == pytest.approx(7400.0)
+    assert entry['duration_ms'] == pytest.approx(7400.0)
+    assert entry['jitter_ms'] == pytest.approx(0.0, abs=0.001)
+
+
+def test_system_clock_deadlines_do_not_drift():
+    """Test that real waits are never early and lateness does not accumulate."""
+    results = []
+
+    def session():
+        timer = DialTimer(SystemClock())
+        for i in range(1, 21):
+            timer.wait_until(i * 2_000_000)
+        results.append(timer.summary())
+
+    threads = [threading.Thread(target=session) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for summary in results:
+        assert summary['target_ms'] == 40.0
+        assert summary['duration_ms'] >= 40.0
+        # One late deadline is absorbed by the next, not added to it
+        assert summary['duration_ms'] - 40.0 <= summary['jitter_ms'] + 5.0
@@ -2,7 +2,7 @@
 
 import pytest
 
-from rotary_phone.utils import validate_number, format_number
+from rotary_phone.utils import validate_number, format_number, normalize_time_bound
 
 
 def test_validate_number_valid():
@@ -31,3 +31,13 @@ def test_format_number():
 
 
 
+def test_normalize_time_bound():
+    """Test that bounds keep their precision and a bare upper date covers the day."""
+    from datetime import date, datetime
+    assert normalize_time_bound(None) is None
+    assert normalize_time_bound("2024-05-01") == "2024-05-01"
+    assert normalize_time_bound("2024-05-01", end_of_day=True) == "2024-05-01T23:59:59.999999"
+    assert normalize_time_bound(date(2024, 5, 1), end_of_day=True) == "2024-05-01T23:59:59.999999"
+    assert normalize_time_bound(datetime(2024, 5, 1, 9, 30)) == "2024-05-01T09:30:00"
+    with pytest.raises(ValueError):
+        normalize_time_bound("yesterday")